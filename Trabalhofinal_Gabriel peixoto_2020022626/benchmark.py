@@ -0,0 +1,485 @@
+# Benchmark do fluxo de swipe/match: gera (se preciso) um banco sintético, chama as rotas reais
+# do Flask pelo test client (ou por HTTP num servidor já no ar, com --url), primeiro em sequência
+# e depois com várias threads, e imprime a latência p50/p95/p99 e a vazão por rota em JSON.
+# Com --cenario ranking, mede quanto leva para ranquear um catálogo de 100 mil empresas para um desenvolvedor,
+# com --cenario escala, a latência de um swipe conforme o histórico de um desenvolvedor cresce, e com
+# --cenario concorrencia, likes simultâneos com o esquema de conexões original e com o atual (pool e WAL), e com
+# --cenario escrita, quantos swipes por segundo o record_swipe grava direto no banco e pelo buffer write-behind.
+#
+# Exemplos:
+#   python benchmark.py --banco /tmp/bench.db --devs 100000 --empresas 5000 --requisicoes 500 --threads 8 --saida resultado.json
+#   TINDERJOB_DATABASE=/tmp/bench.db gunicorn -c gunicorn.conf.py "main:create_app()" &
+#   python benchmark.py --banco /tmp/bench.db --url http://127.0.0.1:8000 --threads 16
+#   python benchmark.py --cenario ranking --empresas 100000 --meta-ms 50
+#   python benchmark.py --cenario escala --niveis 10,100,1000,10000,100000,1000000
+#   python benchmark.py --cenario concorrencia --threads 32 --requisicoes 500
+#   python benchmark.py --cenario escrita --escritas 20000
+import argparse
+import glob
+import hashlib
+import http.client
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import got_request_exception
+
+import main
+
+SENHA = 'senha'
+
+
+# Função para gerar o banco sintético, se ele ainda não existir
+def prepare_database(args):
+    main.app.config['DATABASE'] = args.banco
+    novo = not os.path.exists(args.banco)
+    main.migrate_db()
+    if novo:
+        resultado = main.generate_synthetic_data(args.devs, args.empresas, args.swipes, args.semente, SENHA)
+        return {tabela: {'linhas': inseridos, 'segundos': round(segundos, 3)} for tabela, (_, inseridos, segundos) in resultado.items()}
+    return None
+
+
+# Função para ler os intervalos de ids existentes (as rotas sorteiam perfis dentro deles)
+def profile_ranges():
+    with main.open_db() as conn:
+        devs = conn.execute('SELECT MIN(id), MAX(id) FROM devs').fetchone()
+        empresas = conn.execute('SELECT MIN(id), MAX(id) FROM empresas').fetchone()
+    conn.close()
+    return tuple(devs), tuple(empresas)
+
+
+# Cenários: nome da rota -> função que faz a requisição e retorna a resposta
+def build_scenarios(devs, empresas):
+    def dev_id(rng):
+        return rng.randint(*devs)
+
+    def empresa_id(rng):
+        return rng.randint(*empresas)
+
+    return {
+        'POST /dev/login': lambda client, rng: client.post('/dev/login', data={'email': f'dev{dev_id(rng)}@exemplo.com', 'senha': SENHA}),
+        'POST /empresa/login': lambda client, rng: client.post('/empresa/login', data={'cnpj': f'{empresa_id(rng):014d}', 'senha': SENHA}),
+        'GET /dev/swipe': lambda client, rng: client.get(f'/dev/swipe/{dev_id(rng)}'),
+        'POST /dev/like': lambda client, rng: client.post(f'/dev/like/{empresa_id(rng)}',
+                                                          data={'dev_id': dev_id(rng), 'action': rng.choice(['like', 'dislike'])}),
+        'GET /empresa/swipe': lambda client, rng: client.get(f'/empresa/swipe/{empresa_id(rng)}'),
+        'POST /empresa/like': lambda client, rng: client.post(f'/empresa/like/{dev_id(rng)}',
+                                                              data={'empresa_id': empresa_id(rng), 'action': rng.choice(['like', 'dislike'])}),
+        'GET /dev/matches': lambda client, rng: client.get(f'/dev/matches/{dev_id(rng)}'),
+        'GET /empresa/matches': lambda client, rng: client.get(f'/empresa/matches/{empresa_id(rng)}'),
+        'GET /api/busca/devs': lambda client, rng: client.get('/api/busca/devs', query_string={
+            'q': rng.choice(main.HABILIDADES_CHOICES)[0], 'experiencia': rng.choice(['', '1'])}),
+        'GET /api/busca/empresas': lambda client, rng: client.get('/api/busca/empresas', query_string={
+            'setor': rng.choice(main.SYNTHETIC_SETORES), 'salario_min': rng.choice([0, 5, 10])}),
+    }
+
+
+# Resposta do cliente HTTP com a mesma interface das respostas do test client
+class HttpResponse:
+    def __init__(self, status_code, corpo):
+        self.status_code = status_code
+        self.corpo = corpo
+
+    def get_data(self):
+        return self.corpo
+
+    def close(self):
+        pass
+
+
+# Cliente HTTP com a interface do test client (get/post) para medir um servidor de verdade;
+# cada thread usa o seu, com uma conexão keep-alive reaberta quando o servidor a fecha
+class HttpClient:
+    def __init__(self, url):
+        partes = urllib.parse.urlsplit(url)
+        self.conn = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=60)
+
+    def request(self, metodo, caminho, query_string=None, data=None):
+        if query_string:
+            caminho += '?' + urllib.parse.urlencode(query_string)
+        corpo, headers = None, {}
+        if data is not None:
+            corpo = urllib.parse.urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        self.conn.request(metodo, caminho, corpo, headers)
+        resposta = self.conn.getresponse()
+        conteudo = resposta.read()
+        if resposta.will_close:
+            self.conn.close()
+        return HttpResponse(resposta.status, conteudo)
+
+    def get(self, caminho, query_string=None):
+        return self.request('GET', caminho, query_string=query_string)
+
+    def post(self, caminho, data=None):
+        return self.request('POST', caminho, data=data)
+
+
+# Função para executar uma requisição e medir o tempo, incluindo a leitura do corpo (páginas em streaming)
+def timed_request(cenario, client, rng):
+    inicio = time.perf_counter()
+    resposta = cenario(client, rng)
+    resposta.get_data()
+    duracao = time.perf_counter() - inicio
+    resposta.close()
+    return duracao, resposta.status_code < 400
+
+
+# Função para resumir as latências de uma rota
+def summarize(latencias, erros, segundos):
+    ordenadas = sorted(latencias)
+
+    def percentil(p):
+        return round(ordenadas[min(int(len(ordenadas) * p / 100), len(ordenadas) - 1)] * 1000, 3) if ordenadas else None
+
+    return {
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'p50_ms': percentil(50),
+        'p95_ms': percentil(95),
+        'p99_ms': percentil(99),
+        'media_ms': round(sum(latencias) / len(latencias) * 1000, 3) if latencias else None,
+        'vazao_rps': round(len(latencias) / segundos, 1) if segundos else None,
+    }
+
+
+# Modo sequencial: cada rota é chamada N vezes seguidas por um único cliente
+def run_sequential(cenarios, requisicoes, semente, novo_cliente):
+    rng = random.Random(semente)
+    client = novo_cliente()
+    resultado = {}
+    for nome, cenario in cenarios.items():
+        latencias = []
+        erros = 0
+        inicio = time.perf_counter()
+        for _ in range(requisicoes):
+            duracao, ok = timed_request(cenario, client, rng)
+            latencias.append(duracao)
+            erros += not ok
+        resultado[nome] = summarize(latencias, erros, time.perf_counter() - inicio)
+    return resultado
+
+
+# Modo concorrente: várias threads, cada uma com seu cliente, sorteando rotas numa mistura única
+def run_concurrent(cenarios, requisicoes, threads, semente, novo_cliente):
+    nomes = list(cenarios)
+    latencias = {nome: [] for nome in nomes}
+    erros = {nome: 0 for nome in nomes}
+    lock = threading.Lock()
+
+    def worker(indice):
+        rng = random.Random(semente + indice)
+        client = novo_cliente()
+        for _ in range(requisicoes * len(nomes) // threads):
+            nome = rng.choice(nomes)
+            duracao, ok = timed_request(cenarios[nome], client, rng)
+            with lock:
+                latencias[nome].append(duracao)
+                erros[nome] += not ok
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    segundos = time.perf_counter() - inicio
+    resultado = {nome: summarize(latencias[nome], erros[nome], segundos) for nome in nomes}
+    total = sum(len(valores) for valores in latencias.values())
+    resultado['total'] = {'requisicoes': total, 'erros': sum(erros.values()), 'segundos': round(segundos, 3),
+                          'vazao_rps': round(total / segundos, 1) if segundos else None}
+    return resultado
+
+
+# Função para popular o banco pelo comando "flask dados gerar", com os argumentos dados
+def seed_with_cli(banco, argumentos):
+    main.app.config['DATABASE'] = banco
+    resultado = main.app.test_cli_runner().invoke(args=['dados', 'gerar'] + argumentos)
+    if resultado.exit_code != 0:
+        raise SystemExit(resultado.output)
+    return resultado.output.splitlines()
+
+
+# Cenário "ranking": o catálogo de empresas vem de "flask dados gerar" e, para desenvolvedores sorteados, o baralho
+# guardado é descartado e medimos o ranking completo (habilidades, experiência, salário e carga horária) tanto na
+# função que monta o baralho quanto na página de swipe que a chama. O p95 do ranking é comparado com --meta-ms
+def run_ranking(args):
+    geracao = None
+    if not os.path.exists(args.banco):
+        geracao = seed_with_cli(args.banco, ['--devs', str(args.devs), '--empresas', str(args.empresas), '--swipes', str(args.swipes),
+                                             '--semente', str(args.semente)])
+    main.app.config['DATABASE'] = args.banco
+    main.migrate_db()
+    devs, empresas = profile_ranges()
+    rng = random.Random(args.semente)
+    client = main.app.test_client()
+    ranking, pagina = [], []
+    erros = 0
+    for _ in range(args.requisicoes):
+        dev_id = rng.randint(*devs)
+        main.forget_deck('dev', dev_id)
+        with main.app.app_context():
+            inicio = time.perf_counter()
+            cards = main.fetch_empresas_for_dev(dev_id, main.DECK_SIZE)
+            ranking.append(time.perf_counter() - inicio)
+        erros += len(cards) < main.DECK_SIZE
+        main.forget_deck('dev', dev_id)
+        duracao, ok = timed_request(lambda client, rng: client.get(f'/dev/swipe/{dev_id}'), client, rng)
+        pagina.append(duracao)
+        erros += not ok
+    resumo = summarize(ranking, erros, sum(ranking))
+    return {'config': {chave: valor for chave, valor in vars(args).items() if chave != 'saida'},
+            'dados': {'devs': devs, 'empresas': empresas, 'geracao': geracao},
+            'ranking': resumo, 'GET /dev/swipe': summarize(pagina, 0, sum(pagina)),
+            'dentro_da_meta': resumo['p95_ms'] is not None and resumo['p95_ms'] < args.meta_ms}
+
+
+# Função para gravar dislikes de um desenvolvedor até ele ter "total" swipes, sempre nas primeiras empresas do
+# ranking dele (o pior caso para a fila: tudo o que já foi avaliado está no topo). Uma única consulta ordena o
+# catálogo pela mesma pontuação do baralho, em vez de montar milhares de baralhos
+def grow_swipes(dev_id, total):
+    with main.open_db() as conn:
+        atual = conn.execute('SELECT COUNT(*) FROM matches WHERE dev_id = ?', (dev_id,)).fetchone()[0]
+        if atual < total:
+            dev = conn.execute('''SELECT habilidades_mask, experiencia_flag, salario_pretendido, horas_semanais_max
+                                  FROM devs WHERE id = ?''', (dev_id,)).fetchone()
+            conn.execute(f'''INSERT OR IGNORE INTO matches (dev_id, empresa_id, dev_status, atualizado_em)
+                             SELECT :user_id, id, 'dislike', CAST(strftime('%s', 'now') AS INTEGER) FROM empresas
+                             WHERE NOT EXISTS (SELECT 1 FROM matches WHERE matches.dev_id = :user_id AND matches.empresa_id = empresas.id)
+                             ORDER BY {main.SCORE_SQL_BY_TIPO['empresa']} DESC, {main.EMPRESA_ORDEM_SQL} DESC, id LIMIT :quantidade''',
+                         {'user_id': dev_id, 'mask': dev['habilidades_mask'] or 0, 'compativeis': json.dumps((0, 1) if dev['experiencia_flag'] else (0,)),
+                          'salario': dev['salario_pretendido'], 'horas': dev['horas_semanais_max'], 'quantidade': total - atual})
+            atual = conn.execute('SELECT COUNT(*) FROM matches WHERE dev_id = ?', (dev_id,)).fetchone()[0]
+    conn.close()
+    if atual < total:
+        raise SystemExit(f'O catálogo acabou com {atual} swipes; gere mais empresas.')
+    return atual
+
+
+# Cenário "escala": um desenvolvedor com 10, 100, ... swipes. Em cada nível o baralho dele é descartado e
+# medimos a página de swipe (que recarrega o baralho pela fila) e o like/dislike no primeiro cartão.
+# Os swipes de cada nível são gravados direto no banco, por fora da fila: a primeira recarga depois deles
+# ainda avança o cursor sobre todos e é medida à parte (no uso normal o cursor acompanha cada recarga).
+# O catálogo (maior nível + --margem empresas) vem de "flask dados gerar"
+def run_scale(args):
+    niveis = sorted(int(nivel) for nivel in args.niveis.split(','))
+    geracao = None
+    if not os.path.exists(args.banco):
+        geracao = seed_with_cli(args.banco, ['--devs', '1', '--empresas', str(niveis[-1] + args.margem), '--swipes', '0',
+                                             '--semente', str(args.semente)])
+    main.app.config['DATABASE'] = args.banco
+    main.migrate_db()
+    with main.open_db() as conn:
+        dev_id = conn.execute('SELECT MAX(id) FROM devs').fetchone()[0]
+        empresas = conn.execute('SELECT COUNT(*) FROM empresas').fetchone()[0]
+    conn.close()
+    client = main.app.test_client()
+    resultado = {}
+    for nivel in niveis:
+        inicio = time.perf_counter()
+        swipes = grow_swipes(dev_id, nivel)
+        carga = time.perf_counter() - inicio
+        main.forget_deck('dev', dev_id)
+        primeira, _ = timed_request(lambda client, rng: client.get(f'/dev/swipe/{dev_id}'), client, None)
+        carregar, swipe = [], []
+        erros = 0
+        for _ in range(args.repeticoes):
+            main.forget_deck('dev', dev_id)
+            duracao, ok = timed_request(lambda client, rng: client.get(f'/dev/swipe/{dev_id}'), client, None)
+            carregar.append(duracao)
+            cartao = re.search(rb'/dev/like/(\d+)', client.get(f'/dev/swipe/{dev_id}').get_data())
+            if not ok or cartao is None:
+                erros += 1
+                continue
+            duracao, ok = timed_request(lambda client, rng: client.post(f'/dev/like/{int(cartao.group(1))}',
+                                                                        data={'dev_id': dev_id, 'action': 'dislike'}), client, None)
+            swipe.append(duracao)
+            erros += not ok
+        resultado[str(nivel)] = {'swipes': swipes, 'carga_segundos': round(carga, 3),
+                                 'primeira_recarga_ms': round(primeira * 1000, 3),
+                                 'carregar_baralho': summarize(carregar, erros, sum(carregar)),
+                                 'swipe': summarize(swipe, 0, sum(swipe))}
+    return {'config': {chave: valor for chave, valor in vars(args).items() if chave != 'saida'},
+            'dados': {'dev_id': dev_id, 'empresas': empresas, 'geracao': geracao}, 'niveis': resultado}
+
+
+# Função para copiar o banco gerado para a medição de um modo (cada modo começa do mesmo estado)
+def copy_database(banco, modo):
+    conn = sqlite3.connect(banco)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+    copia = f'{os.path.splitext(banco)[0]}-{modo}.db'
+    shutil.copyfile(banco, copia)
+    return copia
+
+
+# Função para fechar as conexões do pool e apagar a cópia do banco com os arquivos de journal (e de swipes) dela
+def remove_database(copia):
+    with main.db_pool_lock:
+        for _, conn in main.db_pool:
+            conn.close()
+        del main.db_pool[:]
+    for caminho in [copia] + glob.glob(copia + '-*') + glob.glob(copia + '.swipes*'):
+        os.remove(caminho)
+
+
+# Conexões comparadas no cenário "concorrencia". Antes: uma conexão nova por requisição, journal de rollback,
+# fsync a cada commit e só a espera padrão do sqlite3 (5 s), como o connect_db original. Depois: o pool e os pragmas atuais
+MODOS_CONEXAO = {
+    'antes': {'pool': 0, 'pragmas': (('journal_mode', 'DELETE'), ('synchronous', 'FULL'))},
+    'depois': {'pool': main.app.config['DB_POOL_SIZE'], 'pragmas': main.SQLITE_PRAGMAS},
+}
+
+
+# Cenário "concorrencia": --threads clientes postando likes e dislikes de desenvolvedores e de empresas ao mesmo tempo,
+# uma vez em cada modo de MODOS_CONEXAO, cada um numa cópia do banco gerado. Além da latência e da vazão, conta as
+# requisições que falharam com "database is locked" (o like perdido que o usuário vê como erro 500)
+def run_concurrent_swipes(args):
+    geracao = prepare_database(args)
+    devs, empresas = profile_ranges()
+    cenarios = {nome: cenario for nome, cenario in build_scenarios(devs, empresas).items() if nome in ('POST /dev/like', 'POST /empresa/like')}
+    bloqueios = []
+
+    def contar_bloqueio(sender, exception, **extra):
+        if isinstance(exception, sqlite3.OperationalError) and 'locked' in str(exception):
+            bloqueios.append(exception)
+
+    got_request_exception.connect(contar_bloqueio, main.app)
+    original = main.app.config['DATABASE'], main.app.config['DB_POOL_SIZE'], main.SQLITE_PRAGMAS
+    resultado = {}
+    try:
+        for modo, conexao in MODOS_CONEXAO.items():
+            copia = copy_database(args.banco, modo)
+            main.app.config.update(DATABASE=copia, DB_POOL_SIZE=conexao['pool'])
+            main.SQLITE_PRAGMAS = conexao['pragmas']
+            # Troca o modo de journal da cópia antes das threads (sair do WAL exige o banco só para si)
+            main.open_db().close()
+            del bloqueios[:]
+            resultado[modo] = run_concurrent(cenarios, args.requisicoes, args.threads, args.semente, main.app.test_client)
+            resultado[modo]['total']['erros_bloqueio'] = len(bloqueios)
+            remove_database(copia)
+    finally:
+        got_request_exception.disconnect(contar_bloqueio, main.app)
+        main.app.config['DATABASE'], main.app.config['DB_POOL_SIZE'], main.SQLITE_PRAGMAS = original
+    return {'config': {chave: valor for chave, valor in vars(args).items() if chave != 'saida'},
+            'dados': {'devs': devs, 'empresas': empresas, 'geracao': geracao}, **resultado}
+
+
+# Modos do cenário "escrita": o upsert direto com os pragmas atuais (no WAL com synchronous=NORMAL o commit não faz
+# fsync), o mesmo com synchronous=FULL (fsync a cada commit, a durabilidade do write-behind) e o buffer write-behind
+MODOS_ESCRITA = {
+    'direto': {'write_behind': False, 'pragmas': main.SQLITE_PRAGMAS},
+    'direto-fsync': {'write_behind': False, 'pragmas': tuple((pragma, 'FULL' if pragma == 'synchronous' else valor)
+                                                             for pragma, valor in main.SQLITE_PRAGMAS)},
+    'write-behind': {'write_behind': True, 'pragmas': main.SQLITE_PRAGMAS},
+}
+
+
+# Cenário "escrita": micro-benchmark do caminho de gravação do swipe. A mesma sequência de --escritas swipes sorteados
+# (lado, par e ação) passa por record_swipe, uma transação por swipe como nas rotas, em cada modo de MODOS_ESCRITA
+# e numa cópia do banco. No write-behind o tempo total inclui o flush final, para contar só swipes já no banco.
+# Todas as cópias devem terminar com a mesma tabela matches
+def run_swipe_writes(args):
+    geracao = prepare_database(args)
+    devs, empresas = profile_ranges()
+    rng = random.Random(args.semente)
+    swipes = [(rng.choice(['dev', 'empresa']), rng.randint(*devs), rng.randint(*empresas), rng.choice(['like', 'dislike']))
+              for _ in range(args.escritas)]
+    original = main.app.config['DATABASE'], main.app.config['SWIPE_WRITE_BEHIND'], main.app.config['SWIPE_JOURNAL'], main.SQLITE_PRAGMAS
+    resultado = {}
+    try:
+        for modo, escrita in MODOS_ESCRITA.items():
+            copia = copy_database(args.banco, modo)
+            main.app.config.update(DATABASE=copia, SWIPE_WRITE_BEHIND=escrita['write_behind'], SWIPE_JOURNAL=copia + '.swipes')
+            main.SQLITE_PRAGMAS = escrita['pragmas']
+            latencias = []
+            matches = 0
+            with main.app.app_context():
+                conn = main.connect_db()
+                inicio = time.perf_counter()
+                for lado, dev_id, empresa_id, action in swipes:
+                    comeco = time.perf_counter()
+                    with conn:
+                        matches += main.record_swipe(conn, lado, dev_id, empresa_id, action)
+                    latencias.append(time.perf_counter() - comeco)
+                aceitos = time.perf_counter() - inicio
+                buffer = main.get_swipe_buffer()
+                if buffer is not None:
+                    buffer.flush()
+                segundos = time.perf_counter() - inicio
+                linhas = conn.execute('SELECT dev_id, empresa_id, dev_status, empresa_status FROM matches ORDER BY dev_id, empresa_id')
+                tabela = hashlib.sha256(repr([tuple(linha) for linha in linhas]).encode()).hexdigest()
+            resultado[modo] = {'swipes_por_segundo': round(len(swipes) / segundos, 1), 'segundos': round(segundos, 3),
+                               'aceitos_por_segundo': round(len(swipes) / aceitos, 1), 'matches': matches,
+                               'latencia': summarize(latencias, 0, aceitos), 'matches_sha256': tabela,
+                               'buffer': dict(buffer.stats) if buffer is not None else None}
+            remove_database(copia)
+    finally:
+        main.app.config['DATABASE'], main.app.config['SWIPE_WRITE_BEHIND'], main.app.config['SWIPE_JOURNAL'], main.SQLITE_PRAGMAS = original
+    return {'config': {chave: valor for chave, valor in vars(args).items() if chave != 'saida'},
+            'dados': {'devs': devs, 'empresas': empresas, 'geracao': geracao}, **resultado,
+            'mesmo_resultado': len({medicao['matches_sha256'] for medicao in resultado.values()}) == 1}
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description='Benchmark das rotas de swipe, like, matches e login.')
+    parser.add_argument('--cenario', choices=['rotas', 'ranking', 'escala', 'concorrencia', 'escrita'], default='rotas',
+                        help='rotas: todas as rotas em sequência e em paralelo; ranking: baralho de um catálogo grande de empresas; '
+                             'escala: latência do swipe de 10 a 1M swipes; concorrencia: likes em paralelo antes e depois do pool com WAL; '
+                             'escrita: swipes por segundo gravados direto e pelo buffer write-behind.')
+    parser.add_argument('--banco', help='Banco usado no benchmark (gerado se não existir; padrão: benchmark.db ou benchmark-<cenario>.db).')
+    parser.add_argument('--devs', type=int, default=10000, help='Desenvolvedores gerados.')
+    parser.add_argument('--empresas', type=int, help='Empresas geradas (padrão: 1000, ou 100000 no cenário ranking).')
+    parser.add_argument('--swipes', type=int, default=20, help='Média de swipes por desenvolvedor gerados.')
+    parser.add_argument('--semente', type=int, default=42, help='Semente dos dados e das requisições.')
+    parser.add_argument('--requisicoes', type=int, default=200, help='Requisições por rota em cada modo.')
+    parser.add_argument('--threads', type=int, help='Threads do modo concorrente (padrão: 8, ou 32 no cenário concorrencia).')
+    parser.add_argument('--rotas', help='Rotas a medir, separadas por vírgula (padrão: todas).')
+    parser.add_argument('--url', help='Mede um servidor já no ar (ex.: http://127.0.0.1:8000) usando o mesmo --banco.')
+    parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: só imprime).')
+    parser.add_argument('--meta-ms', type=float, default=50, help='Ranking: p95 máximo aceito para montar um baralho.')
+    parser.add_argument('--niveis', default='10,100,1000,10000,100000,1000000', help='Escala: swipes do desenvolvedor medidos.')
+    parser.add_argument('--margem', type=int, default=50000, help='Escala: empresas geradas além do maior nível.')
+    parser.add_argument('--repeticoes', type=int, default=50, help='Escala: medições em cada nível.')
+    parser.add_argument('--escritas', type=int, default=20000, help='Escrita: swipes gravados em cada modo.')
+    args = parser.parse_args()
+    args.banco = args.banco or ('benchmark.db' if args.cenario == 'rotas' else f'benchmark-{args.cenario}.db')
+    args.empresas = args.empresas or (100000 if args.cenario == 'ranking' else 1000)
+    args.threads = args.threads or (32 if args.cenario == 'concorrencia' else 8)
+
+    if args.cenario == 'ranking':
+        resultado = run_ranking(args)
+    elif args.cenario == 'escala':
+        resultado = run_scale(args)
+    elif args.cenario == 'concorrencia':
+        resultado = run_concurrent_swipes(args)
+    elif args.cenario == 'escrita':
+        resultado = run_swipe_writes(args)
+    else:
+        geracao = prepare_database(args)
+        devs, empresas = profile_ranges()
+        cenarios = build_scenarios(devs, empresas)
+        if args.rotas:
+            cenarios = {nome: cenario for nome, cenario in cenarios.items() if nome in args.rotas.split(',')}
+        novo_cliente = (lambda: HttpClient(args.url)) if args.url else main.app.test_client
+
+        resultado = {
+            'config': {chave: valor for chave, valor in vars(args).items() if chave != 'saida'},
+            'dados': {'devs': devs, 'empresas': empresas, 'geracao': geracao},
+            'sequencial': run_sequential(cenarios, args.requisicoes, args.semente, novo_cliente),
+            'concorrente': run_concurrent(cenarios, args.requisicoes, args.threads, args.semente, novo_cliente),
+        }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as saida:
+            saida.write(texto + '\n')
+    print(texto)
+
+
+if __name__ == '__main__':
+    main_benchmark()
@@ -0,0 +1,81 @@
+# Configuração do gunicorn para produção:
+#   gunicorn -c gunicorn.conf.py
+#
+# Migração do esquema: roda uma vez no master (num processo à parte, com "flask migrar") antes de subir os
+# workers e de novo a cada recarga; os workers só conferem a versão do banco e aquecem as conexões.
+#
+# Recarga sem queda: "kill -HUP <pid do master>" sobe workers novos com o código atualizado e só depois
+# encerra os antigos, que terminam as requisições em andamento (até graceful_timeout).
+# Para trocar a versão do próprio gunicorn: "kill -USR2 <pid>" sobe um master novo; depois "kill -QUIT" no antigo.
+#
+# Ajustes por variável de ambiente: TINDERJOB_BIND, TINDERJOB_WORKERS, TINDERJOB_THREADS e TINDERJOB_WORKER_CLASS;
+# as configurações do app também (TINDERJOB_DATABASE, TINDERJOB_SECRET_KEY, TINDERJOB_CURRICULO_WORKERS...).
+#
+# Um worker só, por padrão: os baralhos de swipe, o cache de perfis e o mural de logos da página inicial ficam
+# na memória do processo, e com vários workers um swipe ou uma edição só é visto pelo worker que o atendeu
+# (cartões já avaliados voltam em outro worker, e a edição de perfil pode mostrar foto/currículo antigos até
+# o fim do TTL). TINDERJOB_WORKERS > 1 exige TINDERJOB_PROFILE_CACHE_URL (Redis compartilhado) e aceita essas
+# diferenças nos baralhos. Com SWIPE_WRITE_BEHIND cada worker tem o seu buffer e o seu journal (swipes.journal.<pid>,
+# reaplicado por outro worker se o dono cair); dois likes de um par ainda nos buffers de workers diferentes
+# viram match no flush, sem o aviso imediato na tela do swipe.
+# TINDERJOB_CURRICULO_WORKERS é o total de processos de extração do servidor, dividido entre os workers.
+#
+# Notificações em tempo real (SSE): servidas à parte, por um servidor ASGI que segura milhares de conexões ociosas
+# num só processo e lê o outbox de notificações do mesmo banco:
+#   uvicorn --factory "main:create_notifications_app" --port 8001 --timeout-graceful-shutdown 5
+# O proxy reverso manda /notificacoes/stream para a porta 8001 e o resto para este servidor. Sem proxy, aponte
+# TINDERJOB_NOTIFY_STREAM_URL para o endereço completo e libere a origem do site em TINDERJOB_NOTIFY_ALLOWED_ORIGINS
+# (ex.: '["http://localhost:8000"]'); o cookie de sessão vale para as duas portas do mesmo host.
+import multiprocessing
+import os
+import subprocess
+import sys
+
+wsgi_app = 'main:create_app()'
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get('TINDERJOB_BIND', '0.0.0.0:8000')
+
+# Processos: um por padrão (ver acima); a concorrência vem das threads
+workers = int(os.environ.get('TINDERJOB_WORKERS', 1))
+if workers > 1 and not os.environ.get('TINDERJOB_PROFILE_CACHE_URL'):
+    raise RuntimeError('TINDERJOB_WORKERS > 1 exige TINDERJOB_PROFILE_CACHE_URL (cache de perfis compartilhado)')
+# Threads por processo. As conexões de /notificacoes/stream (SSE) não passam por aqui: ficam com o servidor ASGI
+# de notificações (ver o início do arquivo), onde uma conexão ociosa não ocupa thread
+worker_class = os.environ.get('TINDERJOB_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('TINDERJOB_THREADS', 2 * multiprocessing.cpu_count() + 2))
+
+# Processos de extração de currículos: o total do servidor é repartido entre os workers (pelo menos um por worker
+# enquanto o total for positivo; 0 deixa a extração para um "flask curriculos processar --continuo" separado).
+# O total fica guardado à parte porque este arquivo é lido de novo a cada HUP
+curriculo_workers = int(os.environ.setdefault('TINDERJOB_CURRICULO_WORKERS_TOTAL', os.environ.get('TINDERJOB_CURRICULO_WORKERS', '2')))
+os.environ['TINDERJOB_CURRICULO_WORKERS'] = str(max(1, curriculo_workers // workers) if curriculo_workers > 0 else 0)
+
+# Cada worker importa o app por conta própria (sem preload) para que o HUP carregue o código novo
+preload_app = False
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+# Recicla os workers de tempos em tempos, com variação para não reiniciarem todos juntos
+max_requests = 10000
+max_requests_jitter = 1000
+accesslog = '-'
+
+
+# Função para migrar o esquema num processo separado (o master não importa o app, senão o HUP não o recarregaria)
+def migrate():
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'migrar'], cwd=chdir, check=True)
+
+
+# Na subida: sem o esquema migrado os workers nem começam
+def on_starting(server):
+    server.log.info('Migrando o esquema do banco')
+    migrate()
+
+
+# Na recarga (HUP): se a migração falhar os workers novos sobem mesmo assim e cada um tenta migrar ao iniciar
+def on_reload(server):
+    server.log.info('Migrando o esquema do banco antes da recarga')
+    try:
+        migrate()
+    except subprocess.CalledProcessError as erro:
+        server.log.error('Falha na migração do esquema: %s', erro)
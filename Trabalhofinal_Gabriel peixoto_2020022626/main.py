@@ -1,552 +1,3646 @@
-from flask import Flask, render_template, redirect, url_for, request, flash
-from flask_bootstrap import Bootstrap5
-from flask_wtf import FlaskForm
-from wtforms import StringField, SubmitField, TextAreaField, PasswordField, SelectMultipleField, widgets, FileField, DecimalField, IntegerField
-from wtforms.validators import DataRequired, NumberRange
-import sqlite3
-from werkzeug.utils import secure_filename
-import os
-import uuid
-
-# Configurações básicas do app Flask
-app = Flask(__name__)
-app.config['SECRET_KEY'] = '8BYkEfBA6O6donzWlSihBXox7C0sKR6b'
-app.config['UPLOAD_FOLDER'] = 'static/fotos'
-app.config['UPLOAD_FOLDER_LOGO'] = 'static/logo'
-Bootstrap5(app)
-
-# Extensões permitidas para upload
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
-
-# Função para conectar ao banco de dados
-def connect_db():
-    conn = sqlite3.connect('banco_tinder.db')
-    conn.row_factory = sqlite3.Row
-    return conn
-
-# Função para verificar se o arquivo tem a extensão permitida
-def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-# Criação da tabela de desenvolvedores
-def create_table():
-    with connect_db() as conn:
-        conn.execute('''CREATE TABLE IF NOT EXISTS devs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        email TEXT NOT NULL,
-                        cel TEXT NOT NULL,
-                        habilidades TEXT NOT NULL,
-                        senha TEXT NOT NULL,
-                        foto TEXT NOT NULL,
-                        curriculo TEXT,
-                        tem_experiencia TEXT
-                        )''')
-    conn.close()
-
-# Criação da tabela de empresas
-def create_empresa_table():
-    with connect_db() as conn:
-        conn.execute('''CREATE TABLE IF NOT EXISTS empresas (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        nome_empresa TEXT NOT NULL,
-                        cnpj TEXT NOT NULL,
-                        setor TEXT NOT NULL,
-                        endereco TEXT NOT NULL,
-                        email TEXT NOT NULL,
-                        telefone TEXT NOT NULL,
-                        senha TEXT NOT NULL,
-                        logo TEXT,
-                        habilidades TEXT,
-                        horas_semanais INTEGER,
-                        horas_diarias INTEGER,
-                        salario_ofertado REAL,
-                        experiencia_necessaria TEXT
-                        )''')
-    conn.close()
-
-# Criação da tabela de matches
-def create_matches_table():
-    with connect_db() as conn:
-        conn.execute('''CREATE TABLE IF NOT EXISTS matches (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        dev_id INTEGER NOT NULL,
-                        empresa_id INTEGER NOT NULL,
-                        dev_status TEXT NOT NULL DEFAULT 'pending' CHECK(dev_status IN ('like', 'dislike', 'pending')),
-                        empresa_status TEXT NOT NULL DEFAULT 'pending' CHECK(empresa_status IN ('like', 'dislike', 'pending')),
-                        UNIQUE(dev_id, empresa_id)
-                        )''')
-    conn.close()
-
-# Função para obter a próxima empresa para um desenvolvedor
-def get_next_empresa_for_dev(dev_id):
-    with connect_db() as conn:
-        viewed_empresas = conn.execute('''SELECT empresa_id FROM matches WHERE dev_id = ? AND dev_status != 'pending' ''', (dev_id,)).fetchall()
-        viewed_empresa_ids = [row[0] for row in viewed_empresas]
-        if viewed_empresa_ids:
-            placeholders = ','.join(['?'] * len(viewed_empresa_ids))
-            query = f'''SELECT * FROM empresas WHERE id NOT IN ({placeholders}) LIMIT 1'''
-            empresa = conn.execute(query, viewed_empresa_ids).fetchone()
-        else:
-            empresa = conn.execute('''SELECT * FROM empresas LIMIT 1''').fetchone()
-    return [empresa] if empresa else []
-
-# Função para obter o próximo desenvolvedor para uma empresa
-def get_next_dev_for_empresa(empresa_id):
-    with connect_db() as conn:
-        viewed_devs = conn.execute('''SELECT dev_id FROM matches WHERE empresa_id = ? AND empresa_status != 'pending' ''', (empresa_id,)).fetchall()
-        viewed_dev_ids = [row[0] for row in viewed_devs]
-        if viewed_dev_ids:
-            placeholders = ','.join(['?'] * len(viewed_dev_ids))
-            query = f'''SELECT * FROM devs WHERE id NOT IN ({placeholders}) LIMIT 1'''
-            dev = conn.execute(query, viewed_dev_ids).fetchone()
-        else:
-            dev = conn.execute('''SELECT * FROM devs LIMIT 1''').fetchone()
-    return [dev] if dev else []
-
-# Classe de formulário para cadastro de desenvolvedores
-class DevForm(FlaskForm):
-    name = StringField('Nome', validators=[DataRequired()])
-    email = StringField('E-mail', validators=[DataRequired()])
-    cel = StringField('Celular', validators=[DataRequired()])
-    habilidades = SelectMultipleField(
-        'Habilidades', 
-        choices=[
-            ('python', 'Python'),
-            ('html', 'HTML'),
-            ('java', 'Java'),
-            ('javascript', 'JavaScript'),
-            ('c', 'C'),
-            ('c++', 'C++'),
-            ('csharp', 'C#'),
-            ('php', 'PHP'),
-            ('ruby', 'Ruby'),
-            ('sql', 'SQL')
-        ],
-        option_widget=widgets.CheckboxInput(),
-        widget=widgets.ListWidget(prefix_label=False)
-    )
-    foto = FileField('Foto do Desenvolvedor')
-    senha = PasswordField('Senha', validators=[DataRequired()])
-    curriculo = FileField('Currículo')
-    tem_experiencia = StringField('Tem Experiência', validators=[DataRequired()])
-    submit = SubmitField('Cadastrar')
-
-# Classe de formulário para editar perfil de desenvolvedores
-class EditDevForm(FlaskForm):
-    name = StringField('Nome', validators=[DataRequired()])
-    email = StringField('E-mail', validators=[DataRequired()])
-    cel = StringField('Celular', validators=[DataRequired()])
-    habilidades = SelectMultipleField(
-        'Habilidades',
-        choices=[
-            ('python', 'Python'),
-            ('html', 'HTML'),
-            ('java', 'Java'),
-            ('javascript', 'JavaScript'),
-            ('c', 'C'),
-            ('c++', 'C++'),
-            ('csharp', 'C#'),
-            ('php', 'PHP'),
-            ('ruby', 'Ruby'),
-            ('sql', 'SQL')
-        ],
-        option_widget=widgets.CheckboxInput(),
-        widget=widgets.ListWidget(prefix_label=False)
-    )
-    foto = FileField('Atualizar Foto do Desenvolvedor')
-    curriculo = FileField('Atualizar Currículo')
-    tem_experiencia = StringField('Tem Experiência', validators=[DataRequired()])
-    submit = SubmitField('Salvar Alterações')
-
-# Classe de formulário para cadastro de empresas
-class EmpresaForm(FlaskForm):
-    nome_empresa = StringField('Nome da Empresa', validators=[DataRequired()])
-    cnpj = StringField('CNPJ', validators=[DataRequired()])
-    setor = StringField('Setor de Atuação', validators=[DataRequired()])
-    endereco = TextAreaField('Endereço', validators=[DataRequired()])
-    email = StringField('E-mail', validators=[DataRequired()])
-    telefone = StringField('Telefone', validators=[DataRequired()])
-    logo = FileField('Logo da Empresa')
-    senha = PasswordField('Senha', validators=[DataRequired()])
-    horas_semanais = IntegerField('Horas Semanais', validators=[DataRequired(), NumberRange(min=0)])
-    horas_diarias = IntegerField('Horas Diárias', validators=[DataRequired(), NumberRange(min=0)])
-    salario_ofertado = DecimalField('Salário Ofertado', validators=[DataRequired(), NumberRange(min=0)], places=2)
-    experiencia_necessaria = StringField('Experiência Necessária', validators=[DataRequired()])
-    habilidades = SelectMultipleField(
-        'Habilidades Procuradas', 
-        choices=[
-            ('python', 'Python'),
-            ('html', 'HTML'),
-            ('java', 'Java'),
-            ('javascript', 'JavaScript'),
-            ('c', 'C'),
-            ('c++', 'C++'),
-            ('csharp', 'C#'),
-            ('php', 'PHP'),
-            ('ruby', 'Ruby'),
-            ('sql', 'SQL')
-        ],
-        option_widget=widgets.CheckboxInput(),
-        widget=widgets.ListWidget(prefix_label=False)
-    )
-    submit = SubmitField('Cadastrar Empresa')
-
-# Classe de formulário para editar perfil de empresas
-class EditEmpresaForm(FlaskForm):
-    nome_empresa = StringField('Nome da Empresa', validators=[DataRequired()])
-    cnpj = StringField('CNPJ', validators=[DataRequired()])
-    setor = StringField('Setor de Atuação', validators=[DataRequired()])
-    endereco = TextAreaField('Endereço', validators=[DataRequired()])
-    email = StringField('E-mail', validators=[DataRequired()])
-    telefone = StringField('Telefone', validators=[DataRequired()])
-    habilidades = SelectMultipleField(
-        'Habilidades Procuradas',
-        choices=[
-            ('python', 'Python'),
-            ('html', 'HTML'),
-            ('java', 'Java'),
-            ('javascript', 'JavaScript'),
-            ('c', 'C'),
-            ('c++', 'C++'),
-            ('csharp', 'C#'),
-            ('php', 'PHP'),
-            ('ruby', 'Ruby'),
-            ('sql', 'SQL')
-        ],
-        option_widget=widgets.CheckboxInput(),
-        widget=widgets.ListWidget(prefix_label=False)
-    )
-    horas_semanais = IntegerField('Horas Semanais', validators=[DataRequired(), NumberRange(min=0)])
-    horas_diarias = IntegerField('Horas Diárias', validators=[DataRequired(), NumberRange(min=0)])
-    salario_ofertado = DecimalField('Salário Ofertado', validators=[DataRequired(), NumberRange(min=0)], places=2)
-    experiencia_necessaria = StringField('Experiência Necessária', validators=[DataRequired()])
-    logo = FileField('Atualizar Logo da Empresa')
-    submit = SubmitField('Salvar Alterações')
-
-# Rota principal (home)
-@app.route("/")
-def home():
-    with connect_db() as conn:
-        empresas = conn.execute('SELECT logo FROM empresas WHERE logo IS NOT NULL').fetchall()
-    return render_template("index.html", empresas=empresas)
-
-# Rota para login de desenvolvedor
-@app.route("/dev/login", methods=["GET", "POST"])
-def dev_login():
-    if request.method == "POST":
-        email = request.form['email']
-        senha = request.form['senha']
-        with connect_db() as conn:
-            dev = conn.execute('SELECT * FROM devs WHERE email = ? AND senha = ?', (email, senha)).fetchone()
-        if dev:
-            return redirect(url_for('dev_profile', dev_id=dev['id']))
-        else:
-            return render_template("dev_login.html", error="Credenciais inválidas.")
-    return render_template("dev_login.html")
-
-# Rota para exibir perfil de desenvolvedor
-@app.route("/dev/profile/<int:dev_id>")
-def dev_profile(dev_id):
-    with connect_db() as conn:
-        dev = conn.execute('SELECT * FROM devs WHERE id = ?', (dev_id,)).fetchone()
-    return render_template("dev_profile.html", dev=dev)
-
-# Rota para exibir todas as empresas
-@app.route("/empresas")
-def show_empresas():
-    with connect_db() as conn:
-        empresas = conn.execute('SELECT * FROM empresas').fetchall()
-    return render_template("empresas.html", empresas=empresas, dev_id=None)
-
-# Rota para curtir um desenvolvedor por uma empresa
-@app.route("/empresa/like/<int:dev_id>", methods=["POST"])
-def empresa_like(dev_id):
-    empresa_id = request.form.get('empresa_id')
-    if not empresa_id:
-        return redirect(url_for('empresa_login'))
-    empresa_id = int(empresa_id)
-    action = request.form.get('action') 
-    
-    with connect_db() as conn:
-        match = conn.execute('''SELECT * FROM matches WHERE dev_id = ? AND empresa_id = ?''', (dev_id, empresa_id)).fetchone()
-        dev = conn.execute('SELECT * FROM devs WHERE id = ?', (dev_id,)).fetchone()
-        empresa = conn.execute('SELECT * FROM empresas WHERE id = ?', (empresa_id,)).fetchone()
-
-        if match:
-            conn.execute('''UPDATE matches SET empresa_status = ? WHERE dev_id = ? AND empresa_id = ?''', (action, dev_id, empresa_id))
-        else:
-            conn.execute('''INSERT INTO matches (dev_id, empresa_id, dev_status, empresa_status) VALUES (?, ?, ?, ?)''', (dev_id, empresa_id, 'pending', action))
-        
-        match = conn.execute('''SELECT * FROM matches WHERE dev_id = ? AND empresa_id = ?''', (dev_id, empresa_id)).fetchone()
-
-        if match['dev_status'] == 'like' and match['empresa_status'] == 'like':
-            flash(f"Parabéns! Você deu match com o desenvolvedor {dev['name']}!", 'match')
-    
-    return redirect(url_for('empresa_swipe', empresa_id=empresa_id))
-
-# Rota para exibir próximos desenvolvedores para uma empresa curtir
-@app.route("/empresa/swipe/<int:empresa_id>")
-def empresa_swipe(empresa_id):
-    devs = get_next_dev_for_empresa(empresa_id)
-    with connect_db() as conn:
-        empresa = conn.execute('SELECT * FROM empresas WHERE id = ?', (empresa_id,)).fetchone()
-    if not devs:
-        return render_template("nao_tem_devs.html", empresa=empresa)
-    return render_template("devs.html", devs=devs, empresa_id=empresa_id, empresa=empresa)
-
-# Rota para login de empresa
-@app.route("/empresa/login", methods=["GET", "POST"])
-def empresa_login():
-    if request.method == "POST":
-        cnpj = request.form['cnpj']
-        senha = request.form['senha']
-        with connect_db() as conn:
-            empresa = conn.execute('SELECT * FROM empresas WHERE cnpj = ? AND senha = ?', (cnpj, senha)).fetchone()
-        if empresa:
-            return redirect(url_for('empresa_profile', empresa_id=empresa['id']))
-        else:
-            return render_template("empresa_login.html", error="Credenciais inválidas.")
-    return render_template("empresa_login.html")
-
-# Rota para exibir perfil de empresa
-@app.route("/empresa/profile/<int:empresa_id>")
-def empresa_profile(empresa_id):
-    with connect_db() as conn:
-        empresa = conn.execute('SELECT * FROM empresas WHERE id = ?', (empresa_id,)).fetchone()
-    return render_template("empresa_profile.html", empresa=empresa)
-
-# Rota para exibir todos os desenvolvedores
-@app.route("/devs")
-def show_devs():
-    with connect_db() as conn:
-        devs = conn.execute('SELECT * FROM devs').fetchall()
-    return render_template("devs.html", devs=devs)
-
-# Rota para curtir uma empresa por um desenvolvedor
-@app.route("/dev/like/<int:empresa_id>", methods=["POST"])
-def dev_like(empresa_id):
-    dev_id = request.form.get('dev_id')
-    if not dev_id:
-        return redirect(url_for('dev_login'))
-    dev_id = int(dev_id)
-    action = request.form.get('action') 
-    
-    with connect_db() as conn:
-        match = conn.execute('''SELECT * FROM matches WHERE dev_id = ? AND empresa_id = ?''', (dev_id, empresa_id)).fetchone()
-        dev = conn.execute('SELECT * FROM devs WHERE id = ?', (dev_id,)).fetchone()
-        empresa = conn.execute('SELECT * FROM empresas WHERE id = ?', (empresa_id,)).fetchone()
-
-        if match:
-            conn.execute('''UPDATE matches SET dev_status = ? WHERE dev_id = ? AND empresa_id = ?''', (action, dev_id, empresa_id))
-        else:
-            conn.execute('''INSERT INTO matches (dev_id, empresa_id, dev_status, empresa_status) VALUES (?, ?, ?, ?)''', (dev_id, empresa_id, action, 'pending'))
-        
-        match = conn.execute('''SELECT * FROM matches WHERE dev_id = ? AND empresa_id = ?''', (dev_id, empresa_id)).fetchone()
-
-        if match['dev_status'] == 'like' and match['empresa_status'] == 'like':
-            flash(f"Parabéns! Você deu match com a empresa {empresa['nome_empresa']}!", 'match')
-    
-    return redirect(url_for('dev_swipe', dev_id=dev_id))
-
-
-# Rota para exibir próximas empresas para um desenvolvedor curtir
-@app.route("/dev/swipe/<int:dev_id>")
-def dev_swipe(dev_id):
-    empresas = get_next_empresa_for_dev(dev_id)
-    with connect_db() as conn:
-        dev = conn.execute('SELECT * FROM devs WHERE id = ?', (dev_id,)).fetchone()
-    if not empresas:
-        return render_template("nao_tem_empresas.html", dev=dev)
-    return render_template("empresas.html", empresas=empresas, dev_id=dev_id, dev=dev)
-
-# Rota para registro de desenvolvedor
-@app.route("/dev/register", methods=["GET", "POST"])
-def dev_register():
-    form = DevForm()
-    if form.validate_on_submit():
-        habilidades_selecionadas = ', '.join(form.habilidades.data)
-        foto_filename = None
-        curriculo_filename = None
-
-        # Upload de foto
-        if 'foto' in request.files:
-            file = request.files['foto']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                extension = os.path.splitext(filename)[1]
-                unique_filename = f"dev_{uuid.uuid4()}{extension}"
-                foto_filename = unique_filename
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], foto_filename))
-
-        # Upload de currículo
-        if 'curriculo' in request.files:
-            file = request.files['curriculo']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                extension = os.path.splitext(filename)[1]
-                unique_filename = f"curriculo_{uuid.uuid4()}{extension}"
-                curriculo_filename = unique_filename
-                file.save(os.path.join('static/curriculos', curriculo_filename))
-
-        with connect_db() as conn:
-            conn.execute('''INSERT INTO devs (name, email, cel, habilidades, senha, foto, curriculo, tem_experiencia)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                         (form.name.data, form.email.data, form.cel.data, habilidades_selecionadas, form.senha.data, foto_filename, curriculo_filename, form.tem_experiencia.data))
-        return redirect(url_for('home'))
-    return render_template("dev_register.html", form=form)
-
-# Rota para edição de perfil de desenvolvedor
-@app.route("/dev/profile/edit/<int:dev_id>", methods=["GET", "POST"])
-def edit_dev_profile(dev_id):
-    with connect_db() as conn:
-        dev = conn.execute('SELECT * FROM devs WHERE id = ?', (dev_id,)).fetchone()
-
-    form = EditDevForm()
-
-    if request.method == 'GET':
-        form.name.data = dev['name']
-        form.email.data = dev['email']
-        form.cel.data = dev['cel']
-        form.habilidades.data = dev['habilidades'].split(', ')
-        form.tem_experiencia.data = dev['tem_experiencia']
-    elif form.validate_on_submit():
-        habilidades_selecionadas = ', '.join(form.habilidades.data)
-        foto_filename = dev['foto']
-        curriculo_filename = dev['curriculo']
-        if 'foto' in request.files and request.files['foto'].filename != '':
-            file = request.files['foto']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                extension = os.path.splitext(filename)[1]
-                unique_filename = f"dev_{uuid.uuid4()}{extension}"
-                foto_filename = unique_filename
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], foto_filename))
-        if 'curriculo' in request.files and request.files['curriculo'].filename != '':
-            file = request.files['curriculo']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                extension = os.path.splitext(filename)[1]
-                unique_filename = f"curriculo_{uuid.uuid4()}{extension}"
-                curriculo_filename = unique_filename
-                file.save(os.path.join('static/curriculos', curriculo_filename))
-
-        with connect_db() as conn:
-            conn.execute('''
-                UPDATE devs
-                SET name = ?, email = ?, cel = ?, habilidades = ?, foto = ?, curriculo = ?, tem_experiencia = ?
-                WHERE id = ?
-            ''', (form.name.data, form.email.data, form.cel.data, habilidades_selecionadas, foto_filename, curriculo_filename, form.tem_experiencia.data, dev_id))
-        flash('Perfil atualizado com sucesso!', 'success')
-        return redirect(url_for('dev_profile', dev_id=dev_id))
-
-    return render_template('edit_dev_profile.html', form=form, dev_id=dev_id)
-
-# Rota para registro de empresa
-@app.route("/empresa/register", methods=["GET", "POST"])
-def empresa_register():
-    form = EmpresaForm()
-    if form.validate_on_submit():
-        habilidades_selecionadas = ', '.join(form.habilidades.data)
-        logo_filename = None
-        if 'logo' in request.files:
-            file = request.files['logo']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                extension = os.path.splitext(filename)[1]
-                unique_filename = f"empresa_{uuid.uuid4()}{extension}"
-                logo_filename = unique_filename
-                file.save(os.path.join(app.config['UPLOAD_FOLDER_LOGO'], logo_filename))
-        
-        with connect_db() as conn:
-            conn.execute('''INSERT INTO empresas (nome_empresa, cnpj, setor, endereco, email, telefone, senha, logo, habilidades, horas_semanais, horas_diarias, salario_ofertado, experiencia_necessaria)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                (form.nome_empresa.data, form.cnpj.data, form.setor.data, form.endereco.data, 
-                  form.email.data, form.telefone.data, form.senha.data, logo_filename, habilidades_selecionadas,
-                  form.horas_semanais.data, form.horas_diarias.data, float(form.salario_ofertado.data), form.experiencia_necessaria.data))
-        return redirect(url_for('home'))
-    return render_template("empresa_register.html", form=form)
-
-# Rota para edição de perfil de empresa
-@app.route("/empresa/profile/edit/<int:empresa_id>", methods=["GET", "POST"])
-def edit_empresa_profile(empresa_id):
-    with connect_db() as conn:
-        empresa = conn.execute('SELECT * FROM empresas WHERE id = ?', (empresa_id,)).fetchone()
-    form = EditEmpresaForm()
-    if request.method == 'GET':
-        form.nome_empresa.data = empresa['nome_empresa']
-        form.cnpj.data = empresa['cnpj']
-        form.setor.data = empresa['setor']
-        form.endereco.data = empresa['endereco']
-        form.email.data = empresa['email']
-        form.telefone.data = empresa['telefone']
-        form.habilidades.data = empresa['habilidades'].split(', ') if empresa['habilidades'] else []
-        form.horas_semanais.data = empresa['horas_semanais']
-        form.horas_diarias.data = empresa['horas_diarias']
-        form.salario_ofertado.data = empresa['salario_ofertado']
-        form.experiencia_necessaria.data = empresa['experiencia_necessaria']
-    elif form.validate_on_submit():
-        habilidades_selecionadas = ', '.join(form.habilidades.data)
-        logo_filename = empresa['logo']
-        if 'logo' in request.files and request.files['logo'].filename != '':
-            file = request.files['logo']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                extension = os.path.splitext(filename)[1]
-                unique_filename = f"empresa_{uuid.uuid4()}{extension}"
-                logo_filename = unique_filename
-                file.save(os.path.join(app.config['UPLOAD_FOLDER_LOGO'], logo_filename))
-
-        with connect_db() as conn:
-            conn.execute('''
-                UPDATE empresas
-                SET nome_empresa = ?, cnpj = ?, setor = ?, endereco = ?, email = ?, telefone = ?, habilidades = ?, logo = ?, horas_semanais = ?, horas_diarias = ?, salario_ofertado = ?, experiencia_necessaria = ?
-                WHERE id = ?
-            ''', (form.nome_empresa.data, form.cnpj.data, form.setor.data, form.endereco.data,
-                form.email.data, form.telefone.data, habilidades_selecionadas, logo_filename,
-                form.horas_semanais.data, form.horas_diarias.data, float(form.salario_ofertado.data), form.experiencia_necessaria.data, empresa_id))
-        flash('Perfil atualizado com sucesso!', 'success')
-        return redirect(url_for('empresa_profile', empresa_id=empresa_id))
-
-    return render_template('edit_empresa_profile.html', form=form, empresa_id=empresa_id)
-
-# Rota para exibir matches de desenvolvedor
-@app.route("/dev/matches/<int:dev_id>")
-def dev_matches(dev_id):
-    with connect_db() as conn:
-        matches = conn.execute('''
-            SELECT empresas.* FROM matches
-            JOIN empresas ON matches.empresa_id = empresas.id
-            WHERE matches.dev_id = ? AND matches.dev_status = 'like' AND matches.empresa_status = 'like'
-        ''', (dev_id,)).fetchall()
-    return render_template("dev_matches.html", matches=matches, dev_id=dev_id)
-
-# Rota para exibir matches de empresa
-@app.route("/empresa/matches/<int:empresa_id>")
-def empresa_matches(empresa_id):
-    with connect_db() as conn:
-        matches = conn.execute('''
-            SELECT devs.* FROM matches
-            JOIN devs ON matches.dev_id = devs.id
-            WHERE matches.empresa_id = ? AND matches.dev_status = 'like' AND matches.empresa_status = 'like'
-        ''', (empresa_id,)).fetchall()
-    return render_template("empresa_matches.html", matches=matches, empresa_id=empresa_id)
-
-# Rota para exibir a página "Fale Conosco"
-@app.route("/fale_conosco", methods=["GET", "POST"])
-def fale_conosco():
-    if request.method == "POST":
-        nome = request.form['nome']
-        email = request.form['email']
-        mensagem = request.form['mensagem']
-        flash('Sua mensagem foi enviada com sucesso!', 'success')
-        return redirect(url_for('fale_conosco'))
-    return render_template("fale_conosco.html")
-
-# Iniciar o servidor e criar tabelas ao iniciar
-if __name__ == '__main__':
-    create_table()
-    create_empresa_table()
-    create_matches_table()
-    app.run(debug=True, port=6001)
+from flask import Flask, render_template, stream_template, redirect, url_for, request, flash, g, has_app_context, has_request_context, jsonify, session, Response
+from flask import before_render_template, template_rendered
+from flask_bootstrap import Bootstrap5
+from flask_wtf import FlaskForm
+from wtforms import StringField, SubmitField, TextAreaField, PasswordField, SelectMultipleField, widgets, FileField, DecimalField, IntegerField
+from wtforms.validators import DataRequired, NumberRange, Optional
+import sqlite3
+from PIL import Image, ImageOps
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.http import parse_cookie
+from itsdangerous import BadSignature
+from collections import OrderedDict
+import click
+from flask.cli import AppGroup
+import csv
+import bisect
+import contextlib
+import os
+import uuid
+import random
+import hashlib
+import json
+import functools
+import array
+import threading
+import time
+import atexit
+import hmac
+import cProfile
+import itertools
+import math
+import shutil
+import glob
+import re
+import io
+import zipfile
+import zlib
+import html
+import multiprocessing
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+# Redis é opcional: só é usado quando PROFILE_CACHE_URL está configurada
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Trava de arquivo entre processos (journal de swipes): fcntl no Linux/macOS, msvcrt no Windows
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Configurações básicas do app Flask
+app = Flask(__name__)
+app.config['SECRET_KEY'] = '8BYkEfBA6O6donzWlSihBXox7C0sKR6b'
+app.config['UPLOAD_FOLDER'] = 'static/fotos'
+app.config['UPLOAD_FOLDER_LOGO'] = 'static/logo'
+app.config['UPLOAD_FOLDER_CURRICULO'] = 'static/curriculos'
+# Limite de cada arquivo enviado e do corpo inteiro da requisição (o Werkzeug recusa acima disso com 413)
+app.config['UPLOAD_MAX_BYTES'] = 8 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024
+app.config['DATABASE'] = 'banco_tinder.db'
+# Modo opcional de escrita atrasada dos swipes (ver SwipeBuffer)
+app.config['SWIPE_WRITE_BEHIND'] = False
+app.config['SWIPE_BATCH_SIZE'] = 500
+app.config['SWIPE_FLUSH_INTERVAL_MS'] = 50
+# Prefixo dos journals do buffer: cada processo escreve no seu, "<prefixo>.<pid>"
+app.config['SWIPE_JOURNAL'] = 'swipes.journal'
+# Hash de senha com sal: método e fator de trabalho (iterações) ajustáveis; hashes antigos são refeitos no login
+app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:600000'
+app.config['PASSWORD_SALT_LENGTH'] = 16
+# Cache de perfis: quantidade mantida em memória, validade em segundos e, opcionalmente,
+# a URL de um Redis (ou compatível) compartilhado entre os processos
+app.config['PROFILE_CACHE_SIZE'] = 1024
+app.config['PROFILE_CACHE_TTL'] = 60
+app.config['PROFILE_CACHE_URL'] = None
+# Cache de baralhos de swipe: quantos usuários ficam com o baralho em memória e por quantos segundos
+app.config['DECK_CACHE_SIZE'] = 4096
+app.config['DECK_CACHE_TTL'] = 300
+# Contagem de perfis por (habilidades, experiência) que escolhe o plano de cada grupo do ranking, refeita a cada N segundos
+app.config['RANKING_STATS_TTL'] = 300
+# Instrumentação opcional: tempo de SQL, templates e arquivos por requisição (cabeçalho Server-Timing e /metrics),
+# plano das consultas acima de SLOW_QUERY_MS e cProfile de uma a cada PROFILE_EVERY_N requisições (0 desliga)
+app.config['INSTRUMENTATION'] = False
+app.config['SLOW_QUERY_MS'] = 50
+app.config['PROFILE_EVERY_N'] = 0
+app.config['PROFILE_DIR'] = 'profiles'
+# Notificações em tempo real (SSE, servidas pela aplicação ASGI notifications_asgi): endereço usado pelas páginas,
+# origens de outros endereços que podem abri-lo com o cookie de sessão (quando NOTIFY_STREAM_URL é absoluta),
+# intervalo de consulta ao outbox enquanto há alguém conectado, intervalo dos comentários "ping" que mantêm
+# as conexões ociosas abertas e duração máxima de uma conexão (depois o navegador reconecta sozinho)
+app.config['NOTIFY_STREAM_URL'] = '/notificacoes/stream'
+app.config['NOTIFY_ALLOWED_ORIGINS'] = []
+app.config['NOTIFY_POLL_INTERVAL_MS'] = 500
+app.config['SSE_HEARTBEAT_SECONDS'] = 25
+app.config['SSE_STREAM_SECONDS'] = 300
+# Extração de texto dos currículos: processos de extração deste servidor (0 = só enfileira, para um worker
+# separado com "flask curriculos processar"), tentativas, espera base entre tentativas (dobra a cada falha),
+# prazo de um job em execução, intervalo de consulta à fila e tamanho máximo do texto guardado
+app.config['CURRICULO_WORKERS'] = 2
+app.config['CURRICULO_MAX_TENTATIVAS'] = 5
+app.config['CURRICULO_BACKOFF_SEGUNDOS'] = 5
+app.config['CURRICULO_LEASE_SEGUNDOS'] = 300
+app.config['CURRICULO_POLL_SEGUNDOS'] = 5
+app.config['CURRICULO_MAX_CARACTERES'] = 100000
+# Conexões ociosas mantidas abertas por processo e reaproveitadas entre requisições (0 = uma nova por requisição)
+app.config['DB_POOL_SIZE'] = 8
+# Qualquer configuração acima pode ser trocada por variável de ambiente com o prefixo TINDERJOB_
+# (ex.: TINDERJOB_DATABASE=/srv/tinder.db, TINDERJOB_CURRICULO_WORKERS=0; valores em JSON viram números/booleanos)
+app.config.from_prefixed_env('TINDERJOB')
+Bootstrap5(app)
+
+# Extensões permitidas para upload
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
+
+# Pastas de upload (nome usado em arquivos.pasta -> chave da configuração com o diretório)
+UPLOAD_FOLDERS = {'fotos': 'UPLOAD_FOLDER', 'logo': 'UPLOAD_FOLDER_LOGO', 'curriculos': 'UPLOAD_FOLDER_CURRICULO'}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Imagens enviadas ganham variantes WebP redimensionadas: "card" para os cartões e perfis,
+# "thumb" para o mural de logos. O processamento roda num pool fora da thread da requisição
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+IMAGE_VARIANTS = {'card': (600, 600), 'thumb': (160, 160)}
+IMAGE_QUALITY = 80
+image_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='imagens')
+
+# Habilidades disponíveis nos formulários. A posição de cada uma define o seu bit
+# em habilidades_mask, então novas habilidades devem ser sempre adicionadas no final
+HABILIDADES_CHOICES = [
+    ('python', 'Python'),
+    ('html', 'HTML'),
+    ('java', 'Java'),
+    ('javascript', 'JavaScript'),
+    ('c', 'C'),
+    ('c++', 'C++'),
+    ('csharp', 'C#'),
+    ('php', 'PHP'),
+    ('ruby', 'Ruby'),
+    ('sql', 'SQL')
+]
+HABILIDADES_BITS = {valor: 1 << posicao for posicao, (valor, _) in enumerate(HABILIDADES_CHOICES)}
+
+# Pragmas aplicados a cada conexão: WAL para leitores não bloquearem durante likes,
+# fsync só nos checkpoints, espera em vez de erro quando o banco está ocupado,
+# cache de páginas de ~20 MB e leitura via mmap
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),
+    ('cache_size', -20000),
+    ('mmap_size', 268435456),
+)
+
+# Conexão que mede cada comando e soma o tempo na instrumentação da requisição atual;
+# comandos lentos têm o plano (EXPLAIN QUERY PLAN) registrado no log
+class InstrumentedConnection(sqlite3.Connection):
+    def execute(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self.record(sql, parametros, time.perf_counter() - inicio)
+
+    def executemany(self, sql, parametros):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            self.record(sql, None, time.perf_counter() - inicio)
+
+    def record(self, sql, parametros, segundos):
+        metricas = g.get('instrumentacao') if has_request_context() else None
+        if metricas is not None:
+            metricas['sql_count'] += 1
+            metricas['sql'] += segundos
+        with metrics_lock:
+            sql_metrics['queries'] += 1
+            sql_metrics['seconds'] += segundos
+        if segundos * 1000 < app.config['SLOW_QUERY_MS'] or sql.lstrip()[:7].upper() == 'EXPLAIN':
+            return
+        plano = []
+        if parametros is not None:
+            try:
+                plano = [linha[3] for linha in super().execute(f'EXPLAIN QUERY PLAN {sql}', parametros)]
+            except sqlite3.Error:
+                pass
+        with metrics_lock:
+            sql_metrics['slow'] += 1
+        app.logger.warning('Consulta lenta (%.1f ms): %s | plano: %s', segundos * 1000, ' '.join(sql.split()), '; '.join(plano))
+
+# Função para abrir uma nova conexão configurada com o banco de dados
+# (compartilhada=True para as conexões do pool, que passam por várias threads, uma de cada vez)
+def open_db(compartilhada=False):
+    fabrica = InstrumentedConnection if app.config['INSTRUMENTATION'] else sqlite3.Connection
+    conn = sqlite3.connect(app.config['DATABASE'], cached_statements=256, factory=fabrica, check_same_thread=not compartilhada)
+    conn.row_factory = sqlite3.Row
+    for pragma, valor in SQLITE_PRAGMAS:
+        conn.execute(f'PRAGMA {pragma} = {valor}')
+    conn.create_function('swipe_arquivado', 2, swipe_arquivado, deterministic=True)
+    return conn
+
+# Pool de conexões das requisições: evita abrir o arquivo, aplicar os pragmas e ler o esquema a cada requisição.
+# Cada conexão guarda a chave (processo, banco, instrumentação) com que foi aberta; as que não batem são descartadas
+db_pool = []
+db_pool_lock = threading.Lock()
+
+# Função para a chave das conexões do pool (um fork não herda as conexões do processo pai)
+def db_pool_key():
+    return os.getpid(), app.config['DATABASE'], app.config['INSTRUMENTATION']
+
+# Função para pegar uma conexão do pool ou abrir uma nova
+def acquire_db():
+    chave = db_pool_key()
+    with db_pool_lock:
+        while db_pool:
+            dono, conn = db_pool.pop()
+            if dono == chave:
+                return conn
+            if dono[0] == chave[0]:
+                conn.close()
+    return open_db(compartilhada=True)
+
+# Função para devolver uma conexão ao pool (desfazendo o que ficou pendente) ou fechá-la se o pool está cheio
+def release_db(conn):
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.ProgrammingError:
+        # Conexão já fechada por quem a usou
+        return
+    with db_pool_lock:
+        if len(db_pool) < app.config['DB_POOL_SIZE']:
+            db_pool.append((db_pool_key(), conn))
+            return
+    conn.close()
+
+# Função para conectar ao banco de dados
+# (dentro de uma requisição a conexão vem do pool via g e é devolvida no teardown)
+def connect_db():
+    if not has_app_context():
+        return open_db()
+    if 'db' not in g:
+        g.db = acquire_db()
+    return g.db
+
+# Devolve a conexão da requisição ao pool ao final do contexto da aplicação
+@app.teardown_appcontext
+def close_db(exception):
+    conn = g.pop('db', None)
+    if conn is not None:
+        release_db(conn)
+
+# Métricas agregadas da instrumentação: histograma de latência por rota e totais de SQL
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+route_metrics = {}
+sql_metrics = {'queries': 0, 'seconds': 0.0, 'slow': 0}
+metrics_lock = threading.Lock()
+profile_counter = itertools.count(1)
+# Um cProfile ativo por processo: com várias threads atendendo requisições, uma sorteada enquanto outra
+# ainda está sendo perfilada fica sem perfil em vez de disputar o profiler
+profile_lock = threading.Lock()
+
+# Decorador que soma o tempo da função numa categoria da instrumentação da requisição (ex.: "io")
+def timed(categoria):
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            metricas = g.get('instrumentacao') if has_request_context() else None
+            if metricas is None:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                metricas[categoria] += time.perf_counter() - inicio
+        return wrapper
+    return decorador
+
+# Início da instrumentação da requisição (e do cProfile, na requisição sorteada)
+@app.before_request
+def start_instrumentation():
+    if not app.config['INSTRUMENTATION']:
+        return
+    g.instrumentacao = {'inicio': time.perf_counter(), 'sql_count': 0, 'sql': 0.0, 'template': 0.0, 'io': 0.0}
+    a_cada = app.config['PROFILE_EVERY_N']
+    if a_cada and next(profile_counter) % a_cada == 0 and profile_lock.acquire(blocking=False):
+        perfilador = cProfile.Profile()
+        try:
+            perfilador.enable()
+        except BaseException:
+            profile_lock.release()
+            raise
+        g.perfilador = perfilador
+
+# Mede o tempo de renderização dos templates (páginas em streaming contam só até o início da resposta)
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    if 'instrumentacao' in g:
+        g.template_inicio = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def stop_template_timer(sender, template, context, **extra):
+    inicio = g.pop('template_inicio', None)
+    if inicio is not None and 'instrumentacao' in g:
+        g.instrumentacao['template'] += time.perf_counter() - inicio
+
+# Fecha a instrumentação: cabeçalho Server-Timing e histograma da rota
+@app.after_request
+def finish_instrumentation(response):
+    metricas = g.get('instrumentacao')
+    if metricas is None:
+        return response
+    total = time.perf_counter() - metricas['inicio']
+    response.headers['Server-Timing'] = (f'sql;dur={metricas["sql"] * 1000:.2f};desc="{metricas["sql_count"]} consultas", '
+                                         f'tpl;dur={metricas["template"] * 1000:.2f}, io;dur={metricas["io"] * 1000:.2f}, '
+                                         f'total;dur={total * 1000:.2f}')
+    rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+    with metrics_lock:
+        registro = route_metrics.setdefault((request.method, rota), {'buckets': [0] * len(LATENCY_BUCKETS), 'soma': 0.0, 'total': 0})
+        for posicao, limite in enumerate(LATENCY_BUCKETS):
+            if total <= limite:
+                registro['buckets'][posicao] += 1
+        registro['soma'] += total
+        registro['total'] += 1
+    return response
+
+# Grava o cProfile da requisição sorteada em PROFILE_DIR
+@app.teardown_request
+def save_profile(exception):
+    perfilador = g.pop('perfilador', None)
+    if perfilador is None:
+        return
+    try:
+        perfilador.disable()
+    finally:
+        profile_lock.release()
+    os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+    nome = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.endpoint or "desconhecida"}-{uuid.uuid4().hex[:8]}.prof'
+    perfilador.dump_stats(os.path.join(app.config['PROFILE_DIR'], nome))
+
+# Função para verificar se o arquivo tem a extensão permitida
+def allowed_file(filename):
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+# Função para converter a lista de habilidades (ou o texto "python, sql") em máscara de bits
+def skills_mask(habilidades):
+    if isinstance(habilidades, str):
+        habilidades = habilidades.split(', ')
+    mask = 0
+    for habilidade in habilidades or []:
+        mask |= HABILIDADES_BITS.get(habilidade.strip(), 0)
+    return mask
+
+# Função para interpretar os campos livres de experiência ("Sim", "Não", "2 anos"...) como 0 ou 1
+def experiencia_flag(texto):
+    texto = (texto or '').strip().lower()
+    return 0 if not texto or texto[0] in ('n', '0') else 1
+
+# Função para converter os campos opcionais (Decimal ou vazio) em float ou None
+def optional_float(valor):
+    return None if valor is None else float(valor)
+
+# Função para adicionar uma coluna a uma tabela já existente, se ela ainda não existir
+def add_column_if_missing(conn, tabela, coluna, definicao):
+    colunas = [row[1] for row in conn.execute(f'PRAGMA table_info({tabela})')]
+    if coluna not in colunas:
+        conn.execute(f'ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}')
+
+# Função para criar o índice único de login de uma tabela
+# (bancos antigos com valores repetidos ficam com um índice comum até que as duplicatas sejam resolvidas)
+def create_login_index(conn, tabela, coluna):
+    duplicado = conn.execute(f'SELECT {coluna} FROM {tabela} GROUP BY {coluna} HAVING COUNT(*) > 1 LIMIT 1').fetchone()
+    if duplicado:
+        app.logger.warning('%s.%s tem valores repetidos (%r); índice único não criado.', tabela, coluna, duplicado[0])
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{tabela}_{coluna} ON {tabela} ({coluna})')
+        return
+    conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS uq_{tabela}_{coluna} ON {tabela} ({coluna})')
+    conn.execute(f'DROP INDEX IF EXISTS idx_{tabela}_{coluna}')
+
+# Criação da tabela de desenvolvedores
+def create_table():
+    with open_db() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS devs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        email TEXT NOT NULL,
+                        cel TEXT NOT NULL,
+                        habilidades TEXT NOT NULL,
+                        senha TEXT NOT NULL,
+                        foto TEXT NOT NULL,
+                        curriculo TEXT,
+                        tem_experiencia TEXT,
+                        habilidades_mask INTEGER,
+                        experiencia_flag INTEGER,
+                        salario_pretendido REAL,
+                        horas_semanais_max INTEGER
+                        )''')
+        # Bancos criados antes do ranking por habilidades recebem as colunas e são preenchidos aqui
+        add_column_if_missing(conn, 'devs', 'habilidades_mask', 'INTEGER')
+        add_column_if_missing(conn, 'devs', 'experiencia_flag', 'INTEGER')
+        # Preferências do desenvolvedor usadas no ranking (NULL = sem preferência)
+        add_column_if_missing(conn, 'devs', 'salario_pretendido', 'REAL')
+        add_column_if_missing(conn, 'devs', 'horas_semanais_max', 'INTEGER')
+        pendentes = conn.execute('SELECT id, habilidades, tem_experiencia FROM devs WHERE habilidades_mask IS NULL').fetchall()
+        conn.executemany('UPDATE devs SET habilidades_mask = ?, experiencia_flag = ? WHERE id = ?',
+                         [(skills_mask(dev['habilidades']), experiencia_flag(dev['tem_experiencia']), dev['id']) for dev in pendentes])
+        # Índice de cobertura do ranking: as preferências entram para o encaixe de salário e horas ser calculado no índice
+        conn.execute('DROP INDEX IF EXISTS idx_devs_ranking')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_devs_ranking_encaixe
+                        ON devs (habilidades_mask, experiencia_flag, salario_pretendido, horas_semanais_max)''')
+        create_login_index(conn, 'devs', 'email')
+    conn.close()
+
+# Criação da tabela de empresas
+def create_empresa_table():
+    with open_db() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS empresas (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        nome_empresa TEXT NOT NULL,
+                        cnpj TEXT NOT NULL,
+                        setor TEXT NOT NULL,
+                        endereco TEXT NOT NULL,
+                        email TEXT NOT NULL,
+                        telefone TEXT NOT NULL,
+                        senha TEXT NOT NULL,
+                        logo TEXT,
+                        habilidades TEXT,
+                        horas_semanais INTEGER,
+                        horas_diarias INTEGER,
+                        salario_ofertado REAL,
+                        experiencia_necessaria TEXT,
+                        habilidades_mask INTEGER,
+                        experiencia_flag INTEGER
+                        )''')
+        add_column_if_missing(conn, 'empresas', 'habilidades_mask', 'INTEGER')
+        add_column_if_missing(conn, 'empresas', 'experiencia_flag', 'INTEGER')
+        pendentes = conn.execute('SELECT id, habilidades, experiencia_necessaria FROM empresas WHERE habilidades_mask IS NULL').fetchall()
+        conn.executemany('UPDATE empresas SET habilidades_mask = ?, experiencia_flag = ? WHERE id = ?',
+                         [(skills_mask(empresa['habilidades']), experiencia_flag(empresa['experiencia_necessaria']), empresa['id']) for empresa in pendentes])
+        # Índice parcial só com as empresas que têm logo, usado pelo mural da página inicial
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_empresas_logo ON empresas (id, logo) WHERE logo IS NOT NULL''')
+        conn.execute('DROP INDEX IF EXISTS idx_empresas_ranking')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_empresas_ranking_encaixe
+                        ON empresas (habilidades_mask, experiencia_flag, salario_ofertado, horas_semanais)''')
+        # As mesmas colunas na ordem do baralho (salário sem valor por último), para os grupos com muitas empresas
+        # serem lidos já ordenados e a fila retomar do cursor com uma busca no índice
+        conn.execute('DROP INDEX IF EXISTS idx_empresas_ranking_salario')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_empresas_ranking_ordem
+                        ON empresas (COALESCE(salario_ofertado, -1) DESC, id, habilidades_mask, experiencia_flag, salario_ofertado, horas_semanais)''')
+        create_login_index(conn, 'empresas', 'cnpj')
+    conn.close()
+
+# Criação da tabela de matches
+def create_matches_table():
+    with open_db() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS matches (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        dev_id INTEGER NOT NULL,
+                        empresa_id INTEGER NOT NULL,
+                        dev_status TEXT NOT NULL DEFAULT 'pending' CHECK(dev_status IN ('like', 'dislike', 'pending')),
+                        empresa_status TEXT NOT NULL DEFAULT 'pending' CHECK(empresa_status IN ('like', 'dislike', 'pending')),
+                        UNIQUE(dev_id, empresa_id)
+                        )''')
+        # Momento (epoch) do último swipe do par, usado para decidir o que já pode ser arquivado
+        add_column_if_missing(conn, 'matches', 'atualizado_em', 'INTEGER')
+        # Índices de cobertura usados pelo anti-join da fila de swipe
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_matches_dev_swipe ON matches (dev_id, dev_status, empresa_id)''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_matches_empresa_swipe ON matches (empresa_id, empresa_status, dev_id)''')
+        # Os índices parciais da fila "curtiu você" não são mais usados (o planejador prefere os de swipe acima)
+        conn.execute('DROP INDEX IF EXISTS idx_matches_dev_admiradores')
+        conn.execute('DROP INDEX IF EXISTS idx_matches_empresa_admiradores')
+
+        # Matches mútuos materializados, mantidos pelos triggers abaixo a cada escrita em matches
+        conn.execute('''CREATE TABLE IF NOT EXISTS mutual_matches (
+                        dev_id INTEGER NOT NULL,
+                        empresa_id INTEGER NOT NULL,
+                        matched_at TEXT NOT NULL,
+                        PRIMARY KEY (dev_id, empresa_id)
+                        ) WITHOUT ROWID''')
+        # Um índice por lado, na ordem das páginas de matches (mais recentes primeiro)
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_mutual_matches_dev ON mutual_matches (dev_id, matched_at, empresa_id)''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_mutual_matches_empresa ON mutual_matches (empresa_id, matched_at, dev_id)''')
+        # Os triggers testam se o par já está em mutual_matches em vez de usar INSERT OR IGNORE: dentro de um trigger
+        # o tratamento de conflito do comando externo (o upsert do swipe) prevalece, e um like repetido num match
+        # existente viraria erro de chave única. Recriados para trocar a versão antiga nos bancos já migrados
+        conn.execute('DROP TRIGGER IF EXISTS trg_matches_mutual_insert')
+        conn.execute('DROP TRIGGER IF EXISTS trg_matches_mutual_update')
+        conn.execute('''CREATE TRIGGER trg_matches_mutual_insert AFTER INSERT ON matches
+                        WHEN NEW.dev_status = 'like' AND NEW.empresa_status = 'like'
+                        BEGIN
+                            INSERT INTO mutual_matches (dev_id, empresa_id, matched_at)
+                            SELECT NEW.dev_id, NEW.empresa_id, strftime('%Y-%m-%d %H:%M:%f', 'now')
+                            WHERE NOT EXISTS (SELECT 1 FROM mutual_matches WHERE dev_id = NEW.dev_id AND empresa_id = NEW.empresa_id);
+                        END''')
+        conn.execute('''CREATE TRIGGER trg_matches_mutual_update AFTER UPDATE OF dev_status, empresa_status ON matches
+                        BEGIN
+                            INSERT INTO mutual_matches (dev_id, empresa_id, matched_at)
+                            SELECT NEW.dev_id, NEW.empresa_id, strftime('%Y-%m-%d %H:%M:%f', 'now')
+                            WHERE NEW.dev_status = 'like' AND NEW.empresa_status = 'like'
+                              AND NOT EXISTS (SELECT 1 FROM mutual_matches WHERE dev_id = NEW.dev_id AND empresa_id = NEW.empresa_id);
+                            DELETE FROM mutual_matches
+                            WHERE dev_id = NEW.dev_id AND empresa_id = NEW.empresa_id
+                              AND NOT (NEW.dev_status = 'like' AND NEW.empresa_status = 'like');
+                        END''')
+        # Outbox de notificações: cada novo match mútuo gera, na mesma transação, um aviso para cada lado
+        conn.execute('''CREATE TABLE IF NOT EXISTS notifications (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        destinatario_tipo TEXT NOT NULL CHECK(destinatario_tipo IN ('dev', 'empresa')),
+                        destinatario_id INTEGER NOT NULL,
+                        evento TEXT NOT NULL,
+                        dev_id INTEGER NOT NULL,
+                        empresa_id INTEGER NOT NULL,
+                        criado_em TEXT NOT NULL
+                        )''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_notifications_destinatario ON notifications (destinatario_tipo, destinatario_id, id)''')
+        # Swipes arquivados: os pares antigos sem nenhum like saem de matches e cada dislike fica no blob
+        # de quem o deu, com os ids avaliados ordenados (inteiros sem sinal de 4 bytes), lido só para
+        # excluir candidatos do baralho
+        conn.execute('''CREATE TABLE IF NOT EXISTS swipes_arquivados (
+                        tipo TEXT NOT NULL CHECK(tipo IN ('dev', 'empresa')),
+                        perfil_id INTEGER NOT NULL,
+                        ids BLOB NOT NULL,
+                        quantidade INTEGER NOT NULL,
+                        PRIMARY KEY (tipo, perfil_id)
+                        )''')
+        # Cursor da fila de cada usuário: a posição no ranking dele (pontuação, desempate e id do candidato) antes da qual
+        # todos os candidatos já foram avaliados, válida para a assinatura do ranking (máscara, experiência, preferências
+        # e pesos). ultimo_id e ultima_alteracao marcam o que o banco tinha quando o cursor foi gravado: perfis criados
+        # ou alterados depois são buscados à parte, já que podem ter caído antes do cursor
+        conn.execute('''CREATE TABLE IF NOT EXISTS baralho_cursores (
+                        tipo TEXT NOT NULL CHECK(tipo IN ('dev', 'empresa')),
+                        perfil_id INTEGER NOT NULL,
+                        assinatura TEXT NOT NULL,
+                        score INTEGER NOT NULL,
+                        ordem REAL NOT NULL,
+                        candidato_id INTEGER NOT NULL,
+                        ultimo_id INTEGER NOT NULL,
+                        ultima_alteracao INTEGER NOT NULL,
+                        PRIMARY KEY (tipo, perfil_id)
+                        ) WITHOUT ROWID''')
+        # Perfis cujas colunas de ranking mudaram, em ordem (AUTOINCREMENT: os ids nunca voltam, nem com a tabela vazia)
+        conn.execute('''CREATE TABLE IF NOT EXISTS ranking_alteracoes (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        tipo TEXT NOT NULL CHECK(tipo IN ('dev', 'empresa')),
+                        perfil_id INTEGER NOT NULL
+                        )''')
+        for tabela, tipo, colunas in (('devs', 'dev', RANKING_COLUMNS['devs']), ('empresas', 'empresa', RANKING_COLUMNS['empresas'])):
+            conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_ranking_alteracao AFTER UPDATE OF {', '.join(colunas)} ON {tabela}
+                             WHEN {' OR '.join(f'NEW.{coluna} IS NOT OLD.{coluna}' for coluna in colunas)}
+                             BEGIN
+                                 INSERT INTO ranking_alteracoes (tipo, perfil_id) VALUES ('{tipo}', NEW.id);
+                             END''')
+        # Admiradores pendentes: quantos perfis do outro lado curtiram cada usuário e esperam a resposta dele,
+        # mantido pelos triggers abaixo a cada escrita em matches (a página de swipe não precisa de COUNT(*))
+        conn.execute('''CREATE TABLE IF NOT EXISTS admiradores (
+                        tipo TEXT NOT NULL CHECK(tipo IN ('dev', 'empresa')),
+                        perfil_id INTEGER NOT NULL,
+                        quantidade INTEGER NOT NULL,
+                        PRIMARY KEY (tipo, perfil_id)
+                        ) WITHOUT ROWID''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_matches_admiradores_insert AFTER INSERT ON matches
+                         BEGIN
+                             {ADMIRADORES_INCREMENT_SQL}
+                         END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_matches_admiradores_update AFTER UPDATE OF dev_status, empresa_status ON matches
+                         BEGIN
+                             {ADMIRADORES_DECREMENT_SQL}
+                             {ADMIRADORES_INCREMENT_SQL}
+                         END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_matches_admiradores_delete AFTER DELETE ON matches
+                         BEGIN
+                             {ADMIRADORES_DECREMENT_SQL}
+                         END''')
+        # Migração: matches mútuos que já existiam antes da tabela materializada
+        conn.execute('''INSERT OR IGNORE INTO mutual_matches (dev_id, empresa_id, matched_at)
+                        SELECT dev_id, empresa_id, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM matches
+                        WHERE dev_status = 'like' AND empresa_status = 'like'
+                          AND NOT EXISTS (SELECT 1 FROM mutual_matches)''')
+        # O aviso de novo match só é ligado depois da migração acima, para os matches antigos não gerarem notificações.
+        # Só o primeiro match do par avisa: desfazer e refazer o like apaga e reinsere a linha de mutual_matches,
+        # e o par que já tem aviso não ganha outro (consulta pelo índice idx_notifications_par)
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_notifications_par ON notifications (dev_id, empresa_id, evento)''')
+        conn.execute('DROP TRIGGER IF EXISTS trg_mutual_matches_notify')
+        conn.execute('''CREATE TRIGGER trg_mutual_matches_notify AFTER INSERT ON mutual_matches
+                        BEGIN
+                            INSERT INTO notifications (destinatario_tipo, destinatario_id, evento, dev_id, empresa_id, criado_em)
+                            SELECT tipo, perfil_id, 'match', NEW.dev_id, NEW.empresa_id, NEW.matched_at
+                            FROM (SELECT 'dev' AS tipo, NEW.dev_id AS perfil_id UNION ALL SELECT 'empresa', NEW.empresa_id)
+                            WHERE NOT EXISTS (SELECT 1 FROM notifications
+                                              WHERE dev_id = NEW.dev_id AND empresa_id = NEW.empresa_id AND evento = 'match');
+                        END''')
+        # Migração: likes pendentes que já existiam antes dos contadores
+        conn.execute('''INSERT INTO admiradores (tipo, perfil_id, quantidade)
+                        SELECT 'dev', dev_id, COUNT(*) FROM matches
+                        WHERE empresa_status = 'like' AND dev_status = 'pending' AND NOT EXISTS (SELECT 1 FROM admiradores)
+                        GROUP BY dev_id
+                        UNION ALL
+                        SELECT 'empresa', empresa_id, COUNT(*) FROM matches
+                        WHERE dev_status = 'like' AND empresa_status = 'pending' AND NOT EXISTS (SELECT 1 FROM admiradores)
+                        GROUP BY empresa_id''')
+    conn.close()
+
+# Colunas que definem a posição de um perfil no ranking de quem está do outro lado
+RANKING_COLUMNS = {
+    'devs': ['habilidades_mask', 'experiencia_flag', 'salario_pretendido', 'horas_semanais_max'],
+    'empresas': ['habilidades_mask', 'experiencia_flag', 'salario_ofertado', 'horas_semanais'],
+}
+
+# Corpo dos triggers de admiradores: uma linha de matches conta para o dev quando a empresa curtiu e ele ainda não
+# respondeu (e vice-versa); o trigger de UPDATE tira a contagem da linha antiga e soma a da nova
+ADMIRADORES_INCREMENT_SQL = '''INSERT INTO admiradores (tipo, perfil_id, quantidade)
+                             SELECT 'dev', NEW.dev_id, 1 WHERE NEW.empresa_status = 'like' AND NEW.dev_status = 'pending'
+                             UNION ALL
+                             SELECT 'empresa', NEW.empresa_id, 1 WHERE NEW.dev_status = 'like' AND NEW.empresa_status = 'pending'
+                             ON CONFLICT(tipo, perfil_id) DO UPDATE SET quantidade = quantidade + 1;'''
+ADMIRADORES_DECREMENT_SQL = '''UPDATE admiradores SET quantidade = quantidade - 1
+                             WHERE tipo = 'dev' AND perfil_id = OLD.dev_id AND OLD.empresa_status = 'like' AND OLD.dev_status = 'pending';
+                             UPDATE admiradores SET quantidade = quantidade - 1
+                             WHERE tipo = 'empresa' AND perfil_id = OLD.empresa_id AND OLD.dev_status = 'like' AND OLD.empresa_status = 'pending';'''
+
+# Colunas textuais espelhadas em cada índice de busca (FTS5 com conteúdo externo: o texto fica só na tabela original)
+SEARCH_FTS_COLUMNS = {
+    'devs': ['name', 'habilidades', 'tem_experiencia'],
+    'empresas': ['nome_empresa', 'setor', 'endereco', 'habilidades', 'experiencia_necessaria'],
+}
+
+# Função para criar o índice FTS5 "<tabela>_fts" das colunas indicadas e os triggers que o mantêm em sincronia
+def create_fts_index(conn, tabela, colunas):
+    lista = ', '.join(colunas)
+    novos = ', '.join(f'NEW.{coluna}' for coluna in colunas)
+    antigos = ', '.join(f'OLD.{coluna}' for coluna in colunas)
+    conn.execute(f'''CREATE VIRTUAL TABLE IF NOT EXISTS {tabela}_fts USING fts5(
+                     {lista}, content='{tabela}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_insert AFTER INSERT ON {tabela}
+                     BEGIN
+                         INSERT INTO {tabela}_fts (rowid, {lista}) VALUES (NEW.id, {novos});
+                     END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_delete AFTER DELETE ON {tabela}
+                     BEGIN
+                         INSERT INTO {tabela}_fts ({tabela}_fts, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+                     END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_update AFTER UPDATE OF {lista} ON {tabela}
+                     BEGIN
+                         INSERT INTO {tabela}_fts ({tabela}_fts, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+                         INSERT INTO {tabela}_fts (rowid, {lista}) VALUES (NEW.id, {novos});
+                     END''')
+    # Migração: linhas que já existiam antes do índice
+    if conn.execute(f'SELECT 1 FROM {tabela}_fts_docsize LIMIT 1').fetchone() is None:
+        conn.execute(f"INSERT INTO {tabela}_fts ({tabela}_fts) VALUES ('rebuild')")
+
+# Criação dos índices de busca textual (FTS5), mantidos em sincronia com devs e empresas por triggers
+def create_search_tables():
+    with open_db() as conn:
+        for tabela, colunas in SEARCH_FTS_COLUMNS.items():
+            create_fts_index(conn, tabela, colunas)
+        # Índices dos filtros da busca de empresas
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_empresas_setor ON empresas (setor, salario_ofertado)''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_empresas_salario ON empresas (salario_ofertado)''')
+    conn.close()
+
+# Criação das tabelas normalizadas de habilidades (índice invertido habilidade -> perfis)
+def create_skills_tables():
+    with open_db() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS skills (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        nome TEXT NOT NULL UNIQUE
+                        )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS dev_skills (
+                        skill_id INTEGER NOT NULL REFERENCES skills(id),
+                        dev_id INTEGER NOT NULL REFERENCES devs(id),
+                        PRIMARY KEY (skill_id, dev_id)
+                        ) WITHOUT ROWID''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS empresa_skills (
+                        skill_id INTEGER NOT NULL REFERENCES skills(id),
+                        empresa_id INTEGER NOT NULL REFERENCES empresas(id),
+                        PRIMARY KEY (skill_id, empresa_id)
+                        ) WITHOUT ROWID''')
+        # A chave primária atende "quem tem a habilidade X"; estes índices atendem "quais habilidades o perfil Y tem"
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_dev_skills_dev ON dev_skills (dev_id, skill_id)''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_empresa_skills_empresa ON empresa_skills (empresa_id, skill_id)''')
+        conn.executemany('INSERT OR IGNORE INTO skills (nome) VALUES (?)', [(valor,) for valor, _ in HABILIDADES_CHOICES])
+
+        # Migração: preenche as tabelas a partir das colunas de texto "python, sql" dos perfis ainda não migrados
+        devs = conn.execute('''SELECT id, habilidades FROM devs
+                               WHERE habilidades != '' AND NOT EXISTS (SELECT 1 FROM dev_skills WHERE dev_skills.dev_id = devs.id)''').fetchall()
+        for dev in devs:
+            set_profile_skills(conn, 'dev', dev['id'], dev['habilidades'].split(', '))
+        empresas = conn.execute('''SELECT id, habilidades FROM empresas
+                                   WHERE habilidades != '' AND NOT EXISTS (SELECT 1 FROM empresa_skills WHERE empresa_skills.empresa_id = empresas.id)''').fetchall()
+        for empresa in empresas:
+            set_profile_skills(conn, 'empresa', empresa['id'], empresa['habilidades'].split(', '))
+    conn.close()
+
+# Criação da tabela de imagens processadas (hash do conteúdo e dimensões do original)
+def create_images_table():
+    with open_db() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS imagens (
+                        arquivo TEXT PRIMARY KEY,
+                        sha256 TEXT NOT NULL,
+                        largura INTEGER NOT NULL,
+                        altura INTEGER NOT NULL,
+                        processado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                        )''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_imagens_sha256 ON imagens (sha256)''')
+    conn.close()
+
+# Função para montar o nome de uma variante redimensionada ("dev_x.png" -> "dev_x.card.webp")
+def variant_filename(filename, variante):
+    return f"{os.path.splitext(filename)[0]}.{variante}.webp"
+
+# Função executada no pool de imagens: calcula o hash do original e grava as variantes WebP
+def process_image(pasta, filename):
+    caminho = os.path.join(pasta, filename)
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(65536), b''):
+            sha256.update(bloco)
+    with Image.open(caminho) as original:
+        imagem = ImageOps.exif_transpose(original)
+        if imagem.mode not in ('RGB', 'RGBA'):
+            imagem = imagem.convert('RGBA')
+        largura, altura = imagem.size
+        for variante, tamanho in IMAGE_VARIANTS.items():
+            copia = imagem.copy()
+            copia.thumbnail(tamanho, Image.LANCZOS)
+            destino = os.path.join(pasta, variant_filename(filename, variante))
+            copia.save(destino + '.tmp', 'WEBP', quality=IMAGE_QUALITY, method=4)
+            os.replace(destino + '.tmp', destino)
+    conn = open_db()
+    try:
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO imagens (arquivo, sha256, largura, altura) VALUES (?, ?, ?, ?)',
+                         (filename, sha256.hexdigest(), largura, altura))
+    finally:
+        conn.close()
+
+# Função chamada ao fim de cada processamento para registrar falhas (imagem corrompida, formato inválido)
+def report_image_failure(filename, futuro):
+    if futuro.exception() is not None:
+        app.logger.error('Falha ao processar a imagem %s: %s', filename, futuro.exception())
+
+# Função para agendar o processamento de uma imagem recém-enviada, sem segurar a requisição
+def schedule_image_processing(pasta, filename):
+    if not filename or filename.rsplit('.', 1)[-1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    # Conteúdo repetido reaproveita o arquivo (e as variantes) que já estavam em disco
+    if all(os.path.exists(os.path.join(pasta, variant_filename(filename, variante))) for variante in IMAGE_VARIANTS):
+        return None
+    futuro = image_pool.submit(process_image, pasta, filename)
+    futuro.add_done_callback(functools.partial(report_image_failure, filename))
+    return futuro
+
+# Função usada nos templates para escolher a variante de uma imagem enviada;
+# enquanto a variante ainda não foi gerada, o original é servido
+@app.template_global()
+def image_variant(pasta, filename, variante):
+    variante_filename = variant_filename(filename, variante)
+    if os.path.exists(os.path.join(app.config[UPLOAD_FOLDERS[pasta]], variante_filename)):
+        return f'{pasta}/{variante_filename}'
+    return f'{pasta}/{filename}'
+
+# Criação da tabela de arquivos enviados (armazenamento endereçado por conteúdo com contagem de referências)
+def create_uploads_table():
+    with open_db() as conn:
+        novo = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'arquivos'").fetchone() is None
+        conn.execute('''CREATE TABLE IF NOT EXISTS arquivos (
+                        pasta TEXT NOT NULL,
+                        arquivo TEXT NOT NULL,
+                        sha256 TEXT,
+                        tamanho INTEGER,
+                        refs INTEGER NOT NULL DEFAULT 0,
+                        criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (pasta, arquivo)
+                        ) WITHOUT ROWID''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_arquivos_refs ON arquivos (refs, criado_em)''')
+        # Os triggers mantêm "refs" em dia com devs.foto, devs.curriculo e empresas.logo
+        conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_devs_arquivos_insert AFTER INSERT ON devs
+                        BEGIN
+                            UPDATE arquivos SET refs = refs + 1
+                            WHERE (pasta = 'fotos' AND arquivo = NEW.foto) OR (pasta = 'curriculos' AND arquivo = NEW.curriculo);
+                        END''')
+        conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_devs_arquivos_update AFTER UPDATE OF foto, curriculo ON devs
+                        BEGIN
+                            UPDATE arquivos SET refs = refs - 1
+                            WHERE (pasta = 'fotos' AND arquivo = OLD.foto AND OLD.foto IS NOT NEW.foto)
+                               OR (pasta = 'curriculos' AND arquivo = OLD.curriculo AND OLD.curriculo IS NOT NEW.curriculo);
+                            UPDATE arquivos SET refs = refs + 1
+                            WHERE (pasta = 'fotos' AND arquivo = NEW.foto AND OLD.foto IS NOT NEW.foto)
+                               OR (pasta = 'curriculos' AND arquivo = NEW.curriculo AND OLD.curriculo IS NOT NEW.curriculo);
+                        END''')
+        conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_devs_arquivos_delete AFTER DELETE ON devs
+                        BEGIN
+                            UPDATE arquivos SET refs = refs - 1
+                            WHERE (pasta = 'fotos' AND arquivo = OLD.foto) OR (pasta = 'curriculos' AND arquivo = OLD.curriculo);
+                        END''')
+        conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_empresas_arquivos_insert AFTER INSERT ON empresas
+                        BEGIN
+                            UPDATE arquivos SET refs = refs + 1 WHERE pasta = 'logo' AND arquivo = NEW.logo;
+                        END''')
+        conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_empresas_arquivos_update AFTER UPDATE OF logo ON empresas
+                        WHEN OLD.logo IS NOT NEW.logo
+                        BEGIN
+                            UPDATE arquivos SET refs = refs - 1 WHERE pasta = 'logo' AND arquivo = OLD.logo;
+                            UPDATE arquivos SET refs = refs + 1 WHERE pasta = 'logo' AND arquivo = NEW.logo;
+                        END''')
+        conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_empresas_arquivos_delete AFTER DELETE ON empresas
+                        BEGIN
+                            UPDATE arquivos SET refs = refs - 1 WHERE pasta = 'logo' AND arquivo = OLD.logo;
+                        END''')
+        # Migração: arquivos enviados antes desta tabela entram sem hash e com as referências recontadas
+        if novo:
+            recount_upload_refs(conn)
+        # Texto extraído dos currículos, por arquivo (conteúdo repetido é extraído uma vez só), com busca textual
+        conn.execute('''CREATE TABLE IF NOT EXISTS curriculos_texto (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        arquivo TEXT NOT NULL UNIQUE,
+                        texto TEXT NOT NULL,
+                        habilidades TEXT NOT NULL,
+                        habilidades_mask INTEGER NOT NULL,
+                        extraido_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                        )''')
+        create_fts_index(conn, 'curriculos_texto', ['texto'])
+        # Fila de extração: "disponivel_em" é quando um job pendente pode ser tentado de novo
+        # ou quando vence o prazo de um job em execução
+        conn.execute('''CREATE TABLE IF NOT EXISTS curriculo_jobs (
+                        arquivo TEXT PRIMARY KEY,
+                        status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'running', 'done', 'failed')),
+                        tentativas INTEGER NOT NULL DEFAULT 0,
+                        disponivel_em REAL NOT NULL DEFAULT 0,
+                        erro TEXT,
+                        criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        concluido_em TEXT
+                        ) WITHOUT ROWID''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS idx_curriculo_jobs_fila ON curriculo_jobs (status, disponivel_em)''')
+    conn.close()
+
+# Função para recalcular do zero a contagem de referências de todos os arquivos
+# (arquivos usados pelos perfis que ainda não constam na tabela são registrados antes)
+def recount_upload_refs(conn):
+    conn.execute('''INSERT OR IGNORE INTO arquivos (pasta, arquivo)
+                    SELECT 'fotos', foto FROM devs WHERE foto IS NOT NULL
+                    UNION SELECT 'curriculos', curriculo FROM devs WHERE curriculo IS NOT NULL
+                    UNION SELECT 'logo', logo FROM empresas WHERE logo IS NOT NULL''')
+    conn.execute('''UPDATE arquivos SET refs = CASE pasta
+                        WHEN 'fotos' THEN (SELECT COUNT(*) FROM devs WHERE devs.foto = arquivos.arquivo)
+                        WHEN 'curriculos' THEN (SELECT COUNT(*) FROM devs WHERE devs.curriculo = arquivos.arquivo)
+                        WHEN 'logo' THEN (SELECT COUNT(*) FROM empresas WHERE empresas.logo = arquivos.arquivo)
+                    END''')
+
+# Erro levantado quando um arquivo enviado passa de UPLOAD_MAX_BYTES (vira uma resposta 413)
+class UploadTooLarge(RequestEntityTooLarge):
+    description = 'O arquivo enviado é maior que o limite permitido.'
+
+# Função para gravar um arquivo enviado em blocos, calculando o SHA-256 durante a cópia.
+# O nome final é derivado do conteúdo, então o mesmo arquivo enviado de novo reaproveita
+# o que já está em disco em vez de gerar outra cópia
+@timed('io')
+def store_upload(file, pasta, prefixo):
+    if not file or not allowed_file(file.filename):
+        return None
+    diretorio = app.config[UPLOAD_FOLDERS[pasta]]
+    extension = os.path.splitext(secure_filename(file.filename))[1].lower()
+    limite = app.config['UPLOAD_MAX_BYTES']
+    sha256 = hashlib.sha256()
+    tamanho = 0
+    temporario = os.path.join(diretorio, f'.upload_{uuid.uuid4()}')
+    try:
+        with open(temporario, 'wb') as destino:
+            for bloco in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                tamanho += len(bloco)
+                if tamanho > limite:
+                    raise UploadTooLarge()
+                sha256.update(bloco)
+                destino.write(bloco)
+        filename = f'{prefixo}_{sha256.hexdigest()}{extension}'
+        caminho = os.path.join(diretorio, filename)
+        if os.path.exists(caminho):
+            # Reaproveitado: renova a data para a coleta de órfãos não apagar o arquivo antes de o perfil ser gravado
+            os.remove(temporario)
+            os.utime(caminho)
+        else:
+            os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    with connect_db() as conn:
+        conn.execute('INSERT OR IGNORE INTO arquivos (pasta, arquivo, sha256, tamanho) VALUES (?, ?, ?, ?)',
+                     (pasta, filename, sha256.hexdigest(), tamanho))
+    return filename
+
+# Nome dado por store_upload a um arquivo enviado ("dev_<sha256>.png") e às suas variantes ("dev_<sha256>.card.webp")
+UPLOAD_NAME_RE = re.compile(r'[a-z]+_[0-9a-f]{64}(?:\.[a-z0-9]+)*')
+
+# Função para apagar arquivos órfãos: sem referência nos perfis e mais antigos que o período de carência
+# (a carência protege uploads cuja linha de perfil ainda não foi gravada). Só mexe nos nomes gerados por
+# store_upload e nos arquivos registrados na tabela; o resto da pasta (arquivos ocultos, uploads em andamento)
+# fica como está. Retorna a lista do que foi (ou seria) apagado
+def collect_orphan_uploads(carencia_segundos=3600, simular=False):
+    removidos = []
+    limite = time.time() - carencia_segundos
+    with connect_db() as conn:
+        recount_upload_refs(conn)
+        # Variantes ("x.card.webp") seguem o original, por isso a comparação é pelo nome sem extensão
+        registrados = {}
+        for row in conn.execute('SELECT pasta, arquivo, refs FROM arquivos'):
+            chave = (row['pasta'], row['arquivo'].split('.', 1)[0])
+            registrados[chave] = registrados.get(chave, 0) + row['refs']
+        for pasta, config in UPLOAD_FOLDERS.items():
+            diretorio = app.config[config]
+            if not os.path.isdir(diretorio):
+                continue
+            arquivos = [(nome, os.path.join(diretorio, nome)) for nome in os.listdir(diretorio)]
+            arquivos = [(nome, caminho) for nome, caminho in arquivos if os.path.isfile(caminho)]
+            # Um original ou variante recente protege o grupo inteiro
+            recentes = {nome.split('.', 1)[0] for nome, caminho in arquivos if os.path.getmtime(caminho) > limite}
+            for nome, caminho in arquivos:
+                base = nome.split('.', 1)[0]
+                if base in recentes or registrados.get((pasta, base)):
+                    continue
+                if not UPLOAD_NAME_RE.fullmatch(nome) and (pasta, base) not in registrados:
+                    continue
+                removidos.append((caminho, os.path.getsize(caminho)))
+                if not simular:
+                    os.remove(caminho)
+                    conn.execute('DELETE FROM arquivos WHERE pasta = ? AND arquivo = ?', (pasta, nome))
+                    conn.execute('DELETE FROM imagens WHERE arquivo = ?', (nome,))
+                    conn.execute('DELETE FROM curriculos_texto WHERE arquivo = ?', (nome,))
+                    conn.execute('DELETE FROM curriculo_jobs WHERE arquivo = ?', (nome,))
+    return removidos
+
+# Comando "flask gc-uploads" para recuperar o espaço de arquivos que nenhum perfil usa mais
+@app.cli.command('gc-uploads')
+@click.option('--carencia', default=3600, show_default=True, help='Idade mínima (segundos) de um arquivo para ser apagado.')
+@click.option('--simular', is_flag=True, help='Só lista o que seria apagado.')
+def gc_uploads_command(carencia, simular):
+    removidos = collect_orphan_uploads(carencia, simular)
+    for caminho, tamanho in removidos:
+        click.echo(f'{caminho} ({tamanho} bytes)')
+    total = sum(tamanho for _, tamanho in removidos)
+    click.echo(f"{len(removidos)} arquivo(s), {total} bytes {'seriam liberados' if simular else 'liberados'}")
+
+# Expressões para reconhecer no texto do currículo as habilidades do formulário
+# ("C" só maiúsculo e isolado, para não confundir com "c/" ou com iniciais)
+RESUME_SKILL_PATTERNS = {
+    'python': re.compile(r'\bpython\b', re.I),
+    'html': re.compile(r'\bhtml5?\b', re.I),
+    'java': re.compile(r'\bjava\b(?!\s*script)', re.I),
+    'javascript': re.compile(r'\b(?:javascript|ecmascript|node\.?js)\b', re.I),
+    'c': re.compile(r'(?<![\w+#/.-])C(?![\w+#/-])'),
+    'c++': re.compile(r'(?<!\w)c\+\+', re.I),
+    'csharp': re.compile(r'(?<!\w)(?:c#|c sharp|csharp)(?!\w)', re.I),
+    'php': re.compile(r'\bphp\b', re.I),
+    'ruby': re.compile(r'\bruby\b', re.I),
+    'sql': re.compile(r'\b(?:my|postgre)?sql\b|\bpostgres\b|\bsqlite\b', re.I),
+}
+
+# Limite do conteúdo descompactado de cada stream de PDF ou do XML de um .docx (proteção contra arquivos-bomba)
+RESUME_MAX_EXPANDED = 16 * 1024 * 1024
+
+# Streams de um PDF ("endstream" não conta) e os tokens do conteúdo de uma página: strings literais,
+# strings hexadecimais, colchetes dos arrays do TJ, nomes, números e operadores
+PDF_STREAM_RE = re.compile(rb'(?<!end)stream\r?\n')
+PDF_TOKEN_RE = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>|\[|\]|/[^\s/\[\]()<>]+|-?\d*\.?\d+|[A-Za-z\'"*]+', re.S)
+PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f', b'\n': b'', b'\r': b''}
+
+# Erro de um currículo que nunca vai ser extraído (arquivo ausente, formato desconhecido ou corrompido):
+# o job falha de vez, sem novas tentativas
+class ResumeFormatError(ValueError):
+    pass
+
+# Função para decodificar uma string literal de PDF, "(texto com \) e \351)"
+def pdf_literal(token):
+    def escape(match):
+        codigo = match.group(1)
+        if codigo[:1].isdigit():
+            return bytes([int(codigo, 8) & 0xFF])
+        return PDF_ESCAPES.get(codigo, codigo)
+    return re.sub(rb'\\([0-7]{1,3}|.)', escape, token[1:-1], flags=re.S).decode('latin-1')
+
+# Função para decodificar uma string hexadecimal de PDF, "<48656C6C6F>" (UTF-16 quando começa com o BOM)
+def pdf_hex(token):
+    digitos = re.sub(rb'\s', b'', token[1:-1])
+    dados = bytes.fromhex((digitos + b'0' * (len(digitos) % 2)).decode())
+    return dados[2:].decode('utf-16-be', 'ignore') if dados.startswith(b'\xfe\xff') else dados.decode('latin-1')
+
+# Função para tirar o texto do conteúdo de uma página: junta as strings mostradas por Tj, TJ, ' e ",
+# troca os ajustes grandes de espaçamento dentro do TJ por espaço e quebra a linha nos operadores de mudança de linha
+def pdf_content_text(conteudo):
+    linhas, linha, operandos = [], [], []
+    dentro_array = False
+    for token in PDF_TOKEN_RE.findall(conteudo):
+        inicial = token[:1]
+        if inicial == b'(':
+            operandos.append(pdf_literal(token))
+        elif inicial == b'<':
+            operandos.append(pdf_hex(token))
+        elif token in (b'[', b']'):
+            dentro_array = token == b'['
+        elif inicial in b'-.0123456789' or inicial == b'/':
+            if dentro_array and inicial != b'/' and float(token) < -200:
+                operandos.append(' ')
+        else:
+            if token in (b"'", b'"', b'T*', b'Td', b'TD', b'ET'):
+                linhas.append(''.join(linha))
+                linha = []
+            if token in (b'Tj', b'TJ', b"'", b'"'):
+                linha.extend(operandos)
+            operandos = []
+    linhas.append(''.join(linha))
+    return '\n'.join(linhas)
+
+# Função para extrair o texto de um PDF só com a biblioteca padrão: percorre os streams de conteúdo
+# (descompactando os FlateDecode e pulando imagens e fontes) e lê os operadores de texto.
+# PDFs escaneados ou com fontes de codificação própria rendem pouco ou nenhum texto
+def extract_pdf_text(dados):
+    partes = []
+    for inicio in PDF_STREAM_RE.finditer(dados):
+        fim = dados.find(b'endstream', inicio.end())
+        if fim < 0:
+            break
+        cabecalho = dados[max(0, inicio.start() - 1024):inicio.start()]
+        posicao = cabecalho.rfind(b' obj')
+        if posicao >= 0:
+            cabecalho = cabecalho[posicao:]
+        if any(marca in cabecalho for marca in (b'/Image', b'/FontFile', b'/Length1', b'/XRef', b'/ObjStm')):
+            continue
+        conteudo = dados[inicio.end():fim]
+        if b'/FlateDecode' in cabecalho:
+            try:
+                conteudo = zlib.decompressobj().decompress(conteudo, RESUME_MAX_EXPANDED)
+            except zlib.error:
+                continue
+        elif b'/Filter' in cabecalho:
+            continue
+        if b'BT' in conteudo:
+            partes.append(pdf_content_text(conteudo))
+    return '\n'.join(partes)
+
+# Função para extrair o texto de um .docx (ZIP com o documento em word/document.xml)
+def extract_docx_text(dados):
+    try:
+        with zipfile.ZipFile(io.BytesIO(dados)) as documento:
+            if documento.getinfo('word/document.xml').file_size > RESUME_MAX_EXPANDED:
+                raise ResumeFormatError('documento grande demais')
+            xml = documento.read('word/document.xml').decode('utf-8', 'replace')
+    except (zipfile.BadZipFile, KeyError):
+        raise ResumeFormatError('arquivo .docx inválido')
+    xml = re.sub(r'</w:p>|<w:(?:br|cr)\b[^>]*/>', '\n', xml)
+    xml = re.sub(r'<w:tab\b[^>]*/>', '\t', xml)
+    return html.unescape(re.sub(r'<[^>]+>', '', xml))
+
+# Função para extrair o texto de um .doc (formato binário do Word 97-2003) por aproximação: o texto fica
+# em trechos UTF-16 ou de 8 bits dentro do arquivo; fica a versão que render mais caracteres
+def extract_doc_text(dados):
+    utf16 = [trecho.decode('utf-16-le') for trecho in re.findall(rb'(?:[\x20-\x7e\xa0-\xff\r\t]\x00){4,}', dados)]
+    oito_bits = [trecho.decode('cp1252', 'ignore') for trecho in re.findall(rb'[\x20-\x7e\xa0-\xff\r\t]{12,}', dados)]
+    return '\n'.join(utf16 if sum(map(len, utf16)) > sum(map(len, oito_bits)) else oito_bits)
+
+# Função executada no pool de processos: lê o currículo, extrai o texto conforme o formato (reconhecido
+# pelo conteúdo, não pela extensão) e detecta as habilidades citadas. Retorna (texto, habilidades, bytes lidos, segundos)
+def extract_resume(caminho, max_caracteres):
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+    except FileNotFoundError:
+        raise ResumeFormatError('arquivo não encontrado')
+    if dados.startswith(b'%PDF'):
+        texto = extract_pdf_text(dados)
+    elif dados.startswith(b'PK\x03\x04'):
+        texto = extract_docx_text(dados)
+    elif dados.startswith(b'\xd0\xcf\x11\xe0'):
+        texto = extract_doc_text(dados)
+    else:
+        raise ResumeFormatError('formato de currículo não reconhecido')
+    texto = re.sub(r'[^\S\n]+', ' ', texto)
+    texto = re.sub(r' ?\n[\s]*', '\n', texto).strip()[:max_caracteres]
+    habilidades = [habilidade for habilidade, padrao in RESUME_SKILL_PATTERNS.items() if padrao.search(texto)]
+    return texto, habilidades, len(dados), time.perf_counter() - inicio
+
+# Função para enfileirar a extração de um currículo na transação de quem gravou o perfil
+# (o mesmo arquivo, já que o nome vem do hash do conteúdo, entra na fila uma vez só)
+def enqueue_resume(conn, arquivo):
+    if arquivo:
+        conn.execute('INSERT OR IGNORE INTO curriculo_jobs (arquivo) VALUES (?)', (arquivo,))
+
+# Função para reservar até "limite" jobs: pendentes cuja espera já passou e em execução com o prazo vencido
+# (o processo que os reservou morreu). O UPDATE ... RETURNING é atômico, então vários processos podem
+# consumir a mesma fila sem pegar o mesmo job. Retorna [(arquivo, tentativa)]
+def claim_resume_jobs(limite):
+    agora = time.time()
+    conn = open_db()
+    try:
+        with conn:
+            conn.execute('''UPDATE curriculo_jobs SET status = 'failed', erro = 'prazo esgotado em todas as tentativas'
+                            WHERE status = 'running' AND disponivel_em <= ? AND tentativas >= ?''',
+                         (agora, app.config['CURRICULO_MAX_TENTATIVAS']))
+            return [tuple(row) for row in conn.execute('''UPDATE curriculo_jobs SET status = 'running', tentativas = tentativas + 1, disponivel_em = :prazo
+                                                          WHERE arquivo IN (SELECT arquivo FROM curriculo_jobs
+                                                                            WHERE status IN ('pending', 'running') AND disponivel_em <= :agora
+                                                                            ORDER BY disponivel_em LIMIT :limite)
+                                                          RETURNING arquivo, tentativas''',
+                                                       {'agora': agora, 'prazo': agora + app.config['CURRICULO_LEASE_SEGUNDOS'], 'limite': limite}).fetchall()]
+    finally:
+        conn.close()
+
+# Função para gravar um lote de textos extraídos [(arquivo, texto, habilidades)] e concluir os jobs na mesma transação
+def complete_resume_jobs(resultados):
+    conn = open_db()
+    try:
+        with conn:
+            conn.executemany('''INSERT INTO curriculos_texto (arquivo, texto, habilidades, habilidades_mask) VALUES (?, ?, ?, ?)
+                                ON CONFLICT(arquivo) DO UPDATE SET texto = excluded.texto, habilidades = excluded.habilidades,
+                                                                   habilidades_mask = excluded.habilidades_mask, extraido_em = CURRENT_TIMESTAMP''',
+                             [(arquivo, texto, ', '.join(habilidades), skills_mask(habilidades)) for arquivo, texto, habilidades in resultados])
+            conn.executemany("UPDATE curriculo_jobs SET status = 'done', erro = NULL, concluido_em = CURRENT_TIMESTAMP WHERE arquivo = ?",
+                             [(arquivo,) for arquivo, _, _ in resultados])
+    finally:
+        conn.close()
+
+# Função para registrar a falha de um job: volta para a fila com espera exponencial (com variação aleatória,
+# para falhas simultâneas não voltarem todas juntas) ou falha de vez se o erro é permanente ou acabaram as tentativas.
+# Retorna True quando o job desistiu
+def fail_resume_job(arquivo, tentativa, erro, permanente):
+    desistir = permanente or tentativa >= app.config['CURRICULO_MAX_TENTATIVAS']
+    espera = app.config['CURRICULO_BACKOFF_SEGUNDOS'] * 2 ** (tentativa - 1) * random.uniform(0.8, 1.2)
+    conn = open_db()
+    try:
+        with conn:
+            conn.execute('UPDATE curriculo_jobs SET status = ?, erro = ?, disponivel_em = ? WHERE arquivo = ?',
+                         ('failed' if desistir else 'pending', f'{type(erro).__name__}: {erro}', time.time() + espera, arquivo))
+    finally:
+        conn.close()
+    return desistir
+
+# Fila de extração de currículos guardada no banco (sobrevive a reinícios e pode ser dividida entre processos).
+# Uma thread manda a extração para um pool de "workers" processos (o limite de concorrência, sem disputar a CPU
+# com as requisições) e grava os resultados em lote. Ela reserva até o dobro de jobs, para que um processo
+# que termina já tenha o próximo na fila do pool enquanto a thread grava no banco
+class ResumeQueue:
+    def __init__(self, workers, iniciar=True):
+        self.workers = workers
+        self.pool = self.new_pool()
+        self.running = {}
+        self.cond = threading.Condition()
+        self.woken = True
+        self.started = time.monotonic()
+        self.stats = {'concluidos': 0, 'falhas': 0, 'retentativas': 0, 'bytes': 0, 'caracteres': 0, 'segundos': 0.0}
+        if iniciar:
+            threading.Thread(target=self.run, name='curriculos', daemon=True).start()
+
+    # "spawn" porque o servidor é multithread e um fork copiaria locks que outras threads estão segurando
+    def new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    # Avisa que há job novo ou que uma extração terminou
+    def wake(self):
+        with self.cond:
+            self.woken = True
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            try:
+                self.step(app.config['CURRICULO_POLL_SEGUNDOS'])
+            except sqlite3.Error:
+                app.logger.exception('Falha na fila de currículos')
+                time.sleep(app.config['CURRICULO_POLL_SEGUNDOS'])
+
+    # Uma rodada: ocupa as vagas livres com jobs da fila, espera um aviso (ou o timeout) e grava
+    # o que terminou. Retorna quantos jobs continuam em andamento
+    def step(self, timeout):
+        livres = 2 * self.workers - len(self.running)
+        if livres > 0:
+            for arquivo, tentativa in claim_resume_jobs(livres):
+                caminho = os.path.join(app.config['UPLOAD_FOLDER_CURRICULO'], arquivo)
+                futuro = self.pool.submit(extract_resume, caminho, app.config['CURRICULO_MAX_CARACTERES'])
+                self.running[futuro] = (arquivo, tentativa)
+                futuro.add_done_callback(lambda _: self.wake())
+        with self.cond:
+            self.cond.wait_for(lambda: self.woken, timeout=timeout)
+            self.woken = False
+        resultados = []
+        quebrado = False
+        for futuro in [futuro for futuro in self.running if futuro.done()]:
+            arquivo, tentativa = self.running.pop(futuro)
+            try:
+                texto, habilidades, tamanho, segundos = futuro.result()
+            except Exception as erro:
+                desistiu = fail_resume_job(arquivo, tentativa, erro, isinstance(erro, ResumeFormatError))
+                if desistiu:
+                    app.logger.warning('Currículo %s não extraído: %s', arquivo, erro)
+                with self.cond:
+                    self.stats['falhas' if desistiu else 'retentativas'] += 1
+                quebrado |= isinstance(erro, BrokenProcessPool)
+                continue
+            resultados.append((arquivo, texto, habilidades))
+            with self.cond:
+                self.stats['concluidos'] += 1
+                self.stats['bytes'] += tamanho
+                self.stats['caracteres'] += len(texto)
+                self.stats['segundos'] += segundos
+        if resultados:
+            complete_resume_jobs(resultados)
+        # Um processo do pool morreu (ex.: falta de memória): o pool é recriado e os jobs afetados voltam para a fila
+        if quebrado:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = self.new_pool()
+        return len(self.running)
+
+    # Encerra o pool e devolve à fila, sem gastar tentativa, os jobs que estavam em andamento
+    def stop(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        pendentes = [(arquivo,) for arquivo, _ in self.running.values()]
+        self.running = {}
+        if pendentes:
+            conn = open_db()
+            try:
+                with conn:
+                    conn.executemany('''UPDATE curriculo_jobs SET status = 'pending', tentativas = tentativas - 1, disponivel_em = 0
+                                        WHERE arquivo = ? AND status = 'running' ''', pendentes)
+            finally:
+                conn.close()
+
+resume_queue = None
+resume_queue_lock = threading.Lock()
+
+# Função para obter a fila de currículos deste processo, criando-a na primeira vez
+# (None quando CURRICULO_WORKERS = 0 e a extração fica com um worker separado)
+def get_resume_queue():
+    global resume_queue
+    if not app.config['CURRICULO_WORKERS']:
+        return None
+    with resume_queue_lock:
+        if resume_queue is None:
+            resume_queue = ResumeQueue(app.config['CURRICULO_WORKERS'])
+            atexit.register(resume_queue.stop)
+    return resume_queue
+
+# Função para avisar a fila, depois do commit, que há currículo novo para extrair
+def wake_resume_queue():
+    fila = get_resume_queue()
+    if fila is not None:
+        fila.wake()
+
+# Função para processar a fila com "processos" workers até não sobrar job pendente
+# (ou para sempre, no modo contínuo), mostrando o progresso a cada 5 segundos
+def drain_resume_queue(processos, continuo=False):
+    fila = ResumeQueue(processos, iniciar=False)
+    ultimo = time.monotonic()
+
+    def progresso():
+        segundos = time.monotonic() - fila.started
+        click.echo(f"{fila.stats['concluidos']} concluído(s), {fila.stats['falhas']} falha(s), {fila.stats['retentativas']} retentativa(s) "
+                   f"em {segundos:.1f}s ({fila.stats['concluidos'] / segundos if segundos else 0:,.1f} currículos/s)", err=True)
+
+    try:
+        while True:
+            em_andamento = fila.step(1.0)
+            if time.monotonic() - ultimo >= 5:
+                progresso()
+                ultimo = time.monotonic()
+            if not em_andamento and not continuo:
+                conn = open_db()
+                try:
+                    restantes = conn.execute("SELECT 1 FROM curriculo_jobs WHERE status = 'pending' LIMIT 1").fetchone()
+                finally:
+                    conn.close()
+                if restantes is None:
+                    break
+    finally:
+        fila.stop()
+    progresso()
+    return fila.stats
+
+# Grupo de comandos "flask curriculos" para a extração de texto fora do servidor web
+curriculos_cli = AppGroup('curriculos', help='Extração de texto dos currículos enviados.')
+
+# Comando "flask curriculos backfill": enfileira todos os currículos já enviados e processa a fila até o fim
+@curriculos_cli.command('backfill', with_appcontext=False)
+@click.option('--processos', default=os.cpu_count() or 2, show_default=True, help='Processos de extração.')
+@click.option('--refazer', is_flag=True, help='Extrai de novo também os currículos já processados ou que falharam.')
+def curriculos_backfill_command(processos, refazer):
+    migrate_db()
+    conn = open_db()
+    try:
+        with conn:
+            if refazer:
+                conn.execute("UPDATE curriculo_jobs SET status = 'pending', tentativas = 0, disponivel_em = 0, erro = NULL")
+            novos = conn.execute('''INSERT OR IGNORE INTO curriculo_jobs (arquivo)
+                                    SELECT DISTINCT curriculo FROM devs WHERE curriculo IS NOT NULL AND curriculo != '' ''').rowcount
+    finally:
+        conn.close()
+    click.echo(f'{novos} currículo(s) enfileirado(s)')
+    drain_resume_queue(processos)
+
+# Comando "flask curriculos processar": worker separado do servidor web (com CURRICULO_WORKERS = 0 no servidor)
+@curriculos_cli.command('processar', with_appcontext=False)
+@click.option('--processos', default=os.cpu_count() or 2, show_default=True, help='Processos de extração.')
+@click.option('--continuo', is_flag=True, help='Continua esperando novos currículos quando a fila esvazia.')
+def curriculos_processar_command(processos, continuo):
+    migrate_db()
+    drain_resume_queue(processos, continuo)
+
+app.cli.add_command(curriculos_cli)
+
+# Tabela de ligação e coluna de id de cada tipo de perfil
+SKILL_TABLES = {'dev': ('dev_skills', 'dev_id'), 'empresa': ('empresa_skills', 'empresa_id')}
+
+# Função para regravar as habilidades de um perfil nas tabelas normalizadas
+def set_profile_skills(conn, tipo, perfil_id, habilidades):
+    tabela, coluna = SKILL_TABLES[tipo]
+    conn.execute(f'DELETE FROM {tabela} WHERE {coluna} = ?', (perfil_id,))
+    conn.execute(f'''INSERT OR IGNORE INTO {tabela} (skill_id, {coluna})
+                     SELECT id, ? FROM skills WHERE nome IN (SELECT value FROM json_each(?))''',
+                 (perfil_id, json.dumps([habilidade.strip() for habilidade in habilidades])))
+
+# Função para listar os ids de perfis com as habilidades pedidas. Com todas=True é um AND
+# (INTERSECT das faixas do índice de cada habilidade); com todas=False é um OR (UNION).
+# A paginação é por chave: só retorna ids maiores que "depois_de"
+def find_profiles_by_skills(tipo, habilidades, todas=True, depois_de=0, limit=50):
+    habilidades = [habilidade for habilidade in habilidades if habilidade]
+    if not habilidades:
+        return []
+    tabela, coluna = SKILL_TABLES[tipo]
+    faixa = f'''SELECT {coluna} AS perfil_id FROM {tabela}
+                WHERE skill_id = (SELECT id FROM skills WHERE nome = ?) AND {coluna} > ?'''
+    operador = ' INTERSECT ' if todas else ' UNION '
+    params = []
+    for habilidade in habilidades:
+        params.extend((habilidade, depois_de))
+    with connect_db() as conn:
+        rows = conn.execute(f'SELECT perfil_id FROM ({operador.join([faixa] * len(habilidades))}) ORDER BY perfil_id LIMIT ?',
+                            params + [limit]).fetchall()
+    return [row['perfil_id'] for row in rows]
+
+# Função para buscar desenvolvedores por habilidades (ex.: Python E SQL)
+def find_devs_by_skills(habilidades, todas=True, depois_de=0, limit=50):
+    ids = find_profiles_by_skills('dev', habilidades, todas, depois_de, limit)
+    with connect_db() as conn:
+        devs = conn.execute(f'''SELECT {DEV_CARD_COLUMNS} FROM devs WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id''',
+                            (json.dumps(ids),)).fetchall()
+    return devs
+
+# Função para buscar empresas por habilidades procuradas
+def find_empresas_by_skills(habilidades, todas=True, depois_de=0, limit=50):
+    ids = find_profiles_by_skills('empresa', habilidades, todas, depois_de, limit)
+    with connect_db() as conn:
+        empresas = conn.execute(f'''SELECT {EMPRESA_CARD_COLUMNS} FROM empresas WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id''',
+                                (json.dumps(ids),)).fetchall()
+    return empresas
+
+# Colunas exibidas nos cartões de swipe (senha e currículo nunca saem do banco por aqui)
+DEV_CARD_COLUMNS = 'id, name, email, cel, habilidades, foto, tem_experiencia'
+EMPRESA_CARD_COLUMNS = 'id, nome_empresa, setor, endereco, logo, habilidades, horas_semanais, horas_diarias, salario_ofertado, experiencia_necessaria'
+
+# Tamanho padrão do baralho de candidatos guardado em cache para cada usuário
+DECK_SIZE = 20
+
+# Cache de baralhos por usuário: (tipo, id) -> (validade, cartões, completo), LRU com validade (TTL) como o
+# cache de perfis. "completo" indica que o banco não tinha mais candidatos além dos cartões guardados
+deck_cache = OrderedDict()
+deck_lock = threading.Lock()
+deck_stats = {'hits': 0, 'misses': 0, 'refills': 0, 'refill_rows': 0, 'refill_ms': 0.0, 'evictions': 0, 'expired': 0}
+
+# Contagens do ranking por banco e tabela: (banco, tabela) -> (validade, {habilidades_mask * 2 + experiencia_flag: perfis}, total)
+ranking_stats = {}
+ranking_stats_lock = threading.Lock()
+
+# Pesos do ranking: cada habilidade em comum vale SKILL_WEIGHT pontos, a experiência compatível vale
+# EXPERIENCIA_WEIGHT e o salário e a carga horária compatíveis valem SALARIO_WEIGHT e HORAS_WEIGHT;
+# dentro da mesma pontuação o salário (empresas) e o id desempatam
+SKILL_WEIGHT = 4
+EXPERIENCIA_WEIGHT = 2
+SALARIO_WEIGHT = 3
+HORAS_WEIGHT = 2
+
+# Desempate dentro de uma pontuação no baralho de empresas (as sem salário por último), igual ao do índice idx_empresas_ranking_ordem
+EMPRESA_ORDEM_SQL = 'COALESCE(salario_ofertado, -1)'
+
+# Encaixe de salário e carga horária de cada lado, comparado com as preferências de quem busca (:salario e :horas).
+# Um valor desconhecido dos dois lados (NULL) conta como compatível. O desenvolvedor procura salário ofertado de pelo
+# menos o pretendido e carga horária de no máximo a que aceita; a empresa procura o inverso
+ENCAIXE_SQL = {
+    'empresa': ('COALESCE(salario_ofertado >= :salario, 1)', 'COALESCE(horas_semanais <= :horas, 1)'),
+    'dev': ('COALESCE(salario_pretendido <= :salario, 1)', 'COALESCE(horas_semanais_max >= :horas, 1)'),
+}
+
+# A mesma pontuação calculada em SQL, para ordenar os admiradores no banco: as habilidades em comum são contadas
+# bit a bit na máscara (:mask é a do usuário) e :compativeis traz as flags de experiência compatíveis
+SCORE_SQL = (f"{SKILL_WEIGHT} * ("
+             + ' + '.join(f'((COALESCE(habilidades_mask, 0) & :mask) >> {bit} & 1)' for bit in range(len(HABILIDADES_CHOICES)))
+             + f") + {EXPERIENCIA_WEIGHT} * COALESCE(experiencia_flag IN (SELECT value FROM json_each(:compativeis)), 0)")
+
+# Pontuação completa de cada lado: habilidades e experiência mais o encaixe de salário e carga horária
+SCORE_SQL_BY_TIPO = {tipo: f'{SCORE_SQL} + {SALARIO_WEIGHT} * {salario} + {HORAS_WEIGHT} * {horas}'
+                     for tipo, (salario, horas) in ENCAIXE_SQL.items()}
+
+# Chave de grupo de um candidato no banco: máscara, flag de experiência e encaixe (salário * 2 + horas) num só
+# inteiro, calculado só com colunas do índice de ranking
+CHAVE_SQL_BY_TIPO = {tipo: f'habilidades_mask * 8 + experiencia_flag * 4 + {salario} * 2 + {horas}'
+                     for tipo, (salario, horas) in ENCAIXE_SQL.items()}
+
+# Função para listar os encaixes (salário * 2 + horas) que um candidato pode ter: sem preferência de quem busca
+# o componente é sempre compatível, então os grupos que nunca teriam linhas nem chegam a ser consultados
+def fit_codes(salario, horas):
+    return tuple(s * 2 + h for s in ((1,) if salario is None else (0, 1)) for h in ((1,) if horas is None else (0, 1)))
+
+# Função para agrupar todas as combinações possíveis de (habilidades_mask, experiencia_flag, encaixe)
+# de um candidato pela pontuação que elas têm para quem está buscando, da maior para a menor.
+# Como a pontuação só depende de colunas do índice de ranking, o ranking vira uma sequência de buscas
+# nesse índice, parando assim que o baralho estiver cheio. Máscaras e flags continuam na consulta
+# para o índice ser percorrido só nos trechos do grupo; as chaves separam os encaixes dentro deles
+@functools.lru_cache(maxsize=4096)
+def score_buckets(mask, flags_compativeis, encaixes=(3,)):
+    por_comum = {}
+    for candidato in range(1 << len(HABILIDADES_CHOICES)):
+        por_comum.setdefault((candidato & mask).bit_count(), []).append(candidato)
+    grupos = {}
+    for em_comum, candidatos in por_comum.items():
+        for flag in (0, 1):
+            for encaixe in encaixes:
+                score = (SKILL_WEIGHT * em_comum + EXPERIENCIA_WEIGHT * (flag in flags_compativeis)
+                         + SALARIO_WEIGHT * (encaixe >> 1) + HORAS_WEIGHT * (encaixe & 1))
+                grupos.setdefault(score, []).append((candidatos, flag, encaixe))
+    buckets = []
+    for score, combinacoes in sorted(grupos.items(), reverse=True):
+        masks = sorted({candidato for candidatos, _, _ in combinacoes for candidato in candidatos})
+        flags = sorted({flag for _, flag, _ in combinacoes})
+        chaves = [candidato * 8 + flag * 4 + encaixe for candidatos, flag, encaixe in combinacoes for candidato in candidatos]
+        pares = tuple({candidato * 2 + flag for candidatos, flag, _ in combinacoes for candidato in candidatos})
+        buckets.append((score, json.dumps(masks), json.dumps(flags), json.dumps(chaves), pares))
+    return buckets
+
+# Função para contar os perfis de uma tabela por (habilidades_mask, experiencia_flag), guardando o resultado
+# por RANKING_STATS_TTL segundos (perfis novos só mudam a escolha do plano, nunca o resultado)
+def ranking_counts(conn, tabela):
+    chave = (app.config['DATABASE'], tabela)
+    with ranking_stats_lock:
+        guardado = ranking_stats.get(chave)
+    if guardado is None or guardado[0] <= time.monotonic():
+        contagem = dict(conn.execute(f'SELECT habilidades_mask * 2 + experiencia_flag, COUNT(*) FROM {tabela} GROUP BY 1').fetchall())
+        guardado = (time.monotonic() + app.config['RANKING_STATS_TTL'], contagem, sum(contagem.values()))
+        with ranking_stats_lock:
+            ranking_stats[chave] = guardado
+    return guardado[1], guardado[2]
+
+# Função para buscar até "limit" candidatos ainda não avaliados, grupo de pontuação por grupo, a partir da posição
+# "cursor" (score, ordem, id): os grupos acima dela são pulados e o grupo dela começa nela. Cada consulta tem
+# dois planos: o índice de ranking, que ordena todas as linhas do grupo, e o índice na ordem do baralho, que para
+# nas primeiras "limit" que entram no grupo. O segundo compensa quando o grupo tem mais de raiz(total * limit)
+# perfis: os dois então leem no máximo essa quantidade de linhas
+def fetch_ranked(conn, sqls, params, buckets, limit, contagem, total, cursor=None):
+    cards = []
+    for score, masks, flags, chaves, pares in buckets:
+        if cursor is not None and score > cursor[0]:
+            continue
+        inicio = cursor[1:] if cursor is not None and score == cursor[0] else (math.inf, 0)
+        restantes = limit - len(cards)
+        estimativa = sum(contagem.get(par, 0) for par in pares)
+        rows = conn.execute(sqls[estimativa * estimativa >= total * restantes],
+                            dict(params, score=score, masks=masks, flags=flags, chaves=chaves, limit=restantes,
+                                 cursor_ordem=inicio[0], cursor_id=inicio[1])).fetchall()
+        cards.extend(dict(row) for row in rows)
+        if len(cards) >= limit:
+            break
+    return cards
+
+# Filtro de um grupo nas consultas abaixo. Com as máscaras e flags o banco busca o grupo pelo índice de ranking e
+# ordena as linhas dele; só com as chaves (que nenhum índice resolve) resta percorrer o índice na ordem do baralho,
+# parando no LIMIT, que é o plano dos grupos grandes (ver fetch_ranked)
+def bucket_filter(tipo, denso):
+    chaves = f"{CHAVE_SQL_BY_TIPO[tipo]} IN (SELECT value FROM json_each(:chaves))"
+    if denso:
+        return chaves
+    return f'''habilidades_mask IN (SELECT value FROM json_each(:masks))
+                                        AND experiencia_flag IN (SELECT value FROM json_each(:flags))
+                                        AND {chaves}'''
+
+# Consulta de um grupo de pontuação de empresas (anti-join indexado: cada candidata é descartada
+# por uma busca no índice idx_matches_dev_swipe, sem carregar as empresas já vistas para o Python).
+# A subconsulta ordena só ids por um dos índices de cobertura (idx_empresas_ranking_encaixe ou, nos grupos grandes,
+# idx_empresas_ranking_ordem) e as colunas do cartão são lidas apenas para as linhas que entram no baralho.
+# :cursor_ordem e :cursor_id começam o grupo na posição do cursor (infinito e 0 quando o grupo é lido desde o topo)
+EMPRESA_BUCKET_SQL = {denso: f'''SELECT {EMPRESA_CARD_COLUMNS}, :score AS score, 0 AS curtiu FROM empresas
+                         WHERE id IN (SELECT id FROM empresas
+                                      WHERE {bucket_filter('empresa', denso)}
+                                        AND {EMPRESA_ORDEM_SQL} <= :cursor_ordem
+                                        AND ({EMPRESA_ORDEM_SQL} < :cursor_ordem OR id >= :cursor_id)
+                                        AND NOT EXISTS (SELECT 1 FROM matches
+                                                        WHERE matches.dev_id = :user_id
+                                                          AND matches.dev_status IN ('like', 'dislike')
+                                                          AND matches.empresa_id = empresas.id)
+                                        AND (:arquivados IS NULL OR NOT swipe_arquivado(:arquivados, empresas.id))
+                                      ORDER BY {EMPRESA_ORDEM_SQL} DESC, id LIMIT :limit)
+                         ORDER BY {EMPRESA_ORDEM_SQL} DESC, id''' for denso in (False, True)}
+
+# Consulta de um grupo de pontuação de desenvolvedores (mesmo anti-join, pelo índice idx_matches_empresa_swipe;
+# nas duas consultas os swipes já arquivados são descartados por swipe_arquivado). Aqui a ordem do baralho é a do id,
+# então o plano dos grupos grandes percorre a própria tabela
+DEV_BUCKET_SQL = {denso: f'''SELECT {DEV_CARD_COLUMNS}, :score AS score, 0 AS curtiu FROM devs
+                     WHERE id IN (SELECT id FROM devs
+                                  WHERE {bucket_filter('dev', denso)}
+                                    AND id >= :cursor_id
+                                    AND NOT EXISTS (SELECT 1 FROM matches
+                                                    WHERE matches.empresa_id = :user_id
+                                                      AND matches.empresa_status IN ('like', 'dislike')
+                                                      AND matches.dev_id = devs.id)
+                                    AND (:arquivados IS NULL OR NOT swipe_arquivado(:arquivados, devs.id))
+                                  ORDER BY id LIMIT :limit)
+                     ORDER BY id''' for denso in (False, True)}
+
+# Fila "curtiu você": empresas que já curtiram o desenvolvedor e esperam a resposta dele (o like dele vira match
+# na hora), ordenadas no banco pela pontuação e desempatadas como nos grupos, antes do LIMIT. Os dislikes
+# arquivados continuam de fora, já que um par arquivado que recebe um like novo volta para matches como pendente
+EMPRESA_ADMIRADORAS_SQL = f'''SELECT {EMPRESA_CARD_COLUMNS}, {SCORE_SQL_BY_TIPO['empresa']} AS score, 1 AS curtiu FROM empresas
+                              WHERE id IN (SELECT empresa_id FROM matches
+                                           WHERE dev_id = :user_id AND empresa_status = 'like' AND dev_status = 'pending')
+                                AND (:arquivados IS NULL OR NOT swipe_arquivado(:arquivados, empresas.id))
+                              ORDER BY score DESC, {EMPRESA_ORDEM_SQL} DESC, id LIMIT :limit'''
+
+# Desenvolvedores que já curtiram a empresa e esperam a resposta dela
+DEV_ADMIRADORES_SQL = f'''SELECT {DEV_CARD_COLUMNS}, {SCORE_SQL_BY_TIPO['dev']} AS score, 1 AS curtiu FROM devs
+                          WHERE id IN (SELECT dev_id FROM matches
+                                       WHERE empresa_id = :user_id AND dev_status = 'like' AND empresa_status = 'pending')
+                            AND (:arquivados IS NULL OR NOT swipe_arquivado(:arquivados, devs.id))
+                          ORDER BY score DESC, id LIMIT :limit'''
+
+# Admiradores pendentes que o usuário já tinha descartado e arquivado: ficam fora da fila e, portanto, da contagem
+ADMIRADORES_ARQUIVADOS_SQL = {
+    'dev': '''SELECT COUNT(*) FROM matches WHERE dev_id = :user_id AND empresa_status = 'like' AND dev_status = 'pending'
+                AND swipe_arquivado(:arquivados, empresa_id)''',
+    'empresa': '''SELECT COUNT(*) FROM matches WHERE empresa_id = :user_id AND dev_status = 'like' AND empresa_status = 'pending'
+                    AND swipe_arquivado(:arquivados, dev_id)''',
+}
+
+# Candidatos criados (id acima de :ultimo_id) ou com o ranking alterado (depois de :ultima_alteracao) desde que o
+# cursor foi gravado, ainda não avaliados, na ordem do baralho. São poucos: o cursor é regravado a cada recarga
+EMPRESA_NOVIDADES_SQL = f'''SELECT {EMPRESA_CARD_COLUMNS}, {SCORE_SQL_BY_TIPO['empresa']} AS score, 0 AS curtiu FROM empresas
+                            WHERE id IN (SELECT id FROM empresas WHERE id > :ultimo_id
+                                         UNION SELECT perfil_id FROM ranking_alteracoes WHERE id > :ultima_alteracao AND tipo = 'empresa')
+                              AND habilidades_mask IS NOT NULL AND experiencia_flag IS NOT NULL
+                              AND NOT EXISTS (SELECT 1 FROM matches
+                                              WHERE matches.dev_id = :user_id
+                                                AND matches.dev_status IN ('like', 'dislike')
+                                                AND matches.empresa_id = empresas.id)
+                              AND (:arquivados IS NULL OR NOT swipe_arquivado(:arquivados, empresas.id))
+                            ORDER BY score DESC, {EMPRESA_ORDEM_SQL} DESC, id LIMIT :limit'''
+
+DEV_NOVIDADES_SQL = f'''SELECT {DEV_CARD_COLUMNS}, {SCORE_SQL_BY_TIPO['dev']} AS score, 0 AS curtiu FROM devs
+                        WHERE id IN (SELECT id FROM devs WHERE id > :ultimo_id
+                                     UNION SELECT perfil_id FROM ranking_alteracoes WHERE id > :ultima_alteracao AND tipo = 'dev')
+                          AND habilidades_mask IS NOT NULL AND experiencia_flag IS NOT NULL
+                          AND NOT EXISTS (SELECT 1 FROM matches
+                                          WHERE matches.empresa_id = :user_id
+                                            AND matches.empresa_status IN ('like', 'dislike')
+                                            AND matches.dev_id = devs.id)
+                          AND (:arquivados IS NULL OR NOT swipe_arquivado(:arquivados, devs.id))
+                        ORDER BY score DESC, id LIMIT :limit'''
+
+# Consultas do baralho de cada tipo de usuário e a tabela dos candidatos dele
+DECK_QUERIES = {
+    'dev': {'tabela': 'empresas', 'admiradores': EMPRESA_ADMIRADORAS_SQL, 'grupos': EMPRESA_BUCKET_SQL, 'novidades': EMPRESA_NOVIDADES_SQL},
+    'empresa': {'tabela': 'devs', 'admiradores': DEV_ADMIRADORES_SQL, 'grupos': DEV_BUCKET_SQL, 'novidades': DEV_NOVIDADES_SQL},
+}
+
+# Função para calcular a posição de um cartão no baralho de quem busca: (pontuação, desempate, id),
+# com o baralho em ordem decrescente das duas primeiras e crescente do id
+def deck_position(tipo, card):
+    ordem = (card['salario_ofertado'] if card['salario_ofertado'] is not None else -1) if tipo == 'dev' else 0
+    return card['score'], ordem, card['id']
+
+# Função para buscar os candidatos ranqueados a partir do cursor do usuário. Como tudo antes do cursor já foi avaliado,
+# a recarga não percorre de novo os swipes antigos e custa o mesmo com 10 ou 1 milhão deles. Os perfis criados ou
+# alterados desde o cursor vêm da consulta de novidades e entram no baralho pela posição. O novo cursor é o primeiro
+# cartão (tudo antes dele acabou de ser confirmado como avaliado) ou, sem cartões, o fim do ranking. Uma mudança
+# no próprio perfil (a assinatura) recomeça a fila do topo uma vez
+def fetch_queue(conn, tipo, params, mask, flags_compativeis, limit):
+    consultas = DECK_QUERIES[tipo]
+    assinatura = json.dumps([mask, flags_compativeis, params['salario'], params['horas'],
+                             [SKILL_WEIGHT, EXPERIENCIA_WEIGHT, SALARIO_WEIGHT, HORAS_WEIGHT]])
+    ultimo_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {consultas['tabela']}").fetchone()[0]
+    ultima_alteracao = conn.execute('SELECT COALESCE(MAX(id), 0) FROM ranking_alteracoes').fetchone()[0]
+    salvo = conn.execute('SELECT * FROM baralho_cursores WHERE tipo = ? AND perfil_id = ?', (tipo, params['user_id'])).fetchone()
+    cursor = (salvo['score'], salvo['ordem'], salvo['candidato_id']) if salvo and salvo['assinatura'] == assinatura else None
+    buckets = score_buckets(mask, flags_compativeis, fit_codes(params['salario'], params['horas']))
+    ranked = fetch_ranked(conn, consultas['grupos'], params, buckets, limit, *ranking_counts(conn, consultas['tabela']), cursor=cursor)
+    if cursor is not None:
+        novidades = conn.execute(consultas['novidades'], dict(params, ultimo_id=salvo['ultimo_id'],
+                                                              ultima_alteracao=salvo['ultima_alteracao'], limit=limit)).fetchall()
+        vistos = {card['id'] for card in ranked}
+        ranked.extend(dict(row) for row in novidades if row['id'] not in vistos)
+        ranked.sort(key=lambda card: (-card['score'], -deck_position(tipo, card)[1], card['id']))
+        del ranked[limit:]
+    novo = deck_position(tipo, ranked[0]) if ranked else (-1, 0, 0)
+    if salvo is None or (assinatura, *novo, ultimo_id, ultima_alteracao) != (salvo['assinatura'], salvo['score'], salvo['ordem'],
+                                                                            salvo['candidato_id'], salvo['ultimo_id'], salvo['ultima_alteracao']):
+        with conn:
+            conn.execute('''INSERT INTO baralho_cursores (tipo, perfil_id, assinatura, score, ordem, candidato_id, ultimo_id, ultima_alteracao)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(tipo, perfil_id) DO UPDATE SET assinatura = excluded.assinatura, score = excluded.score,
+                                ordem = excluded.ordem, candidato_id = excluded.candidato_id, ultimo_id = excluded.ultimo_id,
+                                ultima_alteracao = excluded.ultima_alteracao''',
+                         (tipo, params['user_id'], assinatura, *novo, ultimo_id, ultima_alteracao))
+    return ranked
+
+# Função para montar o baralho: primeiro os admiradores pendentes, ordenados pela mesma pontuação do ranking,
+# e depois a fila ranqueada. Se couberam todos os admiradores, os que voltarem na fila são descartados
+# (a fila busca "limit" cartões, então ainda sobram candidatos suficientes para completar o baralho)
+def fetch_deck(conn, tipo, params, mask, flags_compativeis, limit):
+    params = dict(params, mask=mask, compativeis=json.dumps(flags_compativeis))
+    cards = [dict(row) for row in conn.execute(DECK_QUERIES[tipo]['admiradores'], dict(params, limit=limit))]
+    if len(cards) < limit:
+        admiradores = {card['id'] for card in cards}
+        ranked = fetch_queue(conn, tipo, params, mask, flags_compativeis, limit)
+        cards.extend(card for card in ranked if card['id'] not in admiradores)
+    return cards[:limit]
+
+# Função para buscar em lote as próximas empresas para um desenvolvedor: as que já o curtiram e depois as ranqueadas
+# (a experiência é compatível quando a empresa não exige ou o desenvolvedor tem; salário e horas seguem as preferências dele)
+def fetch_empresas_for_dev(dev_id, limit):
+    with connect_db() as conn:
+        dev = conn.execute('''SELECT habilidades_mask, experiencia_flag, salario_pretendido, horas_semanais_max
+                              FROM devs WHERE id = ?''', (dev_id,)).fetchone()
+        mask, experiencia = (dev['habilidades_mask'] or 0, dev['experiencia_flag'] or 0) if dev else (0, 0)
+        params = {'user_id': dev_id, 'arquivados': archived_blob(conn, 'dev', dev_id),
+                  'salario': dev['salario_pretendido'] if dev else None, 'horas': dev['horas_semanais_max'] if dev else None}
+        return fetch_deck(conn, 'dev', params, mask, (0, 1) if experiencia else (0,), limit)
+
+# Função para buscar em lote os próximos desenvolvedores para uma empresa: os que já a curtiram e depois os ranqueados
+# (a experiência é compatível quando o desenvolvedor tem ou a empresa não exige; salário e horas seguem a vaga)
+def fetch_devs_for_empresa(empresa_id, limit):
+    with connect_db() as conn:
+        empresa = conn.execute('''SELECT habilidades_mask, experiencia_flag, salario_ofertado, horas_semanais
+                                  FROM empresas WHERE id = ?''', (empresa_id,)).fetchone()
+        mask, experiencia = (empresa['habilidades_mask'] or 0, empresa['experiencia_flag'] or 0) if empresa else (0, 0)
+        params = {'user_id': empresa_id, 'arquivados': archived_blob(conn, 'empresa', empresa_id),
+                  'salario': empresa['salario_ofertado'] if empresa else None, 'horas': empresa['horas_semanais'] if empresa else None}
+        return fetch_deck(conn, 'empresa', params, mask, (1,) if experiencia else (0, 1), limit)
+
+DECK_FETCHERS = {'dev': fetch_empresas_for_dev, 'empresa': fetch_devs_for_empresa}
+
+# Função para ler um blob de ids arquivados como array ordenado
+def archived_ids(blob):
+    ids = array.array('I')
+    if blob:
+        ids.frombytes(blob)
+    return ids
+
+# Função SQL swipe_arquivado(ids, id), registrada em cada conexão ao abri-la: verdadeira quando o candidato está
+# no blob de ids arquivados do usuário (busca binária direto nos bytes, sem montar um conjunto com todos os ids)
+def swipe_arquivado(ids, candidato):
+    ids = memoryview(ids).cast('I')
+    posicao = bisect.bisect_left(ids, candidato)
+    return posicao < len(ids) and ids[posicao] == candidato
+
+# Função para ler o blob de ids arquivados de um usuário, passado às consultas do baralho como :arquivados
+# (None faz as consultas nem chamarem swipe_arquivado)
+def archived_blob(conn, tipo, user_id):
+    linha = conn.execute('SELECT ids FROM swipes_arquivados WHERE tipo = ? AND perfil_id = ?', (tipo, user_id)).fetchone()
+    return linha['ids'] if linha and linha['ids'] else None
+
+# Função para juntar os novos ids arquivados {(tipo, perfil_id): [ids]} aos blobs já gravados
+def merge_archived_swipes(conn, novos):
+    linhas = []
+    for (tipo, perfil_id), ids in novos.items():
+        atual = conn.execute('SELECT ids FROM swipes_arquivados WHERE tipo = ? AND perfil_id = ?', (tipo, perfil_id)).fetchone()
+        juntos = array.array('I', sorted(set(archived_ids(atual['ids'] if atual else None)).union(ids)))
+        linhas.append((tipo, perfil_id, juntos.tobytes(), len(juntos)))
+    conn.executemany('''INSERT INTO swipes_arquivados (tipo, perfil_id, ids, quantidade) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(tipo, perfil_id) DO UPDATE SET ids = excluded.ids, quantidade = excluded.quantidade''', linhas)
+
+# Função para arquivar os pares sem nenhum like (dislikes e pendentes) com o último swipe há mais de "idade_dias" dias.
+# Percorre matches em faixas de "lote" ids, uma transação por faixa: o DELETE ... RETURNING tira as linhas e devolve
+# os dislikes, que vão para o blob de quem os deu. Pares com like ficam, porque ainda podem virar match.
+# Linhas sem data (anteriores à coluna ou da carga em massa) contam como antigas. Retorna (arquivadas, segundos)
+def archive_swipes(idade_dias, lote=50000, progresso=None):
+    limite = int(time.time()) - idade_dias * 86400
+    inicio = time.perf_counter()
+    arquivadas = 0
+    conn = open_db()
+    try:
+        ultimo = conn.execute('SELECT COALESCE(MAX(id), 0) FROM matches').fetchone()[0]
+        for de in range(0, ultimo, lote):
+            with conn:
+                linhas = conn.execute('''DELETE FROM matches
+                                         WHERE id > ? AND id <= ? AND dev_status != 'like' AND empresa_status != 'like'
+                                           AND (atualizado_em IS NULL OR atualizado_em < ?)
+                                         RETURNING dev_id, empresa_id, dev_status, empresa_status''', (de, de + lote, limite)).fetchall()
+                novos = {}
+                for linha in linhas:
+                    if linha['dev_status'] == 'dislike':
+                        novos.setdefault(('dev', linha['dev_id']), []).append(linha['empresa_id'])
+                    if linha['empresa_status'] == 'dislike':
+                        novos.setdefault(('empresa', linha['empresa_id']), []).append(linha['dev_id'])
+                merge_archived_swipes(conn, novos)
+            arquivadas += len(linhas)
+            if progresso:
+                progresso(min(de + lote, ultimo), ultimo, arquivadas, time.perf_counter() - inicio)
+        # Alterações de perfil que todos os cursores já viram não servem mais para nada
+        with conn:
+            conn.execute('DELETE FROM ranking_alteracoes WHERE id <= (SELECT MIN(ultima_alteracao) FROM baralho_cursores)')
+    finally:
+        conn.close()
+    return arquivadas, time.perf_counter() - inicio
+
+# Função para medir o espaço ocupado no banco (total, em uso e por tabela com seus índices, via dbstat quando disponível)
+def database_size():
+    conn = open_db()
+    try:
+        tamanho_pagina = conn.execute('PRAGMA page_size').fetchone()[0]
+        paginas = conn.execute('PRAGMA page_count').fetchone()[0]
+        livres = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        resultado = {'total_bytes': paginas * tamanho_pagina, 'em_uso_bytes': (paginas - livres) * tamanho_pagina}
+        try:
+            resultado['tabelas'] = dict(conn.execute('''SELECT COALESCE(sqlite_master.tbl_name, dbstat.name), SUM(dbstat.pgsize) FROM dbstat
+                                                        LEFT JOIN sqlite_master ON sqlite_master.name = dbstat.name
+                                                        WHERE COALESCE(sqlite_master.tbl_name, dbstat.name) IN ('matches', 'swipes_arquivados', 'mutual_matches')
+                                                        GROUP BY 1''').fetchall())
+        except sqlite3.OperationalError:
+            pass  # SQLite compilado sem a tabela virtual dbstat
+    finally:
+        conn.close()
+    return resultado
+
+# Função para obter os próximos n cartões do baralho de um usuário,
+# recarregando o baralho inteiro com uma única consulta quando ele não basta
+def get_deck(tipo, user_id, n=DECK_SIZE):
+    key = (tipo, user_id)
+    with deck_lock:
+        cached = deck_cache.get(key)
+        if cached is not None and cached[0] < time.monotonic():
+            del deck_cache[key]
+            deck_stats['expired'] += 1
+            cached = None
+        if cached is not None and (len(cached[1]) >= n or cached[2]):
+            deck_cache.move_to_end(key)
+            deck_stats['hits'] += 1
+            return list(cached[1][:n])
+        deck_stats['misses'] += 1
+
+    # Os swipes ainda no buffer são lidos antes e depois da consulta: um lote gravado
+    # enquanto ela roda sai do buffer, mas pode não ter sido visto por ela
+    buffer = get_swipe_buffer()
+    antes = buffer.pending_ids(tipo, user_id) if buffer is not None else set()
+    limit = max(n, DECK_SIZE)
+    inicio = time.perf_counter()
+    cards = DECK_FETCHERS[tipo](user_id, limit)
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    completo = len(cards) < limit
+
+    if buffer is not None:
+        pendentes = antes | buffer.pending_ids(tipo, user_id)
+        cards = [card for card in cards if card['id'] not in pendentes]
+
+    with deck_lock:
+        deck_cache[key] = (time.monotonic() + app.config['DECK_CACHE_TTL'], cards, completo)
+        deck_cache.move_to_end(key)
+        while len(deck_cache) > app.config['DECK_CACHE_SIZE']:
+            deck_cache.popitem(last=False)
+            deck_stats['evictions'] += 1
+        deck_stats['refills'] += 1
+        deck_stats['refill_rows'] += len(cards)
+        deck_stats['refill_ms'] += duracao_ms
+    return cards[:n]
+
+# Função para retirar do baralho um candidato que acabou de ser avaliado
+def discard_card(tipo, user_id, candidato_id):
+    with deck_lock:
+        cached = deck_cache.get((tipo, user_id))
+        if cached is not None:
+            cards = [card for card in cached[1] if card['id'] != candidato_id]
+            deck_cache[(tipo, user_id)] = (cached[0], cards, cached[2])
+
+# Função para descartar o baralho guardado de quem acabou de receber um like,
+# para que o novo admirador apareça no topo na próxima visita
+def forget_deck(tipo, user_id):
+    with deck_lock:
+        deck_cache.pop((tipo, user_id), None)
+
+# Função para ler quantos admiradores pendentes um usuário tem (contador mantido pelos triggers de matches),
+# descontando os que ele já tinha descartado e arquivado, como faz a fila "curtiu você"
+def pending_admirers(tipo, user_id):
+    with connect_db() as conn:
+        linha = conn.execute('SELECT quantidade FROM admiradores WHERE tipo = ? AND perfil_id = ?', (tipo, user_id)).fetchone()
+        quantidade = linha['quantidade'] if linha else 0
+        arquivados = archived_blob(conn, tipo, user_id) if quantidade else None
+        if arquivados:
+            quantidade -= conn.execute(ADMIRADORES_ARQUIVADOS_SQL[tipo], {'user_id': user_id, 'arquivados': arquivados}).fetchone()[0]
+    return quantidade
+
+# Função para invalidar os baralhos afetados por um perfil novo ou editado: o do próprio usuário, os do outro
+# lado que têm o cartão dele (dados e pontuação antigos) e os do outro lado que já esgotaram os candidatos,
+# onde ele passaria a aparecer. Nos demais ele entra quando o baralho for recarregado (no máximo DECK_CACHE_TTL)
+def invalidate_decks(tipo, user_id=None):
+    outro_tipo = 'empresa' if tipo == 'dev' else 'dev'
+    with deck_lock:
+        deck_cache.pop((tipo, user_id), None)
+        for key, (_, cards, completo) in list(deck_cache.items()):
+            if key[0] == outro_tipo and (completo or any(card['id'] == user_id for card in cards)):
+                del deck_cache[key]
+
+# Função para travar um arquivo aberto sem esperar; retorna False se outro processo já tem a trava
+# (a trava é solta pelo sistema quando o processo termina, mesmo numa queda)
+def try_lock_file(arquivo):
+    try:
+        if fcntl:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+# Função para abrir um journal só de acréscimo, escrito direto no descritor (sem buffer do Python)
+def open_journal(caminho):
+    return os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o644)
+
+# Função para tornar durável a criação ou a troca de nome de um arquivo (no Windows não se abre diretório)
+def fsync_directory(caminho):
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+# Buffer de escrita atrasada (write-behind) dos swipes: os likes/dislikes ficam em memória,
+# registrados antes num journal só de acréscimo, e uma thread em segundo plano grava tudo
+# na tabela matches em lotes com executemany, a cada SWIPE_FLUSH_INTERVAL_MS ou SWIPE_BATCH_SIZE swipes.
+# Um swipe só é confirmado depois do fsync do journal (com group commit: um fsync cobre todos os swipes
+# que chegaram enquanto o anterior rodava). Cada processo tem o próprio journal ("<prefixo>.<pid>"),
+# travado no arquivo ".lock" enquanto o processo vive
+class SwipeBuffer:
+    def __init__(self, journal_prefix, batch_size, flush_interval_ms):
+        self.journal_path = f'{journal_prefix}.{os.getpid()}'
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.pending = {}
+        # Lote sendo gravado agora: continua visível para os matches e para o baralho até o commit
+        self.inflight = {}
+        self.cond = threading.Condition()
+        # Ordem das travas: flush_lock antes de sync_lock antes de cond. written/synced contam as linhas escritas e as já no disco.
+        # flush_lock deixa um flush por vez: um segundo flush com o primeiro ainda gravando acrescentaria o seu lote ao
+        # ".flushing" que o primeiro apaga no fim, e esses swipes ficariam só na memória até o commit
+        self.flush_lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.written = self.synced = 0
+        self.stats = {'swipes': 0, 'flushes': 0, 'flushed_rows': 0, 'flush_errors': 0, 'fsyncs': 0,
+                      'flush_ms_total': 0.0, 'flush_ms_last': 0.0, 'flush_ms_max': 0.0}
+        self.lock_file = open(self.journal_path + '.lock', 'a+')
+        if not try_lock_file(self.lock_file):
+            raise RuntimeError(f'journal de swipes {self.journal_path} travado por outro processo')
+        replay_swipe_journals(journal_prefix, self.journal_path)
+        self.journal = open_journal(self.journal_path)
+        fsync_directory(self.journal_path)
+        self.thread = threading.Thread(target=self.run, name='swipe-buffer', daemon=True)
+        self.thread.start()
+
+    # Status do outro lado do par entre os swipes ainda não gravados (None se não houver)
+    def buffered_status(self, dev_id, empresa_id, coluna):
+        for swipes in (self.pending, self.inflight):
+            status = swipes.get((dev_id, empresa_id), {}).get(coluna)
+            if status is not None:
+                return status
+        return None
+
+    # Registra o swipe e responde na hora se ele fechou um match. A consulta ao outro lado (buffer e depois
+    # a linha do par no banco) e o registro ficam sob a mesma trava, então dois likes opostos simultâneos
+    # não leem os dois "pending": o segundo sempre enxerga o primeiro
+    def record(self, conn, lado, dev_id, empresa_id, action):
+        coluna = 'dev_status' if lado == 'dev' else 'empresa_status'
+        outra = 'empresa_status' if lado == 'dev' else 'dev_status'
+        linha = (json.dumps([lado, dev_id, empresa_id, action]) + '\n').encode()
+        with self.cond:
+            outro_status = self.buffered_status(dev_id, empresa_id, outra)
+            if outro_status is None:
+                match = conn.execute(f'SELECT {outra} FROM matches WHERE dev_id = ? AND empresa_id = ?', (dev_id, empresa_id)).fetchone()
+                outro_status = match[outra] if match else 'pending'
+            os.write(self.journal, linha)
+            self.written += 1
+            escrito = self.written
+            self.pending.setdefault((dev_id, empresa_id), {})[coluna] = action
+            self.stats['swipes'] += 1
+            if len(self.pending) >= self.batch_size:
+                self.cond.notify()
+        self.sync(escrito)
+        return action == 'like' and outro_status == 'like'
+
+    # Garante no disco a linha "escrito" do journal. Quem espera pela trava costuma encontrar a sua linha
+    # já coberta pelo fsync de outra thread; senão faz um fsync que cobre tudo o que foi escrito até aqui
+    def sync(self, escrito):
+        with self.sync_lock:
+            if self.synced >= escrito:
+                return
+            alvo = self.written
+            os.fsync(self.journal)
+            self.synced = alvo
+            self.stats['fsyncs'] += 1
+
+    # Ids já avaliados pelo usuário que ainda não chegaram ao banco, inclusive os do lote em gravação
+    # (o baralho não deve mostrá-los)
+    def pending_ids(self, lado, user_id):
+        with self.cond:
+            swipes = itertools.chain(self.pending.items(), self.inflight.items())
+            if lado == 'dev':
+                return {empresa_id for (dev_id, empresa_id), status in swipes if dev_id == user_id and 'dev_status' in status}
+            return {dev_id for (dev_id, empresa_id), status in swipes if empresa_id == user_id and 'empresa_status' in status}
+
+    # Laço da thread de gravação: um erro não a derruba; depois de uma falha espera um intervalo antes de tentar de novo
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: len(self.pending) >= self.batch_size, timeout=self.flush_interval)
+            try:
+                ok = self.flush()
+            except Exception:
+                app.logger.exception('Falha no buffer de swipes')
+                ok = False
+            if not ok:
+                time.sleep(self.flush_interval)
+
+    # Troca o journal pelo arquivo ".flushing" do lote. Se ainda existe um ".flushing" de um flush que falhou,
+    # o journal atual é acrescentado a ele, que segue sendo a cópia durável dos swipes ainda não gravados.
+    # Roda com sync_lock e cond: o journal antigo vai para o disco antes de ser fechado
+    def rotate_journal(self):
+        flushing = self.journal_path + '.flushing'
+        os.fsync(self.journal)
+        os.close(self.journal)
+        self.synced = self.written
+        try:
+            if os.path.exists(flushing):
+                with open(self.journal_path, 'rb') as atual, open(flushing, 'ab') as destino:
+                    shutil.copyfileobj(atual, destino)
+                    destino.flush()
+                    os.fsync(destino.fileno())
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, flushing)
+        finally:
+            self.journal = open_journal(self.journal_path)
+            fsync_directory(self.journal_path)
+
+    # Grava o lote atual numa única transação. O journal é trocado junto com o lote,
+    # então o arquivo ".flushing" só é apagado depois do commit. Se a gravação falhar
+    # (ex.: "database is locked"), o lote volta para a memória, sem sobrescrever swipes mais novos
+    # do mesmo par, e o ".flushing" fica para o próximo flush. Quem chama com outro flush em andamento espera
+    # ele terminar, então ao retornar True tudo o que estava no buffer já está no banco. Retorna False se falhou
+    def flush(self):
+        with self.flush_lock:
+            return self.flush_batch()
+
+    def flush_batch(self):
+        with self.sync_lock, self.cond:
+            if not self.pending:
+                return True
+            self.rotate_journal()
+            lote, self.pending = self.pending, {}
+            self.inflight = lote
+
+        inicio = time.perf_counter()
+        try:
+            conn = open_db()
+            try:
+                with conn:
+                    write_swipe_batch(conn, lote)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            app.logger.exception('Falha ao gravar %d swipes do buffer; nova tentativa no próximo flush', len(lote))
+            with self.cond:
+                for chave, status in lote.items():
+                    self.pending[chave] = dict(status, **self.pending.get(chave, {}))
+                self.inflight = {}
+                self.stats['flush_errors'] += 1
+            return False
+        os.remove(self.journal_path + '.flushing')
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+
+        with self.cond:
+            self.inflight = {}
+            self.stats['flushes'] += 1
+            self.stats['flushed_rows'] += len(lote)
+            self.stats['flush_ms_total'] += duracao_ms
+            self.stats['flush_ms_last'] = duracao_ms
+            self.stats['flush_ms_max'] = max(self.stats['flush_ms_max'], duracao_ms)
+        return True
+
+# Função para gravar um lote de swipes {(dev_id, empresa_id): {coluna: status}} com um único executemany;
+# um lado ausente no lote mantém o valor que já estava no banco
+def write_swipe_batch(conn, lote):
+    conn.executemany('''INSERT INTO matches (dev_id, empresa_id, dev_status, empresa_status, atualizado_em)
+                        VALUES (:dev_id, :empresa_id, COALESCE(:dev_status, 'pending'), COALESCE(:empresa_status, 'pending'),
+                                CAST(strftime('%s', 'now') AS INTEGER))
+                        ON CONFLICT(dev_id, empresa_id) DO UPDATE
+                        SET dev_status = COALESCE(:dev_status, matches.dev_status),
+                            empresa_status = COALESCE(:empresa_status, matches.empresa_status),
+                            atualizado_em = excluded.atualizado_em''',
+                     [{'dev_id': dev_id, 'empresa_id': empresa_id,
+                       'dev_status': status.get('dev_status'), 'empresa_status': status.get('empresa_status')}
+                      for (dev_id, empresa_id), status in lote.items()])
+
+# Função para reaplicar no banco os swipes de journals que não chegaram a ser gravados (processo encerrado
+# antes do flush); roda na inicialização do buffer, já com a trava do journal deste processo. Reaplica os
+# arquivos deste pid (de um processo anterior com o mesmo pid), os do journal único de versões antigas e os de
+# processos encerrados, reconhecidos pela trava livre; journals de processos vivos ficam com os seus donos
+def replay_swipe_journals(prefixo, journal_path):
+    padrao = re.compile(re.escape(prefixo) + r'(?:\.(\d+))?(?:\.flushing|\.lock)?')
+    donos = {}
+    for caminho in glob.glob(glob.escape(prefixo) + '*'):
+        encontrado = padrao.fullmatch(caminho)
+        if encontrado:
+            donos.setdefault(encontrado.group(1), []).append(caminho)
+    lote, travas, apagar = {}, [], []
+    try:
+        for pid, caminhos in donos.items():
+            journal = f'{prefixo}.{pid}' if pid else prefixo
+            if journal != journal_path and pid:
+                trava = open(journal + '.lock', 'a+')
+                travas.append(trava)
+                if not try_lock_file(trava):
+                    continue
+            for caminho in (journal + '.flushing', journal):
+                if os.path.exists(caminho):
+                    read_swipe_journal(caminho, lote)
+                    apagar.append(caminho)
+            if journal != journal_path and pid:
+                apagar.append(journal + '.lock')
+        if lote:
+            conn = open_db()
+            try:
+                with conn:
+                    write_swipe_batch(conn, lote)
+            finally:
+                conn.close()
+        for caminho in apagar:
+            os.remove(caminho)
+    finally:
+        for trava in travas:
+            trava.close()
+    return len(lote)
+
+# Função para juntar ao lote {(dev_id, empresa_id): {coluna: status}} os swipes de um journal
+def read_swipe_journal(caminho, lote):
+    with open(caminho) as journal:
+        for linha in journal:
+            try:
+                lado, dev_id, empresa_id, action = json.loads(linha)
+            except ValueError:
+                continue  # última linha truncada por uma queda no meio da escrita
+            coluna = 'dev_status' if lado == 'dev' else 'empresa_status'
+            lote.setdefault((dev_id, empresa_id), {})[coluna] = action
+
+swipe_buffer = None
+swipe_buffer_lock = threading.Lock()
+
+# Função para obter o buffer de swipes, criando-o na primeira vez (None se o modo estiver desligado)
+def get_swipe_buffer():
+    global swipe_buffer
+    if not app.config['SWIPE_WRITE_BEHIND']:
+        return None
+    with swipe_buffer_lock:
+        if swipe_buffer is None:
+            swipe_buffer = SwipeBuffer(app.config['SWIPE_JOURNAL'], app.config['SWIPE_BATCH_SIZE'], app.config['SWIPE_FLUSH_INTERVAL_MS'])
+            atexit.register(swipe_buffer.flush)
+    return swipe_buffer
+
+# Consulta das notificações com os nomes dos dois lados (o aviso mostra o nome da outra parte)
+NOTIFICATION_SQL = '''SELECT notifications.id, notifications.destinatario_tipo, notifications.destinatario_id, notifications.evento,
+                             notifications.dev_id, notifications.empresa_id, notifications.criado_em,
+                             devs.name AS dev_nome, empresas.nome_empresa AS empresa_nome
+                      FROM notifications
+                      LEFT JOIN devs ON devs.id = notifications.dev_id
+                      LEFT JOIN empresas ON empresas.id = notifications.empresa_id'''
+
+# Função para ler as notificações do outbox depois de "ultimo_id", de todos ou só de um destinatário
+def read_notifications(ultimo_id, destinatario=None, limite=500):
+    filtro, parametros = 'notifications.id > ?', [ultimo_id]
+    if destinatario:
+        filtro += ' AND notifications.destinatario_tipo = ? AND notifications.destinatario_id = ?'
+        parametros += destinatario
+    with contextlib.closing(open_db()) as conn:
+        return conn.execute(f'{NOTIFICATION_SQL} WHERE {filtro} ORDER BY notifications.id LIMIT ?', parametros + [limite]).fetchall()
+
+# Função para obter o id da última notificação gravada (o distribuidor só entrega as posteriores)
+def read_notifications_max_id():
+    with contextlib.closing(open_db()) as conn:
+        return conn.execute('SELECT COALESCE(MAX(id), 0) FROM notifications').fetchone()[0]
+
+# Distribui as notificações do outbox para as conexões SSE abertas no servidor ASGI de notificações.
+# Uma única tarefa asyncio consulta o outbox (só enquanto há alguém conectado; a consulta roda numa thread para
+# não parar o laço de eventos) e entrega cada aviso na fila de quem está inscrito. Uma conexão ociosa é só uma
+# corrotina esperando na própria fila, sem thread nem consulta ao banco, então o processo segura milhares delas
+class MatchNotifier:
+    def __init__(self, poll_interval_ms):
+        self.poll_interval = poll_interval_ms / 1000
+        self.subscribers = {}
+        self.has_subscribers = asyncio.Event()
+        self.last_id = None
+        self.stats = {'connected': 0, 'delivered': 0, 'polls': 0, 'poll_errors': 0}
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def subscribe(self, tipo, perfil_id):
+        fila = asyncio.Queue()
+        self.subscribers.setdefault((tipo, perfil_id), set()).add(fila)
+        self.stats['connected'] += 1
+        self.has_subscribers.set()
+        return fila
+
+    def unsubscribe(self, tipo, perfil_id, fila):
+        filas = self.subscribers.get((tipo, perfil_id), set())
+        filas.discard(fila)
+        if not filas:
+            self.subscribers.pop((tipo, perfil_id), None)
+        if not self.subscribers:
+            self.has_subscribers.clear()
+        self.stats['connected'] -= 1
+
+    # Laço da tarefa de consulta: um erro do banco não a derruba, só espera o próximo intervalo
+    async def run(self):
+        while self.last_id is None:
+            try:
+                self.last_id = await asyncio.to_thread(read_notifications_max_id)
+            except sqlite3.Error:
+                app.logger.exception('Falha ao ler o outbox de notificações')
+                await asyncio.sleep(self.poll_interval)
+        while True:
+            await self.has_subscribers.wait()
+            novas = []
+            try:
+                novas = await asyncio.to_thread(read_notifications, self.last_id)
+            except sqlite3.Error:
+                app.logger.exception('Falha ao ler o outbox de notificações')
+                self.stats['poll_errors'] += 1
+            self.stats['polls'] += 1
+            for notificacao in novas:
+                self.last_id = notificacao['id']
+                for fila in self.subscribers.get((notificacao['destinatario_tipo'], notificacao['destinatario_id']), ()):
+                    fila.put_nowait(notificacao)
+                    self.stats['delivered'] += 1
+            if len(novas) < 500:
+                await asyncio.sleep(self.poll_interval)
+
+match_notifier = None
+
+# Função para obter o distribuidor de notificações, criando-o na primeira conexão SSE
+# (roda sempre no laço de eventos do servidor ASGI, então não precisa de trava)
+def get_match_notifier():
+    global match_notifier
+    if match_notifier is None:
+        match_notifier = MatchNotifier(app.config['NOTIFY_POLL_INTERVAL_MS'])
+    return match_notifier
+
+# Função para formatar uma notificação como evento SSE (o id permite retomar via Last-Event-ID)
+def format_notification(notificacao):
+    outra_parte = notificacao['empresa_nome'] if notificacao['destinatario_tipo'] == 'dev' else notificacao['dev_nome']
+    dados = {'id': notificacao['id'], 'evento': notificacao['evento'], 'dev_id': notificacao['dev_id'],
+             'empresa_id': notificacao['empresa_id'], 'nome': outra_parte, 'criado_em': notificacao['criado_em']}
+    return f"id: {notificacao['id']}\nevent: {notificacao['evento']}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+# Função para registrar o swipe de um dos lados com um único upsert atômico
+# (sem SELECT antes nem depois: o RETURNING devolve os dois status já atualizados,
+# e duas requisições simultâneas não disputam mais o INSERT do mesmo par).
+# Com SWIPE_WRITE_BEHIND ligado o swipe vai para o buffer e é gravado em lote depois
+def record_swipe(conn, lado, dev_id, empresa_id, action):
+    buffer = get_swipe_buffer()
+    if buffer is not None:
+        return buffer.record(conn, lado, dev_id, empresa_id, action)
+    coluna = 'dev_status' if lado == 'dev' else 'empresa_status'
+    match = conn.execute(f'''INSERT INTO matches (dev_id, empresa_id, {coluna}, atualizado_em) VALUES (?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
+                             ON CONFLICT(dev_id, empresa_id) DO UPDATE SET {coluna} = excluded.{coluna}, atualizado_em = excluded.atualizado_em
+                             RETURNING dev_status, empresa_status''', (dev_id, empresa_id, action)).fetchall()[0]
+    return match['dev_status'] == 'like' and match['empresa_status'] == 'like'
+
+# Busca: itens por página, pesos do BM25 por coluna do índice (nome pesa mais que habilidades, que pesam
+# mais que o resto), até quantos resultados o texto é ordenado por relevância, quantos resultados no máximo
+# entram na contagem das facetas e as faixas de salário
+SEARCH_PAGE_SIZE = 20
+SEARCH_BM25_WEIGHTS = {'devs': (10.0, 5.0, 1.0), 'empresas': (10.0, 3.0, 2.0, 5.0, 1.0)}
+SEARCH_RANK_LIMIT = 5000
+SEARCH_FACET_LIMIT = 2000
+SALARY_BUCKETS = ((0, 3), (3, 6), (6, 10), (10, 20), (20, None))
+
+# Função para converter o texto digitado em termos FTS5 seguros: cada palavra vira um termo entre aspas
+# (ou um prefixo, se terminar em "*"), opcionalmente restrito a uma coluna (ex.: endereco);
+# a busca exige todos os termos
+def fts_terms(texto, coluna=None):
+    termos = []
+    for palavra in (texto or '').split():
+        prefixo = palavra.endswith('*') and len(palavra) > 1
+        palavra = palavra.rstrip('*')
+        if palavra:
+            termos.append('"%s"%s' % (palavra.replace('"', '""'), '*' if prefixo else ''))
+    return [f'{coluna} : {termo}' if coluna else termo for termo in termos]
+
+# Função para ler o cursor de busca "rank|id" (sem cursor começa do primeiro resultado)
+def search_cursor():
+    rank, _, perfil_id = request.args.get('depois', '').rpartition('|')
+    try:
+        return float(rank), int(perfil_id)
+    except ValueError:
+        return None
+
+# Função de busca: aplica texto e filtros, pagina por chave e, na primeira página, conta as facetas.
+# O BM25 precisa contar em quantos perfis cada termo aparece, o que custa caro para termos comuns; por isso
+# só os termos raros (até SEARCH_RANK_LIMIT perfis) entram na ordenação por relevância (BM25 e depois id)
+# e os comuns apenas filtram. Se todos os termos forem comuns, ou sem texto, a ordem é por id.
+# Retorna (resultados, próximo cursor, ordenação, facetas)
+def search_profiles(tabela, termos, filtros, parametros, depois=None, limite=SEARCH_PAGE_SIZE):
+    colunas = DEV_CARD_COLUMNS if tabela == 'devs' else EMPRESA_CARD_COLUMNS
+    colunas = ', '.join(f'{tabela}.{coluna.strip()}' for coluna in colunas.split(','))
+    parametros = dict(parametros, limite=limite, texto=' '.join(termos) or None)
+    if depois:
+        parametros['rank'], parametros['depois'] = depois
+    condicoes = list(filtros)
+    with connect_db() as conn:
+        raros, comuns = [], []
+        for termo in termos:
+            perfis = conn.execute(f'SELECT COUNT(*) FROM (SELECT 1 FROM {tabela}_fts WHERE {tabela}_fts MATCH ? LIMIT ?)',
+                                  (termo, SEARCH_RANK_LIMIT + 1)).fetchone()[0]
+            (raros if perfis <= SEARCH_RANK_LIMIT else comuns).append(termo)
+        relevancia = bool(raros)
+        if relevancia:
+            pesos = ', '.join(str(peso) for peso in SEARCH_BM25_WEIGHTS[tabela])
+            origem = f'''(SELECT rowid AS id, bm25({tabela}_fts, {pesos}) AS rank FROM {tabela}_fts WHERE {tabela}_fts MATCH :raros) AS hits
+                         JOIN {tabela} ON {tabela}.id = hits.id'''
+            parametros['raros'] = ' '.join(raros)
+            if comuns:
+                condicoes.append(f'EXISTS (SELECT 1 FROM {tabela}_fts WHERE {tabela}_fts MATCH :comuns AND rowid = hits.id)')
+                parametros['comuns'] = ' '.join(comuns)
+            rank, ordem = 'hits.rank', f'hits.rank, {tabela}.id'
+            if depois:
+                condicoes.append(f'(hits.rank, {tabela}.id) > (:rank, :depois)')
+        else:
+            origem, chave, extras = search_source(conn, tabela, parametros['texto'], parametros)
+            condicoes += extras
+            rank, ordem = '0.0', chave
+            if depois:
+                condicoes.append(f'{chave} > :depois')
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        resultados = [dict(row) for row in conn.execute(
+            f'SELECT {colunas}, {rank} AS rank FROM {origem} {where} ORDER BY {ordem} LIMIT :limite', parametros)]
+        facetas = None
+        if not depois:
+            facetas = search_facets(conn, tabela, filtros, parametros, *search_source(conn, tabela, parametros['texto'], parametros))
+    proximo = None
+    if len(resultados) == limite:
+        ultimo = resultados[-1]
+        proximo = f"{ultimo['rank']!r}|{ultimo['id']}"
+    return resultados, proximo, 'relevancia' if relevancia else 'id', facetas
+
+# Contagem de perfis por habilidade, usada para escolher a habilidade mais rara como ponto de partida
+# das buscas filtradas por habilidades (recalculada a cada SKILL_COUNTS_TTL segundos)
+SKILL_COUNTS_TTL = 300
+skill_counts_cache = {}
+
+# Função para obter {skill_id: quantidade de perfis} de um tipo de perfil
+def skill_counts(conn, tipo):
+    validade, contagem = skill_counts_cache.get(tipo, (0, None))
+    if validade < time.monotonic():
+        tabela, _ = SKILL_TABLES[tipo]
+        contagem = dict(conn.execute(f'SELECT skill_id, COUNT(*) FROM {tabela} GROUP BY skill_id').fetchall())
+        skill_counts_cache[tipo] = (time.monotonic() + SKILL_COUNTS_TTL, contagem)
+    return contagem
+
+# Função para escolher de onde a busca sem ordenação por relevância percorre os perfis, já em ordem de id:
+# o índice de texto (quando há texto), a lista da habilidade exigida mais rara (quando há filtro de habilidades)
+# ou a própria tabela. Retorna (origem, coluna de ordenação, condições extras)
+def search_source(conn, tabela, texto, parametros):
+    if texto:
+        return f'{tabela}_fts JOIN {tabela} ON {tabela}.id = {tabela}_fts.rowid', f'{tabela}_fts.rowid', [f'{tabela}_fts MATCH :texto']
+    if parametros.get('mask'):
+        tipo = BULK_SKILLS[tabela]
+        skill_tabela, coluna = SKILL_TABLES[tipo]
+        exigidas = [nome for nome, bit in HABILIDADES_BITS.items() if parametros['mask'] & bit]
+        ids = dict(conn.execute(f"SELECT nome, id FROM skills WHERE nome IN ({', '.join('?' * len(exigidas))})", exigidas).fetchall())
+        contagem = skill_counts(conn, tipo)
+        parametros['skill_driver'] = min(ids.values(), key=lambda skill_id: contagem.get(skill_id, 0))
+        return (f'{skill_tabela} AS driver JOIN {tabela} ON {tabela}.id = driver.{coluna}', f'driver.{coluna}',
+                ['driver.skill_id = :skill_driver'])
+    return tabela, f'{tabela}.id', []
+
+# Função para contar as facetas (habilidades pela máscara de bits, experiência, e para empresas setor e faixa salarial)
+# sobre os primeiros SEARCH_FACET_LIMIT resultados; "aproximadas" indica que o limite foi atingido
+def search_facets(conn, tabela, filtros, parametros, origem, chave, extras):
+    parametros = dict(parametros, facet_limit=SEARCH_FACET_LIMIT)
+    condicoes = list(filtros) + extras
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+    extras = f', {tabela}.salario_ofertado, {tabela}.setor' if tabela == 'empresas' else ''
+    amostra = f'SELECT {tabela}.habilidades_mask, {tabela}.experiencia_flag{extras} FROM {origem} {where} LIMIT :facet_limit'
+    somas = ', '.join(f'SUM(habilidades_mask & {bit} != 0)' for bit in HABILIDADES_BITS.values())
+    faixas = ''
+    if tabela == 'empresas':
+        faixas = ', ' + ', '.join(
+            f'SUM(salario_ofertado >= {minimo}' + (f' AND salario_ofertado < {maximo})' if maximo is not None else ')')
+            for minimo, maximo in SALARY_BUCKETS)
+    linha = conn.execute(f'SELECT COUNT(*), SUM(experiencia_flag = 1){faixas}, {somas} FROM ({amostra})', parametros).fetchone()
+    total = linha[0]
+    facetas = {
+        'total': total,
+        'aproximadas': total >= SEARCH_FACET_LIMIT,
+        'experiencia': {'sim': linha[1] or 0, 'nao': total - (linha[1] or 0)},
+    }
+    posicao = 2
+    if tabela == 'empresas':
+        facetas['salario'] = [{'faixa': f'{minimo}-{maximo}' if maximo is not None else f'{minimo}+', 'total': linha[posicao + indice] or 0}
+                              for indice, (minimo, maximo) in enumerate(SALARY_BUCKETS)]
+        posicao += len(SALARY_BUCKETS)
+        facetas['setor'] = [{'setor': row[0], 'total': row[1]} for row in conn.execute(
+            f'SELECT setor, COUNT(*) FROM ({amostra}) GROUP BY setor ORDER BY COUNT(*) DESC LIMIT 20', parametros)]
+    facetas['habilidades'] = {habilidade: linha[posicao + indice] or 0 for indice, habilidade in enumerate(HABILIDADES_BITS)}
+    return facetas
+
+# Função para montar os filtros de habilidades (todas exigidas, pela máscara) e experiência comuns às duas buscas
+def search_common_filters(tabela, filtros, parametros):
+    mask = skills_mask(request.args.getlist('habilidades'))
+    if mask:
+        filtros.append(f'{tabela}.habilidades_mask & :mask = :mask')
+        parametros['mask'] = mask
+    experiencia = request.args.get('experiencia')
+    if experiencia in ('0', '1'):
+        filtros.append(f'{tabela}.experiencia_flag = :experiencia')
+        parametros['experiencia'] = int(experiencia)
+
+# Colunas aceitas na carga e exportadas por tabela (as derivadas, máscara e flag, são recalculadas na carga)
+BULK_COLUMNS = {
+    'devs': ['id', 'name', 'email', 'cel', 'habilidades', 'senha', 'foto', 'curriculo', 'tem_experiencia',
+             'salario_pretendido', 'horas_semanais_max'],
+    'empresas': ['id', 'nome_empresa', 'cnpj', 'setor', 'endereco', 'email', 'telefone', 'senha', 'logo', 'habilidades',
+                 'horas_semanais', 'horas_diarias', 'salario_ofertado', 'experiencia_necessaria'],
+    'matches': ['id', 'dev_id', 'empresa_id', 'dev_status', 'empresa_status'],
+}
+# Colunas derivadas de cada tabela: (coluna, função, coluna de origem)
+BULK_DERIVED = {
+    'devs': [('habilidades_mask', skills_mask, 'habilidades'), ('experiencia_flag', experiencia_flag, 'tem_experiencia')],
+    'empresas': [('habilidades_mask', skills_mask, 'habilidades'), ('experiencia_flag', experiencia_flag, 'experiencia_necessaria')],
+    'matches': [],
+}
+# Valores usados quando a coluna vem vazia
+BULK_DEFAULTS = {'foto': '', 'dev_status': 'pending', 'empresa_status': 'pending'}
+# Tabela de habilidades alimentada pela carga de cada tabela de perfis
+BULK_SKILLS = {'devs': 'dev', 'empresas': 'empresa'}
+
+# Função para ler registros de um arquivo CSV (com cabeçalho) ou JSONL, um por vez
+def read_records(arquivo, formato):
+    with open(arquivo, newline='', encoding='utf-8') as entrada:
+        if formato == 'csv':
+            yield from csv.DictReader(entrada)
+        else:
+            for linha in entrada:
+                if linha.strip():
+                    yield json.loads(linha)
+
+# Função para converter um registro lido na tupla de valores do INSERT
+def prepare_record(tabela, registro):
+    valores = {}
+    for coluna in BULK_COLUMNS[tabela]:
+        valor = registro.get(coluna)
+        if isinstance(valor, list):
+            valor = ', '.join(valor)
+        valores[coluna] = BULK_DEFAULTS.get(coluna) if valor in (None, '') else valor
+    derivados = [funcao(valores[origem]) for _, funcao, origem in BULK_DERIVED[tabela]]
+    return [valores[coluna] for coluna in BULK_COLUMNS[tabela]] + derivados
+
+# Função para remover os índices secundários (não únicos) das tabelas durante a carga;
+# retorna os comandos para recriá-los depois
+def drop_deferred_indexes(conn, tabelas):
+    indices = conn.execute(f'''SELECT name, sql FROM sqlite_master
+                              WHERE type = 'index' AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'
+                                AND tbl_name IN ({', '.join('?' * len(tabelas))})''', tabelas).fetchall()
+    for indice in indices:
+        conn.execute(f'DROP INDEX {indice["name"]}')
+    return [indice['sql'] for indice in indices]
+
+# Triggers suspensos durante a carga de cada tabela: a indexação da busca textual (feita de uma vez no fim)
+# e o aviso de novo match, para que os matches históricos importados não virem notificações
+BULK_SUSPENDED_TRIGGERS = {
+    'devs': ['trg_devs_fts_insert'],
+    'empresas': ['trg_empresas_fts_insert'],
+    'matches': ['trg_mutual_matches_notify'],
+}
+
+# Tipo de usuário cuja fila de swipe lista os perfis de cada tabela
+BULK_CURSOR_TIPOS = {'devs': 'empresa', 'empresas': 'dev'}
+
+# Função para suspender, durante a carga, os triggers indicados; retorna {nome: comando para recriá-lo}
+def drop_triggers(conn, nomes):
+    triggers = conn.execute(f"""SELECT name, sql FROM sqlite_master
+                               WHERE type = 'trigger' AND name IN ({', '.join('?' * len(nomes))})""", nomes).fetchall()
+    for trigger in triggers:
+        conn.execute(f'DROP TRIGGER {trigger["name"]}')
+    return {trigger['name']: trigger['sql'] for trigger in triggers}
+
+# Função para indexar na busca textual, de uma vez, as linhas que ainda não estão no índice
+def backfill_search_index(conn, tabela):
+    lista = ', '.join(SEARCH_FTS_COLUMNS[tabela])
+    conn.execute(f'''INSERT INTO {tabela}_fts (rowid, {lista})
+                     SELECT id, {lista} FROM {tabela} WHERE id NOT IN (SELECT id FROM {tabela}_fts_docsize)''')
+
+# Função para preencher, de uma vez, as habilidades normalizadas dos perfis que ainda não as têm
+# (usa a máscara de bits calculada na carga, equivalente a set_profile_skills)
+def backfill_profile_skills(conn, tipo):
+    tabela, coluna = SKILL_TABLES[tipo]
+    perfis = LOGIN_TABLES[tipo][0]
+    conn.execute(f'''INSERT OR IGNORE INTO {tabela} (skill_id, {coluna})
+                     SELECT skills.id, {perfis}.id
+                     FROM {perfis} JOIN json_each(?) AS bits JOIN skills ON skills.nome = bits.key
+                     WHERE {perfis}.habilidades_mask & bits.value
+                       AND {perfis}.id NOT IN (SELECT {coluna} FROM {tabela})''', (json.dumps(HABILIDADES_BITS),))
+
+# Função para carregar registros em lote numa tabela; retorna (lidos, inseridos, segundos)
+# Cada lote é um executemany numa única transação; os índices secundários, a indexação da busca
+# textual e o aviso de novo match são refeitos no fim, de uma vez, mesmo se a carga falhar no meio.
+# Linhas que repetem id, e-mail/CNPJ ou par de match já existentes são ignoradas
+def bulk_import(tabela, registros, lote, progresso=None):
+    colunas = BULK_COLUMNS[tabela] + [coluna for coluna, _, _ in BULK_DERIVED[tabela]]
+    sql = f'''INSERT OR IGNORE INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})'''
+    tabelas = [tabela] + ([SKILL_TABLES[BULK_SKILLS[tabela]][0]] if tabela in BULK_SKILLS else [])
+    inicio = time.perf_counter()
+    lidos = inseridos = 0
+    recriar, suspensos = [], {}
+    conn = open_db()
+    try:
+        conn.execute('PRAGMA cache_size = -65536')
+        with conn:
+            recriar = drop_deferred_indexes(conn, tabelas)
+            suspensos = drop_triggers(conn, BULK_SUSPENDED_TRIGGERS.get(tabela, []))
+        pendentes = []
+        for registro in registros:
+            pendentes.append(prepare_record(tabela, registro))
+            if len(pendentes) >= lote:
+                with conn:
+                    inseridos += conn.executemany(sql, pendentes).rowcount
+                lidos += len(pendentes)
+                pendentes = []
+                if progresso:
+                    progresso(lidos, inseridos, time.perf_counter() - inicio)
+        with conn:
+            inseridos += conn.executemany(sql, pendentes).rowcount
+        lidos += len(pendentes)
+    finally:
+        # Os lotes já gravados continuam no banco: completa as habilidades e a busca deles e devolve
+        # ao banco em uso os índices e triggers suspensos, com ou sem erro na carga
+        try:
+            with conn:
+                if tabela in BULK_SKILLS:
+                    backfill_profile_skills(conn, BULK_SKILLS[tabela])
+                if f'trg_{tabela}_fts_insert' in suspensos:
+                    backfill_search_index(conn, tabela)
+                # Perfis importados podem trazer ids abaixo dos cursores das filas: elas recomeçam do topo
+                if tabela in BULK_CURSOR_TIPOS:
+                    conn.execute('DELETE FROM baralho_cursores WHERE tipo = ?', (BULK_CURSOR_TIPOS[tabela],))
+                for comando in recriar + list(suspensos.values()):
+                    conn.execute(comando)
+            conn.execute('PRAGMA optimize')
+        finally:
+            conn.close()
+    return lidos, inseridos, time.perf_counter() - inicio
+
+# Função para exportar uma tabela em CSV ou JSONL, lendo em ordem de id sem carregar tudo na memória;
+# retorna (linhas, segundos)
+def bulk_export(tabela, arquivo, formato):
+    colunas = BULK_COLUMNS[tabela]
+    inicio = time.perf_counter()
+    linhas = 0
+    conn = open_db()
+    try:
+        cursor = conn.execute(f'SELECT {", ".join(colunas)} FROM {tabela} ORDER BY id')
+        with open(arquivo, 'w', newline='', encoding='utf-8') as saida:
+            escritor = csv.writer(saida) if formato == 'csv' else None
+            if escritor:
+                escritor.writerow(colunas)
+            while True:
+                bloco = cursor.fetchmany(10000)
+                if not bloco:
+                    break
+                if escritor:
+                    escritor.writerows(bloco)
+                else:
+                    saida.writelines(json.dumps(dict(zip(colunas, row)), ensure_ascii=False) + '\n' for row in bloco)
+                linhas += len(bloco)
+    finally:
+        conn.close()
+    return linhas, time.perf_counter() - inicio
+
+# Popularidade das habilidades nos dados sintéticos (as primeiras da lista aparecem mais, como numa lei de Zipf)
+# e distribuição da quantidade de habilidades por perfil (1 a 5)
+SYNTHETIC_SKILL_WEIGHTS = [1 / (posicao + 1) for posicao in range(len(HABILIDADES_CHOICES))]
+SYNTHETIC_SKILL_COUNTS = [0.15, 0.3, 0.3, 0.15, 0.1]
+SYNTHETIC_SETORES = ['Tecnologia', 'Finanças', 'Saúde', 'Educação', 'Varejo', 'Indústria', 'Governo']
+
+# Função para sortear as habilidades de um perfil sintético, sem repetição
+def synthetic_skills(rng):
+    quantidade = rng.choices(range(1, len(SYNTHETIC_SKILL_COUNTS) + 1), SYNTHETIC_SKILL_COUNTS)[0]
+    habilidades = set()
+    while len(habilidades) < quantidade:
+        habilidades.add(rng.choices(HABILIDADES_CHOICES, SYNTHETIC_SKILL_WEIGHTS)[0][0])
+    return ', '.join(sorted(habilidades))
+
+# Função para gerar desenvolvedores sintéticos com ids a partir de primeiro_id
+# (e-mail dev<id>@exemplo.com; todos com o mesmo hash de senha, calculado uma vez)
+def synthetic_devs(rng, quantidade, primeiro_id, senha_hash):
+    for dev_id in range(primeiro_id, primeiro_id + quantidade):
+        yield {'id': dev_id, 'name': f'Dev {dev_id}', 'email': f'dev{dev_id}@exemplo.com', 'cel': f'119{dev_id:08d}',
+               'habilidades': synthetic_skills(rng), 'senha': senha_hash,
+               'tem_experiencia': 'Sim' if rng.random() < 0.6 else 'Não',
+               'salario_pretendido': round(min(rng.lognormvariate(1.7, 0.5), 50), 2) if rng.random() < 0.7 else None,
+               'horas_semanais_max': rng.choice([20, 30, 40, 44]) if rng.random() < 0.5 else None}
+
+# Função para gerar empresas sintéticas com ids a partir de primeiro_id (CNPJ é o id com 14 dígitos)
+def synthetic_empresas(rng, quantidade, primeiro_id, senha_hash):
+    for empresa_id in range(primeiro_id, primeiro_id + quantidade):
+        yield {'id': empresa_id, 'nome_empresa': f'Empresa {empresa_id}', 'cnpj': f'{empresa_id:014d}',
+               'setor': rng.choice(SYNTHETIC_SETORES), 'endereco': f'Rua {empresa_id}', 'email': f'rh{empresa_id}@exemplo.com',
+               'telefone': f'113{empresa_id:08d}', 'senha': senha_hash, 'habilidades': synthetic_skills(rng),
+               'horas_semanais': rng.choice([20, 30, 40, 44]), 'horas_diarias': rng.choice([4, 6, 8]),
+               'salario_ofertado': round(min(rng.lognormvariate(1.8, 0.5), 50), 2),
+               'experiencia_necessaria': 'Sim' if rng.random() < 0.4 else 'Não'}
+
+# Função para gerar swipes sintéticos: cada dev avalia em média `swipes` empresas, escolhidas com
+# preferência pelas mais populares; a empresa responde a parte deles e o resto fica pendente
+def synthetic_matches(rng, devs, empresas, swipes, taxa_like_dev, taxa_like_empresa, taxa_resposta):
+    popularidade = list(itertools.accumulate(1 / (posicao + 1) ** 0.5 for posicao in range(len(empresas))))
+    for dev_id in devs:
+        quantidade = min(int(rng.expovariate(1 / swipes)) if swipes else 0, len(empresas))
+        vistas = set()
+        while len(vistas) < quantidade:
+            vistas.add(empresas[bisect.bisect(popularidade, rng.random() * popularidade[-1]) % len(empresas)])
+        for empresa_id in vistas:
+            empresa_status = 'pending'
+            if rng.random() < taxa_resposta:
+                empresa_status = 'like' if rng.random() < taxa_like_empresa else 'dislike'
+            yield {'dev_id': dev_id, 'empresa_id': empresa_id,
+                   'dev_status': 'like' if rng.random() < taxa_like_dev else 'dislike', 'empresa_status': empresa_status}
+
+# Função para popular o banco com dados sintéticos reprodutíveis (mesma semente, mesmos dados);
+# retorna {tabela: (lidos, inseridos, segundos)}
+def generate_synthetic_data(devs, empresas, swipes, semente=42, senha='senha', taxa_like_dev=0.35,
+                            taxa_like_empresa=0.3, taxa_resposta=0.5, lote=50000):
+    rng = random.Random(semente)
+    senha_hash = hash_password(senha)
+    with contextlib.closing(open_db()) as conn:
+        primeiro_dev = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM devs').fetchone()[0]
+        primeira_empresa = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM empresas').fetchone()[0]
+    resultado = {}
+    resultado['devs'] = bulk_import('devs', synthetic_devs(rng, devs, primeiro_dev, senha_hash), lote)
+    resultado['empresas'] = bulk_import('empresas', synthetic_empresas(rng, empresas, primeira_empresa, senha_hash), lote)
+    resultado['matches'] = bulk_import('matches', synthetic_matches(
+        rng, range(primeiro_dev, primeiro_dev + devs), range(primeira_empresa, primeira_empresa + empresas),
+        swipes, taxa_like_dev, taxa_like_empresa, taxa_resposta), lote)
+    return resultado
+
+# Função para deduzir o formato pelo nome do arquivo quando --formato não é informado
+def bulk_format(arquivo, formato):
+    if formato:
+        return formato
+    return 'csv' if arquivo.lower().endswith('.csv') else 'jsonl'
+
+# Grupo de comandos "flask dados" para carga e exportação em massa
+dados_cli = AppGroup('dados', help='Carga e exportação em massa de devs, empresas e matches.')
+
+# Função para dizer se uma senha gravada já é um hash (e não texto puro de bancos antigos ou de cargas de teste)
+def is_password_hash(senha):
+    return senha.startswith(('pbkdf2:', 'scrypt:'))
+
+# Função para gerar o hash das senhas em texto puro dos registros em "processos" processos paralelos,
+# em blocos de "bloco" registros (o arquivo continua sendo lido aos poucos); senhas que já são hash passam direto
+def hash_record_passwords(registros, metodo, processos, bloco=1000):
+    gerar = functools.partial(generate_password_hash, method=metodo, salt_length=app.config['PASSWORD_SALT_LENGTH'])
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as pool:
+        while registros_bloco := list(itertools.islice(registros, bloco)):
+            texto = [registro for registro in registros_bloco if registro.get('senha') and not is_password_hash(registro['senha'])]
+            for registro, senha_hash in zip(texto, pool.map(gerar, [registro['senha'] for registro in texto], chunksize=16)):
+                registro['senha'] = senha_hash
+            yield from registros_bloco
+
+# Função para recusar, na carga sem --metodo-hash, registros com senha em texto puro
+# (as linhas anteriores, já com hash, continuam carregadas)
+def require_hashed_passwords(registros):
+    for linha, registro in enumerate(registros, 1):
+        if registro.get('senha') and not is_password_hash(registro['senha']):
+            raise click.ClickException(f'linha {linha}: senha em texto puro; importe senhas já com hash, '
+                                       'informe --metodo-hash ou use --senhas-em-texto')
+        yield registro
+
+# Comando "flask dados importar <tabela> <arquivo>"
+# Por padrão as senhas do arquivo já devem ser hash. Gerar o hash na carga é opcional (--metodo-hash) e
+# caro: cada hash PBKDF2 com as 600.000 iterações de PASSWORD_HASH_METHOD leva ~0,3s de CPU, ou seja,
+# ~50 minutos de CPU a cada 10 mil perfis; um método mais barato é refeito com PASSWORD_HASH_METHOD no primeiro login.
+# Roda fora do contexto da aplicação para que a migração do esquema abra e feche as próprias conexões
+@dados_cli.command('importar', with_appcontext=False)
+@click.argument('tabela', type=click.Choice(list(BULK_COLUMNS)))
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', type=click.Choice(['csv', 'jsonl']), help='Padrão: pela extensão do arquivo.')
+@click.option('--lote', default=50000, show_default=True, help='Linhas por transação.')
+@click.option('--metodo-hash', help='Gera na carga o hash das senhas em texto puro com este método. Custo: '
+                                    'pbkdf2:sha256:600000 (o de PASSWORD_HASH_METHOD) leva ~0,3s de CPU por senha, '
+                                    'horas para centenas de milhares de perfis; pbkdf2:sha256:50000 leva ~25ms. '
+                                    'O hash é refeito com PASSWORD_HASH_METHOD no primeiro login. '
+                                    'Sem esta opção, senhas em texto puro são recusadas.')
+@click.option('--processos', default=os.cpu_count() or 2, show_default=True, help='Processos que geram os hashes (com --metodo-hash).')
+@click.option('--senhas-em-texto', is_flag=True, help='Grava as senhas em texto puro (viram hash no primeiro login). Só para testes.')
+def importar_command(tabela, arquivo, formato, lote, metodo_hash, processos, senhas_em_texto):
+    if metodo_hash and senhas_em_texto:
+        raise click.UsageError('--metodo-hash e --senhas-em-texto não podem ser usados juntos')
+    migrate_db()
+    registros = read_records(arquivo, bulk_format(arquivo, formato))
+    if tabela != 'matches' and metodo_hash:
+        registros = hash_record_passwords(registros, metodo_hash, processos)
+    elif tabela != 'matches' and not senhas_em_texto:
+        registros = require_hashed_passwords(registros)
+
+    def progresso(lidos, inseridos, segundos):
+        click.echo(f'{lidos} lidas, {inseridos} inseridas ({lidos / segundos:,.0f} linhas/s)', err=True)
+
+    lidos, inseridos, segundos = bulk_import(tabela, registros, lote, progresso)
+    click.echo(f'{tabela}: {inseridos} de {lidos} linha(s) inseridas em {segundos:.2f}s '
+               f'({lidos / segundos if segundos else 0:,.0f} linhas/s); {lidos - inseridos} ignorada(s)')
+
+# Comando "flask dados exportar <tabela> <arquivo>"
+@dados_cli.command('exportar', with_appcontext=False)
+@click.argument('tabela', type=click.Choice(list(BULK_COLUMNS)))
+@click.argument('arquivo', type=click.Path(dir_okay=False))
+@click.option('--formato', type=click.Choice(['csv', 'jsonl']), help='Padrão: pela extensão do arquivo.')
+def exportar_command(tabela, arquivo, formato):
+    linhas, segundos = bulk_export(tabela, arquivo, bulk_format(arquivo, formato))
+    click.echo(f'{tabela}: {linhas} linha(s) exportadas em {segundos:.2f}s ({linhas / segundos if segundos else 0:,.0f} linhas/s)')
+
+# Comando "flask dados gerar": popula o banco com dados sintéticos para testes de carga
+# (login: dev<id>@exemplo.com ou o CNPJ com 14 dígitos, todos com a senha de --senha)
+@dados_cli.command('gerar', with_appcontext=False)
+@click.option('--devs', default=1000, show_default=True, help='Quantidade de desenvolvedores.')
+@click.option('--empresas', default=100, show_default=True, help='Quantidade de empresas.')
+@click.option('--swipes', default=20, show_default=True, help='Média de empresas avaliadas por desenvolvedor.')
+@click.option('--semente', default=42, show_default=True, help='Semente do gerador (mesma semente, mesmos dados).')
+@click.option('--senha', default='senha', show_default=True, help='Senha de todos os perfis gerados.')
+@click.option('--taxa-like-dev', default=0.35, show_default=True, help='Fração de likes dos desenvolvedores.')
+@click.option('--taxa-like-empresa', default=0.3, show_default=True, help='Fração de likes entre as respostas das empresas.')
+@click.option('--taxa-resposta', default=0.5, show_default=True, help='Fração dos swipes que a empresa já respondeu.')
+def gerar_command(devs, empresas, swipes, semente, senha, taxa_like_dev, taxa_like_empresa, taxa_resposta):
+    migrate_db()
+    resultado = generate_synthetic_data(devs, empresas, swipes, semente, senha, taxa_like_dev, taxa_like_empresa, taxa_resposta)
+    for tabela, (lidos, inseridos, segundos) in resultado.items():
+        click.echo(f'{tabela}: {inseridos} de {lidos} linha(s) geradas em {segundos:.2f}s ({lidos / segundos if segundos else 0:,.0f} linhas/s)')
+
+# Comando "flask dados arquivar": tira de matches os pares antigos sem like e guarda os dislikes nos blobs por usuário
+# (o espaço liberado fica para novas linhas; use --vacuum para devolvê-lo ao sistema de arquivos)
+@dados_cli.command('arquivar', with_appcontext=False)
+@click.option('--idade-dias', default=30, show_default=True, help='Arquiva pares cujo último swipe tem mais que isso.')
+@click.option('--lote', default=50000, show_default=True, help='Ids de matches percorridos por transação.')
+@click.option('--vacuum', is_flag=True, help='Compacta o arquivo do banco no fim (lento e exclusivo).')
+def arquivar_command(idade_dias, lote, vacuum):
+    migrate_db()
+    antes = database_size()
+
+    def progresso(percorridos, total, arquivadas, segundos):
+        click.echo(f'{percorridos}/{total} ids percorridos, {arquivadas} linha(s) arquivadas ({segundos:.1f}s)', err=True)
+
+    arquivadas, segundos = archive_swipes(idade_dias, lote, progresso)
+    if vacuum:
+        conn = open_db()
+        try:
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+    depois = database_size()
+    click.echo(f'{arquivadas} linha(s) arquivadas em {segundos:.2f}s')
+    click.echo(f"em uso: {antes['em_uso_bytes'] / 2**20:,.1f} MB -> {depois['em_uso_bytes'] / 2**20:,.1f} MB "
+               f"(arquivo: {depois['total_bytes'] / 2**20:,.1f} MB)")
+    for tabela, tamanho in depois.get('tabelas', {}).items():
+        click.echo(f"  {tabela}: {antes.get('tabelas', {}).get(tabela, 0) / 2**20:,.1f} MB -> {tamanho / 2**20:,.1f} MB")
+
+app.cli.add_command(dados_cli)
+
+# Função para obter a próxima empresa para um desenvolvedor
+def get_next_empresa_for_dev(dev_id):
+    return get_deck('dev', dev_id, 1)
+
+# Função para obter o próximo desenvolvedor para uma empresa
+def get_next_dev_for_empresa(empresa_id):
+    return get_deck('empresa', empresa_id, 1)
+
+# Tabela, coluna de login e coluna de nome de cada tipo de perfil
+LOGIN_TABLES = {'dev': ('devs', 'email', 'name'), 'empresa': ('empresas', 'cnpj', 'nome_empresa')}
+
+# Função para saber se a IntegrityError veio do índice único da chave de login (e-mail ou CNPJ repetido);
+# as demais (ex.: coluna obrigatória vazia) não são erro de cadastro duplicado
+def duplicate_login(erro, tipo):
+    tabela, coluna, _ = LOGIN_TABLES[tipo]
+    return str(erro) == f'UNIQUE constraint failed: {tabela}.{coluna}'
+
+# Colunas do perfil guardadas no cache de identidade: a senha fica de fora, mas a posição
+# é mantida porque os templates de perfil acessam algumas colunas pelo índice
+PROFILE_COLUMNS = {
+    'dev': 'id, name, email, cel, habilidades, NULL AS senha, foto, curriculo, tem_experiencia, salario_pretendido, horas_semanais_max',
+    'empresa': '''id, nome_empresa, cnpj, setor, endereco, email, telefone, NULL AS senha, logo, habilidades,
+                  horas_semanais, horas_diarias, salario_ofertado, experiencia_necessaria''',
+}
+
+# Função para gerar o hash com sal de uma senha
+def hash_password(senha):
+    return generate_password_hash(senha, method=app.config['PASSWORD_HASH_METHOD'], salt_length=app.config['PASSWORD_SALT_LENGTH'])
+
+# Hash descartável usado quando o login não existe, para que a verificação custe o mesmo
+@functools.lru_cache(maxsize=4)
+def dummy_password_hash(metodo):
+    return hash_password(uuid.uuid4().hex)
+
+# Função para verificar uma senha; retorna (confere, precisa_refazer_hash)
+# (senhas de bancos antigos ainda em texto puro são aceitas uma vez e refeitas em seguida)
+def verify_password(armazenada, senha):
+    metodo = app.config['PASSWORD_HASH_METHOD']
+    if armazenada is None:
+        check_password_hash(dummy_password_hash(metodo), senha)
+        return False, False
+    if not is_password_hash(armazenada):
+        return hmac.compare_digest(armazenada.encode(), senha.encode()), True
+    confere = check_password_hash(armazenada, senha)
+    return confere, confere and armazenada.split('$', 1)[0] != metodo
+
+# Função para autenticar um perfil pela chave de login (busca pelo índice único e verifica a senha em Python)
+def authenticate(tipo, chave, senha):
+    tabela, coluna, nome = LOGIN_TABLES[tipo]
+    with connect_db() as conn:
+        perfil = conn.execute(f'SELECT id, {nome} AS nome, senha FROM {tabela} WHERE {coluna} = ?', (chave,)).fetchone()
+        confere, refazer = verify_password(perfil['senha'] if perfil else None, senha)
+        if not confere:
+            return None
+        if refazer:
+            conn.execute(f'UPDATE {tabela} SET senha = ? WHERE id = ? AND senha = ?', (hash_password(senha), perfil['id'], perfil['senha']))
+    return {'tipo': tipo, 'id': perfil['id'], 'nome': perfil['nome']}
+
+# Linha de perfil que aceita acesso por posição e por nome de coluna, como sqlite3.Row,
+# mas que pode ser serializada para o cache compartilhado
+class ProfileRow(tuple):
+    def __new__(cls, colunas, valores):
+        row = super().__new__(cls, valores)
+        row.colunas = tuple(colunas)
+        return row
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            chave = self.colunas.index(chave)
+        return super().__getitem__(chave)
+
+    def keys(self):
+        return list(self.colunas)
+
+# Cache de perfis por (tipo, id): LRU com validade (TTL), descartando o menos usado quando cheio.
+# Com PROFILE_CACHE_URL os perfis ficam no Redis, e uma edição feita em qualquer processo vale para todos
+profile_cache = OrderedDict()
+profile_cache_lock = threading.Lock()
+profile_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidations': 0}
+profile_cache_backend = None
+
+# Função para obter o cliente do cache compartilhado (None quando não configurado)
+def get_profile_cache_backend():
+    global profile_cache_backend
+    url = app.config['PROFILE_CACHE_URL']
+    if not url:
+        return None
+    with profile_cache_lock:
+        if profile_cache_backend is None:
+            if redis is None:
+                raise RuntimeError('PROFILE_CACHE_URL configurada, mas o pacote redis não está instalado.')
+            profile_cache_backend = redis.Redis.from_url(url)
+    return profile_cache_backend
+
+# Função para ler um perfil do cache (None quando ausente ou vencido)
+def profile_cache_get(chave):
+    backend = get_profile_cache_backend()
+    if backend is not None:
+        valor = backend.get('perfil:%s:%d' % chave)
+        with profile_cache_lock:
+            profile_cache_stats['hits' if valor is not None else 'misses'] += 1
+        if valor is None:
+            return None
+        colunas, valores = json.loads(valor)
+        return ProfileRow(colunas, valores)
+    with profile_cache_lock:
+        entrada = profile_cache.get(chave)
+        if entrada is not None and entrada[0] < time.monotonic():
+            del profile_cache[chave]
+            profile_cache_stats['expired'] += 1
+            entrada = None
+        if entrada is None:
+            profile_cache_stats['misses'] += 1
+            return None
+        profile_cache.move_to_end(chave)
+        profile_cache_stats['hits'] += 1
+        return entrada[1]
+
+# Função para guardar um perfil no cache
+def profile_cache_set(chave, perfil):
+    ttl = app.config['PROFILE_CACHE_TTL']
+    backend = get_profile_cache_backend()
+    if backend is not None:
+        backend.setex('perfil:%s:%d' % chave, ttl, json.dumps([perfil.keys(), list(perfil)]))
+        return
+    with profile_cache_lock:
+        profile_cache[chave] = (time.monotonic() + ttl, perfil)
+        profile_cache.move_to_end(chave)
+        while len(profile_cache) > app.config['PROFILE_CACHE_SIZE']:
+            profile_cache.popitem(last=False)
+            profile_cache_stats['evictions'] += 1
+
+# Função para obter o perfil (sem a senha) de um desenvolvedor ou empresa, passando pelo cache
+def get_profile(tipo, perfil_id):
+    chave = (tipo, perfil_id)
+    perfil = profile_cache_get(chave)
+    if perfil is not None:
+        return perfil
+    with connect_db() as conn:
+        cursor = conn.execute(f'SELECT {PROFILE_COLUMNS[tipo]} FROM {LOGIN_TABLES[tipo][0]} WHERE id = ?', (perfil_id,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    perfil = ProfileRow([coluna[0] for coluna in cursor.description], tuple(row))
+    profile_cache_set(chave, perfil)
+    return perfil
+
+# Função para descartar um perfil do cache (e atualizar o nome na sessão de quem o editou);
+# chamada depois de toda escrita no perfil
+def invalidate_profile(tipo, perfil_id, nome=None):
+    backend = get_profile_cache_backend()
+    if backend is not None:
+        backend.delete('perfil:%s:%d' % (tipo, perfil_id))
+    with profile_cache_lock:
+        profile_cache.pop((tipo, perfil_id), None)
+        profile_cache_stats['invalidations'] += 1
+    identidade = session.get('identidade')
+    if nome is not None and identidade and identidade['tipo'] == tipo and identidade['id'] == perfil_id:
+        session['identidade'] = dict(identidade, nome=nome)
+
+# Função para obter a identidade de quem está usando a página
+# (a sessão assinada já traz id e nome de quem fez login; os demais casos vão ao cache)
+def current_identity(tipo, perfil_id):
+    identidade = session.get('identidade')
+    if identidade and identidade['tipo'] == tipo and identidade['id'] == perfil_id:
+        return identidade
+    return get_profile(tipo, perfil_id)
+
+# Classe de formulário para cadastro de desenvolvedores
+class DevForm(FlaskForm):
+    name = StringField('Nome', validators=[DataRequired()])
+    email = StringField('E-mail', validators=[DataRequired()])
+    cel = StringField('Celular', validators=[DataRequired()])
+    habilidades = SelectMultipleField(
+        'Habilidades', 
+        choices=HABILIDADES_CHOICES,
+        option_widget=widgets.CheckboxInput(),
+        widget=widgets.ListWidget(prefix_label=False)
+    )
+    foto = FileField('Foto do Desenvolvedor')
+    senha = PasswordField('Senha', validators=[DataRequired()])
+    curriculo = FileField('Currículo')
+    tem_experiencia = StringField('Tem Experiência', validators=[DataRequired()])
+    salario_pretendido = DecimalField('Salário Pretendido (opcional)', validators=[Optional(), NumberRange(min=0)], places=2)
+    horas_semanais_max = IntegerField('Máximo de Horas Semanais (opcional)', validators=[Optional(), NumberRange(min=0)])
+    submit = SubmitField('Cadastrar')
+
+# Classe de formulário para editar perfil de desenvolvedores
+class EditDevForm(FlaskForm):
+    name = StringField('Nome', validators=[DataRequired()])
+    email = StringField('E-mail', validators=[DataRequired()])
+    cel = StringField('Celular', validators=[DataRequired()])
+    habilidades = SelectMultipleField(
+        'Habilidades',
+        choices=HABILIDADES_CHOICES,
+        option_widget=widgets.CheckboxInput(),
+        widget=widgets.ListWidget(prefix_label=False)
+    )
+    foto = FileField('Atualizar Foto do Desenvolvedor')
+    curriculo = FileField('Atualizar Currículo')
+    tem_experiencia = StringField('Tem Experiência', validators=[DataRequired()])
+    salario_pretendido = DecimalField('Salário Pretendido (opcional)', validators=[Optional(), NumberRange(min=0)], places=2)
+    horas_semanais_max = IntegerField('Máximo de Horas Semanais (opcional)', validators=[Optional(), NumberRange(min=0)])
+    submit = SubmitField('Salvar Alterações')
+
+# Classe de formulário para cadastro de empresas
+class EmpresaForm(FlaskForm):
+    nome_empresa = StringField('Nome da Empresa', validators=[DataRequired()])
+    cnpj = StringField('CNPJ', validators=[DataRequired()])
+    setor = StringField('Setor de Atuação', validators=[DataRequired()])
+    endereco = TextAreaField('Endereço', validators=[DataRequired()])
+    email = StringField('E-mail', validators=[DataRequired()])
+    telefone = StringField('Telefone', validators=[DataRequired()])
+    logo = FileField('Logo da Empresa')
+    senha = PasswordField('Senha', validators=[DataRequired()])
+    horas_semanais = IntegerField('Horas Semanais', validators=[DataRequired(), NumberRange(min=0)])
+    horas_diarias = IntegerField('Horas Diárias', validators=[DataRequired(), NumberRange(min=0)])
+    salario_ofertado = DecimalField('Salário Ofertado', validators=[DataRequired(), NumberRange(min=0)], places=2)
+    experiencia_necessaria = StringField('Experiência Necessária', validators=[DataRequired()])
+    habilidades = SelectMultipleField(
+        'Habilidades Procuradas', 
+        choices=HABILIDADES_CHOICES,
+        option_widget=widgets.CheckboxInput(),
+        widget=widgets.ListWidget(prefix_label=False)
+    )
+    submit = SubmitField('Cadastrar Empresa')
+
+# Classe de formulário para editar perfil de empresas
+class EditEmpresaForm(FlaskForm):
+    nome_empresa = StringField('Nome da Empresa', validators=[DataRequired()])
+    cnpj = StringField('CNPJ', validators=[DataRequired()])
+    setor = StringField('Setor de Atuação', validators=[DataRequired()])
+    endereco = TextAreaField('Endereço', validators=[DataRequired()])
+    email = StringField('E-mail', validators=[DataRequired()])
+    telefone = StringField('Telefone', validators=[DataRequired()])
+    habilidades = SelectMultipleField(
+        'Habilidades Procuradas',
+        choices=HABILIDADES_CHOICES,
+        option_widget=widgets.CheckboxInput(),
+        widget=widgets.ListWidget(prefix_label=False)
+    )
+    horas_semanais = IntegerField('Horas Semanais', validators=[DataRequired(), NumberRange(min=0)])
+    horas_diarias = IntegerField('Horas Diárias', validators=[DataRequired(), NumberRange(min=0)])
+    salario_ofertado = DecimalField('Salário Ofertado', validators=[DataRequired(), NumberRange(min=0)], places=2)
+    experiencia_necessaria = StringField('Experiência Necessária', validators=[DataRequired()])
+    logo = FileField('Atualizar Logo da Empresa')
+    submit = SubmitField('Salvar Alterações')
+
+# Quantidade de perfis por página nas listagens e de logos no mural da página inicial
+LIST_PAGE_SIZE = 24
+HOME_LOGOS = 12
+HOME_LOGOS_TTL = 300
+
+# Amostra de logos do mural guardada em memória: (expira_em, logos)
+home_logos_cache = (0, [])
+
+# Função para sortear uma amostra de logos: escolhe um id aleatório e lê uma janela
+# contígua a partir dele pelo índice parcial idx_empresas_logo, sem varrer a tabela
+def sample_home_logos():
+    with connect_db() as conn:
+        limites = conn.execute('SELECT MIN(id), MAX(id) FROM empresas WHERE logo IS NOT NULL').fetchone()
+        if limites[0] is None:
+            return []
+        inicio = random.randint(limites[0], limites[1])
+        logos = conn.execute('SELECT logo FROM empresas WHERE logo IS NOT NULL AND id >= ? ORDER BY id LIMIT ?',
+                             (inicio, HOME_LOGOS)).fetchall()
+        if len(logos) < HOME_LOGOS:
+            logos += conn.execute('SELECT logo FROM empresas WHERE logo IS NOT NULL AND id < ? ORDER BY id LIMIT ?',
+                                  (inicio, HOME_LOGOS - len(logos))).fetchall()
+    return [dict(logo) for logo in logos]
+
+# Função para obter os logos do mural, sorteando uma nova amostra a cada HOME_LOGOS_TTL segundos
+def get_home_logos():
+    global home_logos_cache
+    expira_em, logos = home_logos_cache
+    if time.time() >= expira_em:
+        logos = sample_home_logos()
+        home_logos_cache = (time.time() + HOME_LOGOS_TTL, logos)
+    return logos
+
+# Função para ler o cursor das listagens (último id exibido na página anterior)
+def list_cursor():
+    return request.args.get('depois', 0, type=int)
+
+# Função para montar o cursor da próxima página de uma listagem
+def next_list_cursor(rows):
+    return rows[-1]['id'] if len(rows) == LIST_PAGE_SIZE else None
+
+# Rota principal (home)
+@app.route("/")
+def home():
+    return render_template("index.html", empresas=get_home_logos())
+
+# Rota para login de desenvolvedor
+@app.route("/dev/login", methods=["GET", "POST"])
+def dev_login():
+    if request.method == "POST":
+        email = request.form['email']
+        senha = request.form['senha']
+        dev = authenticate('dev', email, senha)
+        if dev:
+            session['identidade'] = dev
+            return redirect(url_for('dev_profile', dev_id=dev['id']))
+        else:
+            return render_template("dev_login.html", error="Credenciais inválidas.")
+    return render_template("dev_login.html")
+
+# Rota para exibir perfil de desenvolvedor
+@app.route("/dev/profile/<int:dev_id>")
+def dev_profile(dev_id):
+    dev = get_profile('dev', dev_id)
+    return render_template("dev_profile.html", dev=dev)
+
+# Rota para exibir todas as empresas (paginada por chave, só com as colunas do cartão)
+@app.route("/empresas")
+def show_empresas():
+    with connect_db() as conn:
+        empresas = conn.execute(f'SELECT {EMPRESA_CARD_COLUMNS} FROM empresas WHERE id > ? ORDER BY id LIMIT ?',
+                                (list_cursor(), LIST_PAGE_SIZE)).fetchall()
+    return stream_template("empresas.html", empresas=empresas, dev_id=None, next_cursor=next_list_cursor(empresas))
+
+# Rota para curtir um desenvolvedor por uma empresa
+@app.route("/empresa/like/<int:dev_id>", methods=["POST"])
+def empresa_like(dev_id):
+    empresa_id = request.form.get('empresa_id')
+    if not empresa_id:
+        return redirect(url_for('empresa_login'))
+    empresa_id = int(empresa_id)
+    action = request.form.get('action')
+    if action not in ('like', 'dislike'):
+        return redirect(url_for('empresa_swipe', empresa_id=empresa_id))
+
+    with connect_db() as conn:
+        match = record_swipe(conn, 'empresa', dev_id, empresa_id, action)
+        if match:
+            flash(f"Parabéns! Você deu match com o desenvolvedor {get_profile('dev', dev_id)['name']}!", 'match')
+
+    discard_card('empresa', empresa_id, dev_id)
+    if action == 'like':
+        forget_deck('dev', dev_id)
+    return redirect(url_for('empresa_swipe', empresa_id=empresa_id))
+
+# Rota para exibir próximos desenvolvedores para uma empresa curtir
+@app.route("/empresa/swipe/<int:empresa_id>")
+def empresa_swipe(empresa_id):
+    devs = get_next_dev_for_empresa(empresa_id)
+    empresa = current_identity('empresa', empresa_id)
+    if not devs:
+        return render_template("nao_tem_devs.html", empresa=empresa)
+    return render_template("devs.html", devs=devs, empresa_id=empresa_id, empresa=empresa,
+                           admiradores=pending_admirers('empresa', empresa_id), notificacoes=True)
+
+# Rota para obter em JSON o baralho de desenvolvedores de uma empresa
+@app.route("/empresa/deck/<int:empresa_id>")
+def empresa_deck(empresa_id):
+    n = min(max(request.args.get('n', DECK_SIZE, type=int), 1), 100)
+    return jsonify(empresa_id=empresa_id, admiradores=pending_admirers('empresa', empresa_id), devs=get_deck('empresa', empresa_id, n))
+
+# Rota para login de empresa
+@app.route("/empresa/login", methods=["GET", "POST"])
+def empresa_login():
+    if request.method == "POST":
+        cnpj = request.form['cnpj']
+        senha = request.form['senha']
+        empresa = authenticate('empresa', cnpj, senha)
+        if empresa:
+            session['identidade'] = empresa
+            return redirect(url_for('empresa_profile', empresa_id=empresa['id']))
+        else:
+            return render_template("empresa_login.html", error="Credenciais inválidas.")
+    return render_template("empresa_login.html")
+
+# Rota para exibir perfil de empresa
+@app.route("/empresa/profile/<int:empresa_id>")
+def empresa_profile(empresa_id):
+    empresa = get_profile('empresa', empresa_id)
+    return render_template("empresa_profile.html", empresa=empresa)
+
+# Rota para exibir todos os desenvolvedores (paginada por chave, só com as colunas do cartão)
+@app.route("/devs")
+def show_devs():
+    with connect_db() as conn:
+        devs = conn.execute(f'SELECT {DEV_CARD_COLUMNS} FROM devs WHERE id > ? ORDER BY id LIMIT ?',
+                            (list_cursor(), LIST_PAGE_SIZE)).fetchall()
+    return stream_template("devs.html", devs=devs, next_cursor=next_list_cursor(devs))
+
+# Rota para curtir uma empresa por um desenvolvedor
+@app.route("/dev/like/<int:empresa_id>", methods=["POST"])
+def dev_like(empresa_id):
+    dev_id = request.form.get('dev_id')
+    if not dev_id:
+        return redirect(url_for('dev_login'))
+    dev_id = int(dev_id)
+    action = request.form.get('action')
+    if action not in ('like', 'dislike'):
+        return redirect(url_for('dev_swipe', dev_id=dev_id))
+
+    with connect_db() as conn:
+        match = record_swipe(conn, 'dev', dev_id, empresa_id, action)
+        if match:
+            flash(f"Parabéns! Você deu match com a empresa {get_profile('empresa', empresa_id)['nome_empresa']}!", 'match')
+
+    discard_card('dev', dev_id, empresa_id)
+    if action == 'like':
+        forget_deck('empresa', empresa_id)
+    return redirect(url_for('dev_swipe', dev_id=dev_id))
+
+
+# Rota para exibir próximas empresas para um desenvolvedor curtir
+@app.route("/dev/swipe/<int:dev_id>")
+def dev_swipe(dev_id):
+    empresas = get_next_empresa_for_dev(dev_id)
+    dev = current_identity('dev', dev_id)
+    if not empresas:
+        return render_template("nao_tem_empresas.html", dev=dev)
+    return render_template("empresas.html", empresas=empresas, dev_id=dev_id, dev=dev,
+                           admiradores=pending_admirers('dev', dev_id), notificacoes=True)
+
+# Rota para obter em JSON o baralho de empresas de um desenvolvedor
+@app.route("/dev/deck/<int:dev_id>")
+def dev_deck(dev_id):
+    n = min(max(request.args.get('n', DECK_SIZE, type=int), 1), 100)
+    return jsonify(dev_id=dev_id, admiradores=pending_admirers('dev', dev_id), empresas=get_deck('dev', dev_id, n))
+
+# Função para escrever uma família de métricas no formato texto do Prometheus;
+# "amostras" é {rótulos: valor}, com '' para a amostra sem rótulos
+def metric_family(nome, tipo, ajuda, amostras):
+    linhas = [f'# HELP tinderjob_{nome} {ajuda}', f'# TYPE tinderjob_{nome} {tipo}']
+    linhas += [f'tinderjob_{nome}{{{rotulos}}} {valor}' if rotulos else f'tinderjob_{nome} {valor}' for rotulos, valor in amostras.items()]
+    return linhas
+
+# Rota com as métricas no formato texto do Prometheus: latência por rota, SQL, caches de baralho e de perfis,
+# buffer de swipes e fila de currículos (as do distribuidor de notificações ficam no /metrics do servidor ASGI)
+@app.route("/metrics")
+def metrics():
+    linhas = ['# HELP tinderjob_request_duration_seconds Latência das requisições por rota.',
+              '# TYPE tinderjob_request_duration_seconds histogram']
+    with metrics_lock:
+        rotas = {chave: dict(valor, buckets=list(valor['buckets'])) for chave, valor in route_metrics.items()}
+        sql = dict(sql_metrics)
+    for (metodo, rota), registro in sorted(rotas.items()):
+        rotulos = f'method="{metodo}",route="{rota}"'
+        for limite, quantidade in zip(LATENCY_BUCKETS, registro['buckets']):
+            linhas.append(f'tinderjob_request_duration_seconds_bucket{{{rotulos},le="{limite}"}} {quantidade}')
+        linhas.append(f'tinderjob_request_duration_seconds_bucket{{{rotulos},le="+Inf"}} {registro["total"]}')
+        linhas.append(f'tinderjob_request_duration_seconds_sum{{{rotulos}}} {registro["soma"]:.6f}')
+        linhas.append(f'tinderjob_request_duration_seconds_count{{{rotulos}}} {registro["total"]}')
+    linhas += ['# HELP tinderjob_sql_queries_total Comandos SQL executados.', '# TYPE tinderjob_sql_queries_total counter',
+               f'tinderjob_sql_queries_total {sql["queries"]}',
+               '# HELP tinderjob_sql_duration_seconds_total Tempo total gasto em comandos SQL.', '# TYPE tinderjob_sql_duration_seconds_total counter',
+               f'tinderjob_sql_duration_seconds_total {sql["seconds"]:.6f}',
+               '# HELP tinderjob_sql_slow_queries_total Comandos acima de SLOW_QUERY_MS.', '# TYPE tinderjob_sql_slow_queries_total counter',
+               f'tinderjob_sql_slow_queries_total {sql["slow"]}']
+    with deck_lock:
+        deck = dict(deck_stats, size=len(deck_cache))
+    linhas += metric_family('deck_cache_events_total', 'counter', 'Eventos do cache de baralhos.',
+                            {f'evento="{evento}"': deck[evento] for evento in ('hits', 'misses', 'evictions', 'expired')})
+    linhas += metric_family('deck_refills_total', 'counter', 'Recargas de baralho no banco.', {'': deck['refills']})
+    linhas += metric_family('deck_refill_rows_total', 'counter', 'Cartões lidos nas recargas de baralho.', {'': deck['refill_rows']})
+    linhas += metric_family('deck_refill_seconds_total', 'counter', 'Tempo gasto nas recargas de baralho.', {'': f'{deck["refill_ms"] / 1000:.6f}'})
+    linhas += metric_family('deck_cache_size', 'gauge', 'Baralhos guardados no cache deste processo.', {'': deck['size']})
+    with profile_cache_lock:
+        perfis = dict(profile_cache_stats, size=len(profile_cache))
+    backend = 'redis' if app.config['PROFILE_CACHE_URL'] else 'local'
+    linhas += metric_family('profile_cache_events_total', 'counter', 'Eventos do cache de perfis.',
+                            {f'backend="{backend}",evento="{evento}"': perfis[evento]
+                             for evento in ('hits', 'misses', 'evictions', 'expired', 'invalidations')})
+    linhas += metric_family('profile_cache_size', 'gauge', 'Perfis guardados no cache local deste processo.', {'': perfis['size']})
+    buffer = get_swipe_buffer()
+    if buffer is not None:
+        with buffer.cond:
+            escrita = dict(buffer.stats, pending=len(buffer.pending), inflight=len(buffer.inflight))
+        linhas += metric_family('swipe_buffer_swipes_total', 'counter', 'Swipes aceitos pelo buffer de escrita atrasada.', {'': escrita['swipes']})
+        linhas += metric_family('swipe_buffer_flushes_total', 'counter', 'Descargas do buffer de swipes, por resultado.',
+                                {'resultado="ok"': escrita['flushes'], 'resultado="erro"': escrita['flush_errors']})
+        linhas += metric_family('swipe_buffer_flushed_rows_total', 'counter', 'Swipes gravados no banco pelo buffer.', {'': escrita['flushed_rows']})
+        linhas += metric_family('swipe_buffer_flush_seconds_total', 'counter', 'Tempo gasto nas descargas do buffer.',
+                                {'': f'{escrita["flush_ms_total"] / 1000:.6f}'})
+        linhas += metric_family('swipe_buffer_flush_seconds_max', 'gauge', 'Descarga mais lenta do buffer.', {'': f'{escrita["flush_ms_max"] / 1000:.6f}'})
+        linhas += metric_family('swipe_buffer_pending', 'gauge', 'Swipes aguardando descarga, por estado.',
+                                {'estado="pendente"': escrita['pending'], 'estado="gravando"': escrita['inflight']})
+    with connect_db() as conn:
+        fila = dict(conn.execute('SELECT status, COUNT(*) FROM curriculo_jobs GROUP BY status').fetchall())
+    linhas += metric_family('curriculos_fila', 'gauge', 'Jobs de currículo no banco, por status.',
+                            {f'status="{status}"': quantidade for status, quantidade in sorted(fila.items())})
+    if resume_queue is not None:
+        with resume_queue.cond:
+            curriculos = dict(resume_queue.stats, em_andamento=len(resume_queue.running))
+        linhas += metric_family('curriculos_total', 'counter', 'Currículos processados neste processo, por resultado.',
+                                {f'resultado="{resultado}"': curriculos[resultado] for resultado in ('concluidos', 'falhas', 'retentativas')})
+        linhas += metric_family('curriculos_bytes_total', 'counter', 'Bytes de currículo lidos na extração.', {'': curriculos['bytes']})
+        linhas += metric_family('curriculos_extracao_seconds_total', 'counter', 'Tempo gasto na extração de texto.',
+                                {'': f'{curriculos["segundos"]:.6f}'})
+        linhas += metric_family('curriculos_em_andamento', 'gauge', 'Currículos sendo extraídos agora.', {'': curriculos['em_andamento']})
+    return Response('\n'.join(linhas) + '\n', mimetype='text/plain; version=0.0.4')
+
+# Rota de busca de desenvolvedores: ?q=texto&habilidades=python&habilidades=sql&experiencia=1&depois=<cursor>;
+# "curriculo" busca no texto extraído dos currículos e "curriculo_habilidades" exige habilidades detectadas neles
+@app.route("/api/busca/devs")
+def search_devs():
+    filtros, parametros = [], {}
+    search_common_filters('devs', filtros, parametros)
+    termos_curriculo = fts_terms(request.args.get('curriculo'))
+    if termos_curriculo:
+        filtros.append('''devs.curriculo IN (SELECT arquivo FROM curriculos_texto
+                                             WHERE id IN (SELECT rowid FROM curriculos_texto_fts WHERE curriculos_texto_fts MATCH :curriculo))''')
+        parametros['curriculo'] = ' '.join(termos_curriculo)
+    mask_curriculo = skills_mask(request.args.getlist('curriculo_habilidades'))
+    if mask_curriculo:
+        filtros.append('devs.curriculo IN (SELECT arquivo FROM curriculos_texto WHERE habilidades_mask & :curriculo_mask = :curriculo_mask)')
+        parametros['curriculo_mask'] = mask_curriculo
+    limite = min(max(request.args.get('limite', SEARCH_PAGE_SIZE, type=int), 1), 100)
+    resultados, proximo, ordenacao, facetas = search_profiles('devs', fts_terms(request.args.get('q')), filtros, parametros, search_cursor(), limite)
+    return jsonify(resultados=resultados, proximo=proximo, ordenacao=ordenacao, facetas=facetas)
+
+# Rota de busca de empresas: além de texto, habilidades e experiência,
+# aceita setor, endereco (texto), salario_min, salario_max e horas_max (semanais)
+@app.route("/api/busca/empresas")
+def search_empresas():
+    filtros, parametros = [], {}
+    search_common_filters('empresas', filtros, parametros)
+    if request.args.get('setor'):
+        filtros.append('empresas.setor = :setor')
+        parametros['setor'] = request.args['setor']
+    for argumento, condicao in (('salario_min', 'empresas.salario_ofertado >= :salario_min'),
+                                ('salario_max', 'empresas.salario_ofertado <= :salario_max'),
+                                ('horas_max', 'empresas.horas_semanais <= :horas_max')):
+        valor = request.args.get(argumento, type=float)
+        if valor is not None:
+            filtros.append(condicao)
+            parametros[argumento] = valor
+    termos = fts_terms(request.args.get('q')) + fts_terms(request.args.get('endereco'), 'endereco')
+    limite = min(max(request.args.get('limite', SEARCH_PAGE_SIZE, type=int), 1), 100)
+    resultados, proximo, ordenacao, facetas = search_profiles('empresas', termos, filtros, parametros, search_cursor(), limite)
+    return jsonify(resultados=resultados, proximo=proximo, ordenacao=ordenacao, facetas=facetas)
+
+# Rota de filtro por habilidades pelo índice invertido: ?habilidades=python&habilidades=sql&modo=todas (E, padrão)
+# ou modo=alguma (OU), paginada por id com ?depois=<último id>. "proximo" é nulo na última página
+@app.route("/api/habilidades/<tipo>")
+def skill_filter(tipo):
+    buscar = {'devs': find_devs_by_skills, 'empresas': find_empresas_by_skills}.get(tipo)
+    if buscar is None:
+        return jsonify(erro='tipo deve ser devs ou empresas'), 404
+    modo = request.args.get('modo', 'todas')
+    if modo not in ('todas', 'alguma'):
+        return jsonify(erro='modo deve ser todas ou alguma'), 400
+    limite = min(max(request.args.get('limite', SEARCH_PAGE_SIZE, type=int), 1), 100)
+    perfis = [dict(perfil) for perfil in buscar(request.args.getlist('habilidades'), modo == 'todas',
+                                                 max(request.args.get('depois', 0, type=int), 0), limite)]
+    proximo = perfis[-1]['id'] if len(perfis) == limite else None
+    return jsonify(resultados=perfis, proximo=proximo)
+
+# Rota para registro de desenvolvedor
+@app.route("/dev/register", methods=["GET", "POST"])
+def dev_register():
+    form = DevForm()
+    if form.validate_on_submit():
+        habilidades_selecionadas = ', '.join(form.habilidades.data)
+        foto_filename = None
+        curriculo_filename = None
+
+        # Upload de foto
+        if 'foto' in request.files:
+            foto_filename = store_upload(request.files['foto'], 'fotos', 'dev')
+            schedule_image_processing(app.config['UPLOAD_FOLDER'], foto_filename)
+
+        # Upload de currículo
+        if 'curriculo' in request.files:
+            curriculo_filename = store_upload(request.files['curriculo'], 'curriculos', 'curriculo')
+
+        try:
+            with connect_db() as conn:
+                cursor = conn.execute('''INSERT INTO devs (name, email, cel, habilidades, senha, foto, curriculo, tem_experiencia, habilidades_mask, experiencia_flag,
+                                                           salario_pretendido, horas_semanais_max)
+                                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                                      (form.name.data, form.email.data, form.cel.data, habilidades_selecionadas, hash_password(form.senha.data), foto_filename, curriculo_filename, form.tem_experiencia.data,
+                                       skills_mask(form.habilidades.data), experiencia_flag(form.tem_experiencia.data),
+                                       optional_float(form.salario_pretendido.data), form.horas_semanais_max.data))
+                set_profile_skills(conn, 'dev', cursor.lastrowid, form.habilidades.data)
+                enqueue_resume(conn, curriculo_filename)
+        except sqlite3.IntegrityError as erro:
+            if not duplicate_login(erro, 'dev'):
+                raise
+            form.email.errors.append('Já existe um desenvolvedor com este e-mail.')
+            return render_template("dev_register.html", form=form)
+        if curriculo_filename:
+            wake_resume_queue()
+        invalidate_decks('dev')
+        invalidate_profile('dev', cursor.lastrowid)
+        return redirect(url_for('home'))
+    return render_template("dev_register.html", form=form)
+
+# Rota para edição de perfil de desenvolvedor
+@app.route("/dev/profile/edit/<int:dev_id>", methods=["GET", "POST"])
+def edit_dev_profile(dev_id):
+    dev = get_profile('dev', dev_id)
+
+    form = EditDevForm()
+
+    if request.method == 'GET':
+        form.name.data = dev['name']
+        form.email.data = dev['email']
+        form.cel.data = dev['cel']
+        form.habilidades.data = dev['habilidades'].split(', ')
+        form.tem_experiencia.data = dev['tem_experiencia']
+        form.salario_pretendido.data = dev['salario_pretendido']
+        form.horas_semanais_max.data = dev['horas_semanais_max']
+    elif form.validate_on_submit():
+        habilidades_selecionadas = ', '.join(form.habilidades.data)
+        foto_filename = dev['foto']
+        curriculo_filename = dev['curriculo']
+        if 'foto' in request.files and request.files['foto'].filename != '':
+            foto_filename = store_upload(request.files['foto'], 'fotos', 'dev') or foto_filename
+            schedule_image_processing(app.config['UPLOAD_FOLDER'], foto_filename)
+        if 'curriculo' in request.files and request.files['curriculo'].filename != '':
+            curriculo_filename = store_upload(request.files['curriculo'], 'curriculos', 'curriculo') or curriculo_filename
+
+        try:
+            with connect_db() as conn:
+                conn.execute('''
+                    UPDATE devs
+                    SET name = ?, email = ?, cel = ?, habilidades = ?, foto = ?, curriculo = ?, tem_experiencia = ?, habilidades_mask = ?, experiencia_flag = ?,
+                        salario_pretendido = ?, horas_semanais_max = ?
+                    WHERE id = ?
+                ''', (form.name.data, form.email.data, form.cel.data, habilidades_selecionadas, foto_filename, curriculo_filename, form.tem_experiencia.data,
+                      skills_mask(form.habilidades.data), experiencia_flag(form.tem_experiencia.data),
+                      optional_float(form.salario_pretendido.data), form.horas_semanais_max.data, dev_id))
+                set_profile_skills(conn, 'dev', dev_id, form.habilidades.data)
+                enqueue_resume(conn, curriculo_filename)
+        except sqlite3.IntegrityError as erro:
+            if not duplicate_login(erro, 'dev'):
+                raise
+            form.email.errors.append('Já existe um desenvolvedor com este e-mail.')
+            return render_template('edit_dev_profile.html', form=form, dev_id=dev_id)
+        if curriculo_filename != dev['curriculo']:
+            wake_resume_queue()
+        invalidate_decks('dev', dev_id)
+        invalidate_profile('dev', dev_id, form.name.data)
+        flash('Perfil atualizado com sucesso!', 'success')
+        return redirect(url_for('dev_profile', dev_id=dev_id))
+
+    return render_template('edit_dev_profile.html', form=form, dev_id=dev_id)
+
+# Rota para registro de empresa
+@app.route("/empresa/register", methods=["GET", "POST"])
+def empresa_register():
+    form = EmpresaForm()
+    if form.validate_on_submit():
+        habilidades_selecionadas = ', '.join(form.habilidades.data)
+        logo_filename = None
+        if 'logo' in request.files:
+            logo_filename = store_upload(request.files['logo'], 'logo', 'empresa')
+            schedule_image_processing(app.config['UPLOAD_FOLDER_LOGO'], logo_filename)
+        
+        try:
+            with connect_db() as conn:
+                cursor = conn.execute('''INSERT INTO empresas (nome_empresa, cnpj, setor, endereco, email, telefone, senha, logo, habilidades, horas_semanais, horas_diarias, salario_ofertado, experiencia_necessaria, habilidades_mask, experiencia_flag)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (form.nome_empresa.data, form.cnpj.data, form.setor.data, form.endereco.data, 
+                      form.email.data, form.telefone.data, hash_password(form.senha.data), logo_filename, habilidades_selecionadas,
+                      form.horas_semanais.data, form.horas_diarias.data, float(form.salario_ofertado.data), form.experiencia_necessaria.data,
+                      skills_mask(form.habilidades.data), experiencia_flag(form.experiencia_necessaria.data)))
+                set_profile_skills(conn, 'empresa', cursor.lastrowid, form.habilidades.data)
+        except sqlite3.IntegrityError as erro:
+            if not duplicate_login(erro, 'empresa'):
+                raise
+            form.cnpj.errors.append('Já existe uma empresa com este CNPJ.')
+            return render_template("empresa_register.html", form=form)
+        invalidate_decks('empresa')
+        invalidate_profile('empresa', cursor.lastrowid)
+        return redirect(url_for('home'))
+    return render_template("empresa_register.html", form=form)
+
+# Rota para edição de perfil de empresa
+@app.route("/empresa/profile/edit/<int:empresa_id>", methods=["GET", "POST"])
+def edit_empresa_profile(empresa_id):
+    empresa = get_profile('empresa', empresa_id)
+    form = EditEmpresaForm()
+    if request.method == 'GET':
+        form.nome_empresa.data = empresa['nome_empresa']
+        form.cnpj.data = empresa['cnpj']
+        form.setor.data = empresa['setor']
+        form.endereco.data = empresa['endereco']
+        form.email.data = empresa['email']
+        form.telefone.data = empresa['telefone']
+        form.habilidades.data = empresa['habilidades'].split(', ') if empresa['habilidades'] else []
+        form.horas_semanais.data = empresa['horas_semanais']
+        form.horas_diarias.data = empresa['horas_diarias']
+        form.salario_ofertado.data = empresa['salario_ofertado']
+        form.experiencia_necessaria.data = empresa['experiencia_necessaria']
+    elif form.validate_on_submit():
+        habilidades_selecionadas = ', '.join(form.habilidades.data)
+        logo_filename = empresa['logo']
+        if 'logo' in request.files and request.files['logo'].filename != '':
+            logo_filename = store_upload(request.files['logo'], 'logo', 'empresa') or logo_filename
+            schedule_image_processing(app.config['UPLOAD_FOLDER_LOGO'], logo_filename)
+
+        try:
+            with connect_db() as conn:
+                conn.execute('''
+                    UPDATE empresas
+                    SET nome_empresa = ?, cnpj = ?, setor = ?, endereco = ?, email = ?, telefone = ?, habilidades = ?, logo = ?, horas_semanais = ?, horas_diarias = ?, salario_ofertado = ?, experiencia_necessaria = ?, habilidades_mask = ?, experiencia_flag = ?
+                    WHERE id = ?
+                ''', (form.nome_empresa.data, form.cnpj.data, form.setor.data, form.endereco.data,
+                    form.email.data, form.telefone.data, habilidades_selecionadas, logo_filename,
+                    form.horas_semanais.data, form.horas_diarias.data, float(form.salario_ofertado.data), form.experiencia_necessaria.data,
+                    skills_mask(form.habilidades.data), experiencia_flag(form.experiencia_necessaria.data), empresa_id))
+                set_profile_skills(conn, 'empresa', empresa_id, form.habilidades.data)
+        except sqlite3.IntegrityError as erro:
+            if not duplicate_login(erro, 'empresa'):
+                raise
+            form.cnpj.errors.append('Já existe uma empresa com este CNPJ.')
+            return render_template('edit_empresa_profile.html', form=form, empresa_id=empresa_id)
+        invalidate_decks('empresa', empresa_id)
+        invalidate_profile('empresa', empresa_id, form.nome_empresa.data)
+        flash('Perfil atualizado com sucesso!', 'success')
+        return redirect(url_for('empresa_profile', empresa_id=empresa_id))
+
+    return render_template('edit_empresa_profile.html', form=form, empresa_id=empresa_id)
+
+# Quantidade de matches por página
+MATCHES_PAGE_SIZE = 20
+
+# Função para ler o cursor de paginação "matched_at|id" da query string
+# (sem cursor começa do match mais recente)
+def matches_cursor():
+    cursor = request.args.get('antes', '')
+    data, _, perfil_id = cursor.rpartition('|')
+    if not data or not perfil_id.isdigit():
+        return ('9999-12-31', 0)
+    return (data, int(perfil_id))
+
+# Função para montar o cursor da próxima página a partir da última linha exibida
+def next_matches_cursor(matches, coluna_id):
+    if len(matches) < MATCHES_PAGE_SIZE:
+        return None
+    ultimo = matches[-1]
+    return f"{ultimo['matched_at']}|{ultimo[coluna_id]}"
+
+# Rota para exibir matches de desenvolvedor
+# (varredura de faixa no índice idx_mutual_matches_dev, paginada por chave)
+@app.route("/dev/matches/<int:dev_id>")
+def dev_matches(dev_id):
+    with connect_db() as conn:
+        matches = conn.execute('''
+            SELECT mutual_matches.matched_at, empresas.id, empresas.nome_empresa, empresas.setor, empresas.habilidades,
+                   empresas.horas_semanais, empresas.horas_diarias, empresas.salario_ofertado, empresas.experiencia_necessaria
+            FROM mutual_matches
+            JOIN empresas ON mutual_matches.empresa_id = empresas.id
+            WHERE mutual_matches.dev_id = ? AND (mutual_matches.matched_at, mutual_matches.empresa_id) < (?, ?)
+            ORDER BY mutual_matches.matched_at DESC, mutual_matches.empresa_id DESC
+            LIMIT ?
+        ''', (dev_id, *matches_cursor(), MATCHES_PAGE_SIZE)).fetchall()
+    return render_template("dev_matches.html", matches=matches, dev_id=dev_id, next_cursor=next_matches_cursor(matches, 'id'),
+                           notificacoes=True)
+
+# Rota para exibir matches de empresa
+# (varredura de faixa no índice idx_mutual_matches_empresa, paginada por chave)
+@app.route("/empresa/matches/<int:empresa_id>")
+def empresa_matches(empresa_id):
+    with connect_db() as conn:
+        matches = conn.execute('''
+            SELECT mutual_matches.matched_at, devs.id, devs.name, devs.email, devs.cel, devs.habilidades,
+                   devs.tem_experiencia, devs.curriculo
+            FROM mutual_matches
+            JOIN devs ON mutual_matches.dev_id = devs.id
+            WHERE mutual_matches.empresa_id = ? AND (mutual_matches.matched_at, mutual_matches.dev_id) < (?, ?)
+            ORDER BY mutual_matches.matched_at DESC, mutual_matches.dev_id DESC
+            LIMIT ?
+        ''', (empresa_id, *matches_cursor(), MATCHES_PAGE_SIZE)).fetchall()
+    return render_template("empresa_matches.html", matches=matches, empresa_id=empresa_id, next_cursor=next_matches_cursor(matches, 'id'),
+                           notificacoes=True)
+
+# Rota para exibir a página "Fale Conosco"
+@app.route("/fale_conosco", methods=["GET", "POST"])
+def fale_conosco():
+    if request.method == "POST":
+        nome = request.form['nome']
+        email = request.form['email']
+        mensagem = request.form['mensagem']
+        flash('Sua mensagem foi enviada com sucesso!', 'success')
+        return redirect(url_for('fale_conosco'))
+    return render_template("fale_conosco.html")
+
+# Versão do esquema gravada no banco (PRAGMA user_version). Aumente a cada mudança nas funções create_*
+# para que os bancos existentes sejam migrados no próximo início; bancos já na versão atual pulam o DDL
+SCHEMA_VERSION = 6
+
+# Função para levar o banco à versão atual do esquema; retorna a versão que ele tinha antes
+def migrate_db():
+    conn = open_db()
+    versao = conn.execute('PRAGMA user_version').fetchone()[0]
+    conn.close()
+    if versao >= SCHEMA_VERSION:
+        return versao
+    create_table()
+    create_empresa_table()
+    create_matches_table()
+    create_skills_tables()
+    create_images_table()
+    create_uploads_table()
+    create_search_tables()
+    conn = open_db()
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    conn.close()
+    return versao
+
+# Função para preparar o processo antes da primeira requisição: enche o pool com conexões já configuradas
+# e com o esquema lido, e compila os templates do app
+def warm_up():
+    conexoes = [open_db(compartilhada=True) for _ in range(app.config['DB_POOL_SIZE'])]
+    for conn in conexoes:
+        conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+    with db_pool_lock:
+        db_pool.extend((db_pool_key(), conn) for conn in conexoes)
+    for nome in app.jinja_env.list_templates(filter_func=lambda nome: '/' not in nome and nome.endswith('.html')):
+        app.jinja_env.get_template(nome)
+
+# Função para iniciar as tarefas em segundo plano do processo: o buffer de swipes (que antes reaplica o journal
+# deixado por uma queda) e a fila de currículos, que retoma na hora os jobs que ficaram pendentes
+def start_background():
+    if app.config['SWIPE_WRITE_BEHIND']:
+        get_swipe_buffer()
+    get_resume_queue()
+
+# Fábrica do app para servidores WSGI (gunicorn -c gunicorn.conf.py "main:create_app()"):
+# aplica as configurações recebidas, confere o esquema, aquece o processo e inicia as tarefas em segundo plano
+def create_app(**config):
+    app.config.update(config)
+    migrate_db()
+    warm_up()
+    start_background()
+    return app
+
+# Função para ler a identidade de quem fez login do cookie de sessão assinado pelo Flask
+# (None sem cookie, com assinatura inválida ou com a sessão vencida)
+def session_identity(cookie):
+    valor = parse_cookie(cookie).get(app.config['SESSION_COOKIE_NAME'])
+    if not valor:
+        return None
+    try:
+        sessao = app.session_interface.get_signing_serializer(app).loads(
+            valor, max_age=int(app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+    return sessao.get('identidade')
+
+# Função para enviar uma resposta curta de texto pela interface ASGI
+async def asgi_text(send, status, texto, cabecalhos=()):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8'), *cabecalhos]})
+    await send({'type': 'http.response.body', 'body': texto.encode()})
+
+# Função que termina quando o cliente ASGI fecha a conexão
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+# Função para atender o ciclo de vida (lifespan) do servidor ASGI: não há nada para abrir nem fechar
+async def notifications_lifespan(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensagem['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+# Aplicação ASGI das notificações (SSE), servida à parte do app Flask por um servidor assíncrono (uvicorn),
+# com o proxy reverso mandando o caminho de NOTIFY_STREAM_URL para ela. A identidade vem do cookie de sessão
+# do Flask. Ao reconectar, o navegador envia Last-Event-ID e recebe o que perdeu. Cada conexão é só uma
+# corrotina, então não há limite de conexões por processo; ela é encerrada depois de SSE_STREAM_SECONDS e o
+# navegador reconecta sozinho. GET /metrics devolve os contadores do distribuidor no formato do Prometheus
+async def notifications_asgi(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await notifications_lifespan(receive, send)
+    if scope['path'] == '/metrics' and scope['method'] == 'GET':
+        notifier = get_match_notifier()
+        linhas = metric_family('notificacoes_conexoes', 'gauge', 'Conexões SSE abertas neste processo.', {'': notifier.stats['connected']})
+        linhas += metric_family('notificacoes_eventos_total', 'counter', 'Eventos do distribuidor de notificações.',
+                                {f'evento="{evento}"': notifier.stats[evento] for evento in ('delivered', 'polls', 'poll_errors')})
+        linhas += metric_family('notificacoes_ultimo_id', 'gauge', 'Última notificação lida do outbox.', {'': notifier.last_id or 0})
+        return await asgi_text(send, 200, '\n'.join(linhas) + '\n')
+    if scope['path'] != urlsplit(app.config['NOTIFY_STREAM_URL']).path or scope['method'] != 'GET':
+        return await asgi_text(send, 404, 'Não encontrado.\n')
+
+    cabecalhos = {nome.decode('latin-1').lower(): valor.decode('latin-1') for nome, valor in scope['headers']}
+    # Páginas de outra origem (NOTIFY_STREAM_URL absoluta) só recebem a resposta se a origem estiver liberada
+    cors = []
+    if cabecalhos.get('origin') in app.config['NOTIFY_ALLOWED_ORIGINS']:
+        cors = [(b'access-control-allow-origin', cabecalhos['origin'].encode('latin-1')),
+                (b'access-control-allow-credentials', b'true'), (b'vary', b'Origin')]
+    identidade = session_identity(cabecalhos.get('cookie', ''))
+    if not identidade:
+        return await asgi_text(send, 401, 'Faça login para receber notificações.\n', cors)
+    tipo, perfil_id = identidade['tipo'], identidade['id']
+    ultimo = cabecalhos.get('last-event-id') or parse_qs(scope['query_string'].decode('latin-1')).get('desde', [''])[0]
+    ultimo = int(ultimo) if ultimo.isdigit() else None
+    heartbeat = app.config['SSE_HEARTBEAT_SECONDS']
+    laco = asyncio.get_running_loop()
+    fim = laco.time() + app.config['SSE_STREAM_SECONDS']
+
+    notifier = get_match_notifier()
+    fila = notifier.subscribe(tipo, perfil_id)
+    desconectou = asyncio.ensure_future(wait_disconnect(receive))
+
+    async def enviar(texto):
+        await send({'type': 'http.response.body', 'body': texto.encode(), 'more_body': True})
+
+    try:
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/event-stream; charset=utf-8'), (b'cache-control', b'no-cache'),
+                                (b'x-accel-buffering', b'no'), *cors]})
+        await enviar('retry: 3000\n\n')
+        enviado = ultimo or 0
+        if ultimo is not None:
+            for notificacao in await asyncio.to_thread(read_notifications, ultimo, [tipo, perfil_id], 100):
+                enviado = notificacao['id']
+                await enviar(format_notification(notificacao))
+        while not desconectou.done() and (restante := fim - laco.time()) > 0:
+            proxima = asyncio.ensure_future(fila.get())
+            await asyncio.wait({proxima, desconectou}, timeout=min(heartbeat, restante), return_when=asyncio.FIRST_COMPLETED)
+            if not proxima.done():
+                proxima.cancel()
+                if not desconectou.done():
+                    await enviar(': ping\n\n')
+                continue
+            notificacao = proxima.result()
+            if notificacao['id'] > enviado:
+                enviado = notificacao['id']
+                await enviar(format_notification(notificacao))
+        if not desconectou.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    except OSError:
+        pass  # o cliente saiu no meio de um envio
+    finally:
+        desconectou.cancel()
+        notifier.unsubscribe(tipo, perfil_id, fila)
+
+# Fábrica da aplicação ASGI das notificações (uvicorn --factory "main:create_notifications_app" --port 8001):
+# aplica as configurações recebidas e confere o esquema, como create_app
+def create_notifications_app(**config):
+    app.config.update(config)
+    migrate_db()
+    return notifications_asgi
+
+# Comando "flask migrar": migra o esquema uma vez antes de subir os servidores (o gunicorn.conf.py chama na subida e no HUP)
+@app.cli.command('migrar', with_appcontext=False)
+def migrar_command():
+    antes = migrate_db()
+    if antes < SCHEMA_VERSION:
+        click.echo(f'Esquema migrado da versão {antes} para a {SCHEMA_VERSION}')
+    else:
+        click.echo(f'Esquema já está na versão {antes}')
+
+# Servidor de desenvolvimento (com o reloader); em produção use o gunicorn.conf.py. As notificações rodam à parte:
+#   TINDERJOB_NOTIFY_ALLOWED_ORIGINS='["http://localhost:6001"]' uvicorn --factory "main:create_notifications_app" --port 6002 --timeout-graceful-shutdown 5
+# com TINDERJOB_NOTIFY_STREAM_URL=http://localhost:6002/notificacoes/stream também no servidor abaixo
+if __name__ == '__main__':
+    create_app()
+    app.run(debug=True, port=6001)